@@ -0,0 +1,149 @@
+# accounts/metrics.py — dashboard KPIs: a handful of aggregate queries, cached until the data changes
+
+"""
+``dashboard_metrics()`` returns today's KPIs from the cache (``DASHBOARD_METRICS_CACHE``
+alias) and only computes them on a miss. Each figure is one aggregate query, with
+``Count`` / ``Sum`` and ``filter=`` doing the grouping inside the database.
+
+The receivers in accounts/signals.py call ``invalidate_dashboard_metrics`` on every
+save and delete of the models behind the KPIs. Bulk writes skip those signals, so the
+payroll run and the employee import call it themselves. Most of those writes happen in
+``run_workers`` or a management command, so the alias must be shared by every process
+(the ``hrms.W001`` check warns when it is not). ``DASHBOARD_METRICS_TTL`` is a
+backstop for changes made outside the ORM.
+
+Hikes are counted from the compensation history, not from the hike letters: a letter
+row is overwritten when it is regenerated, the hike records it made are superseded.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from employees.models import CompensationRecord, Employee
+from employees.queries import annotate_latest_letters
+from payslips.models import Payslip
+from releaving.models import ReleavingLetter
+
+DEFAULT_METRICS_TTL = 600   # seconds
+STATUSES = ("active", "draft", "relieved", "joined")
+
+
+@dataclass
+class DashboardMetrics:
+    as_of: date
+    month_label: str
+    quarter_label: str
+    headcount: dict               # status -> employees, plus "total"
+    monthly_ctc: Decimal          # current CTC / 12 over active employees
+    payroll_payslips: int         # payslips generated for this month
+    payroll_gross: Decimal
+    payroll_net: Decimal
+    hikes_this_quarter: int       # hikes taking effect this quarter
+    hike_increase_per_annum: Decimal
+    relievings_this_month: int
+
+    @property
+    def pending_drafts(self):
+        return self.headcount["draft"]
+
+
+def _cache():
+    return caches[getattr(settings, "DASHBOARD_METRICS_CACHE", "default")]
+
+
+def _cache_key(day):
+    return f"dashboard:metrics:{day.isoformat()}"
+
+
+def _quarter_bounds(day):
+    first_month = 3 * ((day.month - 1) // 3) + 1
+    start = date(day.year, first_month, 1)
+    end = date(day.year + 1, 1, 1) if first_month == 10 else date(day.year, first_month + 3, 1)
+    return start, end
+
+
+def compute_dashboard_metrics(day):
+    """The KPIs as of ``day``, straight from the database (four aggregate queries)."""
+    month_start = day.replace(day=1)
+    month_end = date(day.year + 1, 1, 1) if day.month == 12 else date(day.year, day.month + 1, 1)
+    quarter_start, quarter_end = _quarter_bounds(day)
+
+    people = annotate_latest_letters(Employee.objects.all()).aggregate(
+        total=Count("pk"),
+        monthly_ctc=Sum("ctc_per_annum", filter=Q(status="active")),
+        **{status: Count("pk", filter=Q(status=status)) for status in STATUSES},
+    )
+    payroll = Payslip.objects.filter(month_year=month_start.strftime("%B %Y")).aggregate(
+        count=Count("pk"), gross=Sum("gross_salary"), net=Sum("net_salary"),
+    )
+    previous_ctc = (
+        CompensationRecord.objects.active()
+        .filter(employee=OuterRef("employee"), effective_date__lt=OuterRef("effective_date"))
+        .order_by("-effective_date", "-id").values("ctc_per_annum")[:1]
+    )
+    hikes = (
+        CompensationRecord.objects.active()
+        .filter(source=CompensationRecord.HIKE, effective_date__gte=quarter_start, effective_date__lt=quarter_end)
+        .annotate(old_ctc=Coalesce(Subquery(previous_ctc), F("employee__package_per_annum"), F("ctc_per_annum")))
+        .aggregate(count=Count("pk"), increase=Sum(F("ctc_per_annum") - F("old_ctc")))
+    )
+    relievings = ReleavingLetter.objects.filter(
+        releaving_date__gte=month_start, releaving_date__lt=month_end,
+    ).aggregate(count=Count("pk"))
+
+    monthly_ctc = Decimal(people.pop("monthly_ctc") or 0) / 12
+    return DashboardMetrics(
+        as_of=day,
+        month_label=month_start.strftime("%B %Y"),
+        quarter_label=f"Q{(quarter_start.month - 1) // 3 + 1} {day.year}",
+        headcount=people,
+        monthly_ctc=monthly_ctc.quantize(Decimal("0.01")),
+        payroll_payslips=payroll["count"],
+        payroll_gross=payroll["gross"] or Decimal("0.00"),
+        payroll_net=payroll["net"] or Decimal("0.00"),
+        hikes_this_quarter=hikes["count"],
+        hike_increase_per_annum=hikes["increase"] or Decimal("0.00"),
+        relievings_this_month=relievings["count"],
+    )
+
+
+def dashboard_metrics(day=None):
+    """Today's KPIs: one cache read, or a recompute after a change (or at the TTL / day rollover)."""
+    day = day or timezone.localdate()
+    cache, key = _cache(), _cache_key(day)
+    try:
+        metrics = cache.get(key)
+    except Exception:   # cache unavailable: compute, as on a miss
+        return compute_dashboard_metrics(day)
+    if metrics is None:
+        metrics = compute_dashboard_metrics(day)
+        try:
+            cache.set(key, metrics, getattr(settings, "DASHBOARD_METRICS_TTL", DEFAULT_METRICS_TTL))
+        except Exception:
+            pass
+    return metrics
+
+
+def invalidate_dashboard_metrics():
+    """
+    Drop today's cached KPIs now and again once the surrounding transaction commits,
+    so a dashboard hit in between cannot keep figures from before the change.
+    """
+    key = _cache_key(timezone.localdate())
+    _drop(key)
+    transaction.on_commit(lambda: _drop(key))
+
+
+def _drop(key):
+    try:
+        _cache().delete(key)
+    except Exception:   # a cache outage must never fail the write that triggered this; the TTL still applies
+        pass
@@ -4,35 +4,67 @@ from django.contrib import messages
 from django.conf import settings
 import time
 from django.contrib.auth import logout
+from hrms.perf import measure
 
 class AuthRequiredMiddleware:
+    """
+    Login gate plus idle timeout. ``last_activity`` is only rewritten once it is more than
+    SESSION_ACTIVITY_GRANULARITY seconds old, so most requests leave the session unmodified
+    and the session backend skips its save (with SESSION_SAVE_EVERY_REQUEST off). The
+    timeout is therefore enforced to within that granularity.
+    """
     def __init__(self, get_response):
         self.get_response = get_response
+        self._allowed_prefixes = None
 
-    def __call__(self, request):
-        # Resolve allowed URLs dynamically
-        allowed_prefixes = [
-            reverse("accounts:login"),
-            reverse("accounts:logout"),
-            "/",
-        ]
-
-        path = request.path
-        is_allowed = any(path.startswith(prefix) for prefix in allowed_prefixes)
+    @property
+    def allowed_prefixes(self):
+        # Resolved on the first request (the URLconf may not be importable yet in __init__)
+        if self._allowed_prefixes is None:
+            self._allowed_prefixes = (
+                reverse("accounts:login"),
+                reverse("accounts:logout"),
+                "/",
+            )
+        return self._allowed_prefixes
 
+    def __call__(self, request):
         if request.user.is_authenticated:
             last_activity = request.session.get("last_activity")
             current_time = time.time()
             timeout = getattr(settings, "SESSION_TIMEOUT", None)
+            granularity = getattr(settings, "SESSION_ACTIVITY_GRANULARITY", 0)
 
-            if timeout and last_activity and (current_time - last_activity > timeout):
+            if timeout and last_activity and (current_time - last_activity > timeout + granularity):
                 messages.warning(request, "Your session has expired due to inactivity.")
                 logout(request)
                 return redirect("accounts:login")
 
-            request.session["last_activity"] = current_time
+            if not last_activity or current_time - last_activity >= granularity:
+                request.session["last_activity"] = current_time
 
-        elif not is_allowed:
+        elif not request.path.startswith(self.allowed_prefixes):
             return redirect("accounts:login")
 
         return self.get_response(request)
+
+
+class PerformanceMiddleware:
+    """
+    Times every request (wall, SQL count / time, template and document spans — see hrms/perf.py),
+    adds a Server-Timing header and feeds the per-view rolling histogram behind accounts:perf_stats.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with measure("unresolved") as sample:
+            response = self.get_response(request)
+            if sample is None:
+                return response
+            match = request.resolver_match
+            sample.key = f"{request.method} {match.view_name if match else 'unresolved'}"
+
+        if getattr(settings, "PERF_SERVER_TIMING", True):
+            response["Server-Timing"] = sample.server_timing()
+        return response
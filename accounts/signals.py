@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save
+
+from employees.models import CompensationRecord, Employee
+from payslips.models import Payslip
+from releaving.models import ReleavingLetter
+
+from .metrics import invalidate_dashboard_metrics
+
+# Everything the dashboard KPIs are computed from
+DASHBOARD_SOURCES = (Employee, CompensationRecord, ReleavingLetter, Payslip)
+
+
+def refresh_dashboard_metrics(sender, **kwargs):
+    invalidate_dashboard_metrics()
+
+
+# One receiver per source model, so saves of anything else (sessions, jobs, the cache) skip it
+for model in DASHBOARD_SOURCES:
+    post_save.connect(refresh_dashboard_metrics, sender=model, dispatch_uid=f"dashboard_metrics_save_{model.__name__}")
+    post_delete.connect(refresh_dashboard_metrics, sender=model, dispatch_uid=f"dashboard_metrics_delete_{model.__name__}")
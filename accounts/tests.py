@@ -1,3 +1,134 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from employees.history import record_compensation, supersede_compensation
+from employees.models import CompensationRecord, Employee
+from hrms.perf import reset_history
+from offerletters.models import OfferLetter
+from payslips.models import Payslip
+from releaving.models import ReleavingLetter
+
+from .metrics import compute_dashboard_metrics, dashboard_metrics
+
+
+@override_settings(SESSION_TIMEOUT=900, SESSION_ACTIVITY_GRANULARITY=60)
+class AuthRequiredMiddlewareTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("hr", password="pass"))
+        self.url = reverse("employees:employee_list")
+
+    def get_at(self, now):
+        with mock.patch("accounts.middleware.time.time", return_value=now):
+            return self.client.get(self.url)
+
+    def test_activity_is_saved_only_past_the_granularity(self):
+        self.get_at(1000.0)
+        self.assertEqual(self.client.session["last_activity"], 1000.0)
+
+        with mock.patch("django.contrib.sessions.backends.db.SessionStore.save") as save:
+            self.get_at(1030.0)
+        save.assert_not_called()
+        self.assertEqual(self.client.session["last_activity"], 1000.0)
+
+        self.get_at(1061.0)
+        self.assertEqual(self.client.session["last_activity"], 1061.0)
+
+    def test_idle_session_is_logged_out(self):
+        self.get_at(1000.0)
+        self.assertEqual(self.get_at(1000.0 + 900 + 30).status_code, 200)   # within the granularity slack
+        response = self.get_at(1930.0 + 900 + 61)
+        self.assertRedirects(response, reverse("accounts:login"), fetch_redirect_response=False)
+        self.assertNotIn("_auth_user_id", self.client.session)
+
+
+class PerformanceMiddlewareTests(TestCase):
+    def setUp(self):
+        reset_history()
+        self.addCleanup(reset_history)
+        self.user = User.objects.create_user("hr", password="pass")
+        self.client.force_login(self.user)
+
+    def test_server_timing_and_staff_histogram(self):
+        response = self.client.get(reverse("employees:employee_list"))
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn("template;dur=", timing)
+
+        self.assertEqual(self.client.get(reverse("accounts:perf_stats")).status_code, 302)   # staff only
+        self.user.is_staff = True
+        self.user.save()
+        stats = self.client.get(reverse("accounts:perf_stats")).json()["views"]
+        entry = stats["GET employees:employee_list"]
+        self.assertEqual(entry["count"], 1)
+        self.assertGreater(entry["avg_sql_queries"], 0)
+        self.assertEqual(sum(entry["histogram_ms"].values()), 1)
+
+    @override_settings(JOBS_RUN_ASYNC=False)
+    def test_inline_generation_reports_document_spans(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        employee = Employee.objects.create(first_name="Ravi", email="ravi@example.com", designation="Developer")
+        OfferLetter.objects.create(employee=employee, offer_date=date(2025, 1, 6), employee_code="STPL0125001")
+
+        with override_settings(MEDIA_ROOT=media.name):
+            response = self.client.post(
+                reverse("generate_releaving", args=[employee.id]), {"releaving_date": "2025-06-30"}
+            )
+        self.assertIn("docx_render;dur=", response["Server-Timing"])
+        self.assertIn("file_save;dur=", response["Server-Timing"])
+
+
+class DashboardMetricsTests(TestCase):
+    day = date(2025, 11, 20)
+
+    def setUp(self):
+        caches["shared"].clear()
+        self.ravi = Employee.objects.create(first_name="Ravi", email="ravi@example.com", is_draft=False,
+                                            package_per_annum=Decimal("900000"))
+        Employee.objects.create(first_name="Asha", email="asha@example.com")   # draft
+        record_compensation(self.ravi, CompensationRecord.OFFER, Decimal("900000"), date(2025, 1, 1))
+        record_compensation(self.ravi, CompensationRecord.HIKE, Decimal("1000000"), date(2025, 7, 1))   # last quarter
+        record_compensation(self.ravi, CompensationRecord.HIKE, Decimal("1300000"), date(2025, 11, 1))
+        # the letter was regenerated with the corrected date and package
+        supersede_compensation(self.ravi, CompensationRecord.HIKE, date(2025, 11, 1), Decimal("1300000"))
+        record_compensation(self.ravi, CompensationRecord.HIKE, Decimal("1200000"), date(2025, 10, 1))
+        Payslip.objects.create(employee=self.ravi, based_on="hike", month_year="November 2025", days_worked=30,
+                               gross_salary=Decimal("100000"), deductions=Decimal("5000"), net_salary=Decimal("95000"))
+
+    def test_kpis_are_aggregated_and_cached_until_a_change(self):
+        with self.assertNumQueries(4):
+            metrics = compute_dashboard_metrics(self.day)
+        self.assertEqual(dashboard_metrics(self.day), metrics)
+        self.assertEqual(metrics.headcount, {"total": 2, "active": 1, "draft": 1, "relieved": 0, "joined": 0})
+        self.assertEqual(metrics.pending_drafts, 1)
+        self.assertEqual(metrics.monthly_ctc, Decimal("100000.00"))
+        self.assertEqual((metrics.payroll_payslips, metrics.payroll_net), (1, Decimal("95000")))
+        self.assertEqual((metrics.hikes_this_quarter, metrics.hike_increase_per_annum), (1, Decimal("200000")))
+        self.assertEqual(metrics.relievings_this_month, 0)
+
+        with self.assertNumQueries(1):   # the shared cache read
+            dashboard_metrics(self.day)
+
+        with mock.patch("accounts.metrics.timezone.localdate", return_value=self.day):
+            ReleavingLetter.objects.create(employee=self.ravi, releaving_date=date(2025, 11, 30))
+        metrics = dashboard_metrics(self.day)
+        self.assertEqual(metrics.relievings_this_month, 1)
+        self.assertEqual(metrics.headcount["relieved"], 1)
+
+    def test_writes_survive_a_missing_cache_table_and_unrelated_saves_skip_invalidation(self):
+        with mock.patch("accounts.signals.invalidate_dashboard_metrics") as invalidate:
+            User.objects.create_user("hr", password="pass")
+        invalidate.assert_not_called()
+
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TABLE hrms_cache")   # fresh database without the cache table
+        Employee.objects.create(first_name="Kiran", email="kiran@example.com")
+        self.assertEqual(dashboard_metrics(self.day).headcount["total"], 3)
@@ -9,4 +9,5 @@ urlpatterns = [
     path("logout/", views.logout_view, name="logout"),
     path("dashboard/", views.dashboard_view, name="dashboard"),
     path("create-user/", views.create_user_view, name="create_user"),
+    path("perf/", views.perf_stats_view, name="perf_stats"),
 ]
\ No newline at end of file
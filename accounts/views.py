@@ -1,8 +1,14 @@
+import os
+
 from django.shortcuts import render, redirect
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, user_passes_test
+from django.http import JsonResponse
+from hrms.perf import perf_summary
+
+from .metrics import dashboard_metrics
 
 # --- Admin Check ---
 def admin_required(user):
@@ -15,7 +21,8 @@ def home(request):
 @login_required
 def dashboard_view(request):
     return render(request, "accounts/dashboard.html", {
-        "user": request.user
+        "user": request.user,
+        "metrics": dashboard_metrics(),
     })
 
 # --- Login View ---
@@ -63,3 +70,11 @@ def create_user_view(request):
         return redirect("accounts:dashboard")
 
     return render(request, "accounts/create_user.html")
+
+
+# --- Timing histograms (staff only) ---
+@login_required
+@user_passes_test(lambda user: user.is_staff)
+def perf_stats_view(request):
+    """Per-view / per-job latency histograms from this process's rolling window (hrms/perf.py)."""
+    return JsonResponse({"pid": os.getpid(), "views": perf_summary()})
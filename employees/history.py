@@ -0,0 +1,127 @@
+# employees/history.py — append-only compensation history and the Employee.current_compensation pointer
+
+"""
+Offer and hike letters are documents: regenerating one overwrites its row. The
+salary they set is recorded here instead, as a new CompensationRecord that is never
+updated. ``Employee.current_compensation`` points at the record in force today (the
+latest effective date on or before today, then id), so "what is this employee paid"
+is one attribute read, or one join via ``select_related``. A hike dated next month
+does not show until it starts: ``refresh_due_compensation`` (``manage.py
+refresh_compensation``, daily, and the start of every payroll run) moves the
+pointers of employees whose next record has taken effect. ``compensation_on``
+answers "as of a date" with one query on the (employee, effective_date, id) index.
+
+An employee has one hike letter, so regenerating it replaces the hike it recorded:
+the previous hike record is superseded (kept, but no longer counted) rather than
+left in force next to the corrected one.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .models import CompensationRecord, Employee
+
+
+def _latest(records):
+    return records.order_by("-effective_date", "-id").first()
+
+
+def _in_force(records, day):
+    return _latest(records.active().filter(effective_date__lte=day))
+
+
+def offer_ctc(employee):
+    """Annual CTC an offer letter sets: the profile's package per annum, else 12 × per month."""
+    if employee.package_per_annum:
+        return Decimal(employee.package_per_annum)
+    return Decimal(employee.package_per_month or 0) * 12
+
+
+def refresh_current_compensation(employee, day=None):
+    """Re-point ``employee.current_compensation`` at the record in force on ``day`` (today)."""
+    day = day or timezone.localdate()
+    current = _in_force(CompensationRecord.objects.filter(employee=employee), day)
+    Employee.objects.filter(pk=employee.pk).update(current_compensation=current)
+    employee.current_compensation = current
+    return current
+
+
+def refresh_due_compensation(day=None):
+    """
+    Move every stale pointer to the record in force on ``day`` (today), e.g. once a hike
+    dated the 1st has started. One read for all employees; returns how many changed.
+    """
+    day = day or timezone.localdate()
+    in_force = (
+        CompensationRecord.objects.active()
+        .filter(employee=OuterRef("pk"), effective_date__lte=day)
+        .order_by("-effective_date", "-id").values("pk")[:1]
+    )
+    stale = [
+        Employee(pk=pk, current_compensation_id=due)
+        for pk, current, due in Employee.objects.annotate(due=Subquery(in_force))
+        .values_list("pk", "current_compensation_id", "due").iterator(chunk_size=5000)
+        if current != due
+    ]
+    Employee.objects.bulk_update(stale, ["current_compensation"], batch_size=1000)
+    return len(stale)
+
+
+def record_compensation(employee, source, ctc_per_annum, effective_date, variable_pay_per_annum=Decimal("0"),
+                        employee_code=None):
+    """
+    Append a record (unless the same source already set exactly these values from that date,
+    so regenerating an unchanged letter adds nothing) and move the current pointer.
+    """
+    ctc_per_annum = Decimal(ctc_per_annum or 0).quantize(Decimal("0.01"))
+    variable_pay_per_annum = Decimal(variable_pay_per_annum or 0).quantize(Decimal("0.01"))
+
+    with transaction.atomic():
+        Employee.objects.select_for_update().filter(pk=employee.pk).exists()   # serialize appends per employee
+        same = _latest(CompensationRecord.objects.active().filter(employee=employee, effective_date=effective_date))
+        if not (same and same.source == source and same.ctc_per_annum == ctc_per_annum
+                and same.variable_pay_per_annum == variable_pay_per_annum):
+            CompensationRecord.objects.create(
+                employee=employee,
+                source=source,
+                effective_date=effective_date,
+                ctc_per_annum=ctc_per_annum,
+                variable_pay_per_annum=variable_pay_per_annum,
+                employee_code=employee_code,
+            )
+        return refresh_current_compensation(employee)
+
+
+def supersede_compensation(employee, source, effective_date, ctc_per_annum):
+    """
+    Retire the record a letter made (``source`` from ``effective_date`` at ``ctc_per_annum``)
+    because the letter has been regenerated with other terms, and re-point the employee.
+    """
+    with transaction.atomic():
+        Employee.objects.select_for_update().filter(pk=employee.pk).exists()
+        CompensationRecord.objects.active().filter(
+            employee=employee, source=source, effective_date=effective_date, ctc_per_annum=ctc_per_annum,
+        ).update(superseded_at=timezone.now())
+        return refresh_current_compensation(employee)
+
+
+def compensation_on(employee, day, source=None):
+    """The record in force on ``day`` (optionally only offers or only hikes), or None."""
+    current = employee.current_compensation   # in force today: nothing between it and today can apply
+    if (current and current.effective_date <= day <= timezone.localdate()
+            and source in (None, current.source)):
+        return current
+    records = CompensationRecord.objects.filter(employee=employee)
+    if source:
+        records = records.filter(source=source)
+    return _in_force(records, day)
+
+
+def ctc_before(employee, day):
+    """Annual CTC in force the day before ``day`` — a hike's "old package"."""
+    record = compensation_on(employee, day - timedelta(days=1))
+    return record.ctc_per_annum if record else (employee.package_per_annum or Decimal("0.00"))
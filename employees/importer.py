@@ -0,0 +1,156 @@
+# employees/importer.py — bulk employee import from Excel / CSV
+
+from dataclasses import dataclass, field
+import os
+
+import numpy as np
+import pandas as pd
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from accounts.metrics import invalidate_dashboard_metrics
+
+from .models import Employee
+from .search import index_employees
+
+IMPORT_FIELDS = [
+    "first_name", "last_name", "email", "phone", "address",
+    "designation", "package_per_annum", "package_per_month", "is_draft",
+]
+# Same rules as EmployeeForm.clean(): drafts only need name + email
+ALWAYS_REQUIRED = ["first_name", "email"]
+FINAL_REQUIRED = ["phone", "designation", "address", "package_per_annum", "package_per_month"]
+
+EMAIL_RE = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+PHONE_RE = r"^\+?\d{7,15}$"
+TRUE_VALUES = {"1", "true", "yes", "y", "draft"}
+IMPORT_BATCH_SIZE = 500
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    errors: list = field(default_factory=list)   # [(row_number, [messages])] — row_number as seen in the sheet
+
+    @property
+    def total(self):
+        return self.created + len(self.errors)
+
+
+def read_import_file(fileobj, filename):
+    """Load an uploaded .xlsx/.xls/.csv into a frame of strings with normalized column names."""
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext == ".csv":
+        df = pd.read_csv(fileobj, dtype=str, keep_default_na=False)
+    elif ext in (".xlsx", ".xls"):
+        df = pd.read_excel(fileobj, dtype=str, keep_default_na=False)
+    else:
+        raise ValueError("Upload a .xlsx, .xls or .csv file.")
+
+    df.columns = [str(col).strip().lower().replace(" ", "_") for col in df.columns]
+    missing = [col for col in ALWAYS_REQUIRED if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+
+    for col in IMPORT_FIELDS:
+        df[col] = df[col].fillna("").astype(str).str.strip() if col in df.columns else ""
+    return df[IMPORT_FIELDS]
+
+
+def validate_frame(df):
+    """
+    Validate every row at once. Returns (frame with parsed columns, Series of error lists).
+    Uniqueness of email/phone among completed employees is checked with one IN query
+    per column plus in-file de-duplication, mirroring add_employee.
+    """
+    df = df.copy()
+    errors = pd.Series([[] for _ in range(len(df))], index=df.index, dtype=object)
+
+    def flag(mask, message):
+        for idx in df.index[mask.to_numpy()]:
+            errors.at[idx].append(message)
+
+    df["is_draft"] = df["is_draft"].str.lower().isin(TRUE_VALUES)
+    df["phone"] = df["phone"].str.replace(r"[\s\-().]", "", regex=True)
+    df["email_key"] = df["email"].str.lower()
+    df["package_per_annum_num"] = pd.to_numeric(df["package_per_annum"].str.replace(",", ""), errors="coerce")
+    df["package_per_month_num"] = pd.to_numeric(df["package_per_month"].str.replace(",", ""), errors="coerce")
+
+    for col in ALWAYS_REQUIRED:
+        flag(df[col] == "", f"{col.replace('_', ' ').title()} is required")
+    final = ~df["is_draft"]
+    for col in FINAL_REQUIRED:
+        flag(final & (df[col] == ""), f"{col.replace('_', ' ').title()} is required for final submission")
+
+    flag((df["email"] != "") & ~df["email"].str.match(EMAIL_RE), "Invalid email")
+    flag((df["phone"] != "") & ~df["phone"].str.match(PHONE_RE), "Invalid phone number")
+    for col in ("package_per_annum", "package_per_month"):
+        parsed = df[f"{col}_num"]
+        given = df[col] != ""
+        label = col.replace('_', ' ')
+        flag(given & (parsed.isna() | ~np.isfinite(parsed) | (parsed < 0)), f"Invalid {label}")
+        # The DecimalField's own bounds, so no row fails (or reads back broken) in the database
+        model_field = Employee._meta.get_field(col)
+        limit = 10 ** (model_field.max_digits - model_field.decimal_places)
+        places = df[col].str.extract(r"\.(\d+)$", expand=False).fillna("").str.len()
+        flag(given & np.isfinite(parsed) & (parsed >= limit), f"{label.capitalize()} must be below {limit:,}")
+        flag(given & (places > model_field.decimal_places),
+             f"{label.capitalize()} allows at most {model_field.decimal_places} decimal places")
+
+    # Duplicates against existing completed employees — one query per column
+    emails = set(df.loc[final & (df["email_key"] != ""), "email_key"])
+    phones = set(df.loc[final & (df["phone"] != ""), "phone"])
+    taken_emails = set(
+        Employee.objects.filter(is_draft=False).annotate(email_key=Lower("email"))
+        .filter(email_key__in=emails).values_list("email_key", flat=True)
+    ) if emails else set()
+    taken_phones = set(
+        Employee.objects.filter(is_draft=False, phone__in=phones).values_list("phone", flat=True)
+    ) if phones else set()
+    flag(final & df["email_key"].isin(taken_emails), "Email already exists")
+    flag(final & df["phone"].isin(taken_phones), "Phone number already exists")
+
+    # Duplicates inside the file — the first occurrence wins
+    flag(final & (df["email_key"] != "") & df[final].duplicated("email_key").reindex(df.index, fill_value=False),
+         "Duplicate email in file")
+    flag(final & (df["phone"] != "") & df[final].duplicated("phone").reindex(df.index, fill_value=False),
+         "Duplicate phone number in file")
+
+    return df, errors
+
+
+def import_employees(fileobj, filename, batch_size=IMPORT_BATCH_SIZE):
+    """Validate an uploaded sheet and bulk-insert its valid rows. Invalid rows are reported, not inserted."""
+    df, errors = validate_frame(read_import_file(fileobj, filename))
+
+    valid = errors.map(len) == 0
+    rows = df[valid]
+    employees = [
+        Employee(
+            first_name=row.first_name,
+            last_name=row.last_name or "",
+            email=row.email,
+            phone=row.phone or None,
+            address=row.address or None,
+            designation=row.designation or None,
+            package_per_annum=row.package_per_annum.replace(",", "") or None,
+            package_per_month=row.package_per_month.replace(",", "") or None,
+            is_draft=bool(row.is_draft),
+        )
+        for row in rows.itertuples(index=False)
+    ]
+
+    try:
+        with transaction.atomic():
+            Employee.objects.bulk_create(employees, batch_size=batch_size)
+            index_employees(employees)   # bulk_create skips the post_save signal
+            invalidate_dashboard_metrics()
+    except IntegrityError:
+        # The unique email / phone constraints caught a row added since validation
+        raise ValueError("Some emails or phone numbers were added by someone else during the import. Please retry.")
+
+    # +2: header is sheet row 1 and pandas counts from 0
+    return ImportResult(
+        created=len(employees),
+        errors=[(idx + 2, messages) for idx, messages in errors[~valid].items()],
+    )
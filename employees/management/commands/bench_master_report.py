@@ -0,0 +1,115 @@
+from datetime import date, timedelta
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from employees.models import CompensationRecord, Employee
+from employees.views import employee_master_report
+from hikeletters.models import HikeLetter
+from offerletters.models import OfferLetter
+from releaving.models import ReleavingLetter
+
+
+def seed_employees(count, payslip_months=()):
+    """
+    Bulk-insert ``count`` completed employees with an offer, most with a hike, some relieved,
+    their compensation history, and a payslip row per employee for each date in ``payslip_months``.
+    """
+    employees = Employee.objects.bulk_create([
+        Employee(
+            first_name=f"Bench{i}", last_name="User", email=f"bench{i}@example.com",
+            phone=f"9{i:09d}", designation="Engineer", address="Bench Street",
+            package_per_annum=480000 + i, package_per_month=40000, is_draft=False,
+            employee_code=f"STPL0125{i:03d}",
+        )
+        for i in range(count)
+    ], batch_size=1000)
+
+    OfferLetter.objects.bulk_create([
+        OfferLetter(employee=emp, offer_date=date(2025, 1, 1), employee_code=emp.employee_code,
+                    series_number=i, file=f"offer_letters/Offer_{emp.employee_code}.docx")
+        for i, emp in enumerate(employees)
+    ], batch_size=1000)
+    HikeLetter.objects.bulk_create([
+        HikeLetter(employee=emp, date=date(2025, 6, 1), hike_start_date=date(2025, 7, 1),
+                   employee_code=emp.employee_code, old_package=emp.package_per_annum,
+                   new_package=emp.package_per_annum + 60000)
+        for i, emp in enumerate(employees) if i % 3
+    ], batch_size=1000)
+    ReleavingLetter.objects.bulk_create([
+        ReleavingLetter(employee=emp, releaving_date=date(2025, 9, 30) - timedelta(days=i % 30),
+                        placed_in_company="Acme" if i % 2 else None)
+        for i, emp in enumerate(employees) if i % 10 == 0
+    ], batch_size=1000)
+
+    offers = [
+        CompensationRecord(employee=emp, source=CompensationRecord.OFFER, effective_date=date(2025, 1, 1),
+                           ctc_per_annum=emp.package_per_annum, employee_code=emp.employee_code)
+        for emp in employees
+    ]
+    current = {record.employee_id: record for record in offers}
+    hikes = [
+        CompensationRecord(employee=emp, source=CompensationRecord.HIKE, effective_date=date(2025, 7, 1),
+                           ctc_per_annum=emp.package_per_annum + 60000, employee_code=emp.employee_code)
+        for i, emp in enumerate(employees) if i % 3
+    ]
+    current.update((record.employee_id, record) for record in hikes)
+    CompensationRecord.objects.bulk_create(offers + hikes, batch_size=1000)
+    for emp in employees:
+        emp.current_compensation = current[emp.pk]
+    Employee.objects.bulk_update(employees, ["current_compensation"], batch_size=1000)
+
+    if payslip_months:
+        from payslips.models import Payslip   # payslips depends on employees, not the other way round
+
+        Payslip.objects.bulk_create([
+            Payslip(employee=emp, based_on=current[emp.pk].source, month_year=month.strftime("%B %Y"),
+                    days_worked=30, gross_salary=current[emp.pk].ctc_per_annum / 12, deductions=200,
+                    net_salary=current[emp.pk].ctc_per_annum / 12 - 200,
+                    payslip_file=f"payslips/Payslip_{emp.employee_code}_{month:%B_%Y}.docx")
+            for month in payslip_months for emp in employees
+        ], batch_size=1000)
+    return employees
+
+
+class Command(BaseCommand):
+    help = "Time employee_master_report (HTML and Excel) at several headcounts; all seeded data is rolled back"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+
+        for size in options["sizes"]:
+            with transaction.atomic():
+                seed_employees(size)
+                user = User.objects.create_user("bench-report-user")
+
+                for label, params in (("html", {}), ("excel", {"download": "1"})):
+                    timings, queries = [], 0
+                    for _ in range(options["repeat"]):
+                        request = factory.get("/employees/master-report/", params)
+                        request.user = user
+                        with CaptureQueriesContext(connection) as ctx:
+                            started = time.perf_counter()
+                            response = employee_master_report(request)
+                            if response.streaming:
+                                for _ in response.streaming_content:
+                                    pass
+                            timings.append(time.perf_counter() - started)
+                        queries = len(ctx.captured_queries)
+
+                    self.stdout.write(
+                        f"{size:>7} employees  {label:<5}  queries={queries:<3} "
+                        f"median={statistics.median(timings) * 1000:8.1f} ms  "
+                        f"min={min(timings) * 1000:8.1f} ms"
+                    )
+
+                transaction.set_rollback(True)
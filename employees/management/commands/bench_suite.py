@@ -0,0 +1,183 @@
+from datetime import date, datetime, timezone
+import itertools
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from hrms.perf import _percentile as percentile
+from jobs.models import Job
+
+from .bench_master_report import seed_employees
+
+SCENARIOS = (
+    "generate_offer_letter", "generate_hike_letter", "generate_payslip", "generate_releaving",
+    "employee_list", "employee_master_report_html", "employee_master_report_excel",
+)
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process so far (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def scenario_requests(name, employees):
+    """Endless (method, url, data) for one scenario; generators cycle through employees so every call renders."""
+    people = itertools.cycle(employees)
+    while True:
+        emp = next(people)
+        if name == "generate_offer_letter":
+            yield "post", reverse("generate_offer_letter", args=[emp.id]), {"offer_date": "2025-01-01"}
+        elif name == "generate_hike_letter":
+            yield "post", reverse("generate_hike_letter", args=[emp.id]), {
+                "new_package_annual": str(emp.package_per_annum + 90000), "date": "2025-11-10",
+            }
+        elif name == "generate_payslip":
+            yield "post", reverse("generate_payslip", args=[emp.id]), {
+                "based_on": "offer", "payslip_date": "2025-03-31", "days_worked": "31",
+            }
+        elif name == "generate_releaving":
+            yield "post", reverse("generate_releaving", args=[emp.id]), {"releaving_date": "2025-12-31"}
+        elif name == "employee_list":
+            yield "get", reverse("employees:employee_list"), {}
+        elif name == "employee_master_report_html":
+            yield "get", reverse("employees:employee_master_report"), {}
+        elif name == "employee_master_report_excel":
+            yield "get", reverse("employees:employee_master_report"), {"download": "1"}
+
+
+def request_failed(method, response, last_job):
+    """
+    An error status, or for a generator POST a job that failed or never ran: generators
+    report failures as a redirect with an error message, not as a 4xx / 5xx.
+    """
+    if response.status_code >= 400:
+        return True
+    if method != "post":
+        return False
+    statuses = set(Job.objects.filter(pk__gt=last_job).values_list("status", flat=True))
+    return Job.DONE not in statuses or Job.FAILED in statuses
+
+
+def drop_messages(client):
+    """Discard the flash messages a generator left for the page it redirects to (never followed here)."""
+    client.cookies.pop("messages", None)
+    session = client.session
+    if session.pop("_messages", None) is not None:
+        session.save()
+
+
+class Command(BaseCommand):
+    help = (
+        "Time every generator and report through the test client at several headcounts and write "
+        "latency percentiles, query counts and peak RSS as JSON. All seeded data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+        parser.add_argument("--repeat", type=int, default=20, help="Requests per scenario and size")
+        parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+        parser.add_argument("--output", default=None, help="Write the JSON here (default: print it)")
+
+    def run_scenario(self, client, name, employees, repeat):
+        requests = scenario_requests(name, employees)
+        timings, queries, failures = [], [], 0
+        for _ in range(repeat):
+            method, url, data = next(requests)
+            last_job = Job.objects.aggregate(last=Max("pk"))["last"] or 0
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = getattr(client, method)(url, data)
+                if response.streaming:
+                    for _ in response.streaming_content:
+                        pass
+                timings.append(time.perf_counter() - started)
+            queries.append(len(ctx.captured_queries))
+            failures += request_failed(method, response, last_job)
+            drop_messages(client)
+
+        timings.sort()
+        return {
+            "requests": repeat,
+            "failures": failures,
+            "p50_ms": round(percentile(timings, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(timings, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(timings, 0.99) * 1000, 2),
+            "mean_ms": round(statistics.fmean(timings) * 1000, 2),
+            "max_ms": round(timings[-1] * 1000, 2),
+            "queries_median": statistics.median(queries),
+            "queries_max": max(queries),
+            "peak_rss_kb": peak_rss_kb(),
+        }
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1.")
+
+        run = {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "repeat": options["repeat"],
+            "results": {},
+        }
+
+        media = tempfile.TemporaryDirectory(prefix="hrms-bench-")
+        # Generators run inline (no worker), documents go to a throwaway MEDIA_ROOT
+        bench_settings = override_settings(
+            JOBS_RUN_ASYNC=False, MEDIA_ROOT=media.name, PDF_CONVERSION_ENABLED=False,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+        )
+        with media, bench_settings:
+            for size in options["sizes"]:
+                with transaction.atomic():
+                    employees = seed_employees(size, payslip_months=[date(2025, 1, 31), date(2025, 2, 28)])
+                    client = Client()
+                    client.force_login(User.objects.create_user(f"bench-suite-{size}", is_staff=True))
+
+                    results = run["results"][str(size)] = {}
+                    for name in options["scenarios"]:
+                        results[name] = self.run_scenario(client, name, employees, options["repeat"])
+                        stats = results[name]
+                        self.stderr.write(
+                            f"{size:>7} employees  {name:<30} p50={stats['p50_ms']:8.1f} ms  "
+                            f"p95={stats['p95_ms']:8.1f} ms  queries={stats['queries_median']:<5} "
+                            f"rss={stats['peak_rss_kb'] // 1024} MB"
+                            + (f"  failures={stats['failures']}" if stats["failures"] else "")
+                        )
+                    transaction.set_rollback(True)
+
+        output = json.dumps(run, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(output + "\n")
+            self.stderr.write(f"Wrote {options['output']}")
+        else:
+            self.stdout.write(output)
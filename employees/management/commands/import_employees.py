@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.importer import import_employees, IMPORT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Bulk import employees from an .xlsx/.xls/.csv file and print a per-row error report"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Spreadsheet with first_name, email, ... columns")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        try:
+            with open(path, "rb") as fh:
+                result = import_employees(fh, path, batch_size=options["batch_size"])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for row_number, errors in result.errors:
+            self.stderr.write(f"  Row {row_number}: {'; '.join(errors)}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} of {result.total} rows ({len(result.errors)} rejected)."
+        ))
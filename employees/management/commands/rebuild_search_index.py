@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from employees.search import fts_enabled, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the employee search index from scratch (e.g. after raw SQL edits or bulk loads)"
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index()
+        backend = "FTS5" if fts_enabled() else "trigram"
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt ({backend}): {indexed} employees indexed."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from employees.history import refresh_due_compensation
+
+
+class Command(BaseCommand):
+    help = "Point each employee at the compensation in force today (run daily, e.g. from cron, so hikes start on time)"
+
+    def handle(self, *args, **options):
+        moved = refresh_due_compensation()
+        self.stdout.write(self.style.SUCCESS(f"Current compensation refreshed: {moved} employee(s) updated."))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0002_employee_employee_code'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['-created_at', '-id'], name='employee_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:56
+
+import re
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def normalize_contacts(apps, schema_editor):
+    """
+    Trim emails and strip separators from phones (blank -> NULL). Completed employees that
+    already share an email or phone stop the migration with a list of the conflicting rows:
+    which record is right is HR's call, so none is changed here. Fix those records (or mark
+    the duplicates as drafts) and run ``migrate`` again.
+    """
+    Employee = apps.get_model('employees', 'Employee')
+    email_owner, phone_owner = {}, {}
+    conflicts, updates = [], []
+
+    for emp in Employee.objects.order_by('created_at', 'id'):
+        email = (emp.email or "").strip()
+        phone = re.sub(r"[\s\-().]", "", emp.phone or "") or None
+
+        if not emp.is_draft:
+            if email.lower() in email_owner:
+                conflicts.append(f"  #{emp.pk} {emp.first_name}: email {email!r} is also used by #{email_owner[email.lower()]}")
+            else:
+                email_owner[email.lower()] = emp.pk
+            if phone and phone in phone_owner:
+                conflicts.append(f"  #{emp.pk} {emp.first_name}: phone {phone!r} is also used by #{phone_owner[phone]}")
+            elif phone:
+                phone_owner[phone] = emp.pk
+
+        if (email, phone) != (emp.email, emp.phone):
+            updates.append((emp.pk, email, phone))
+
+    if conflicts:
+        raise RuntimeError(
+            "Completed employees share an email or phone number; resolve these before migrating:\n"
+            + "\n".join(conflicts)
+        )
+    for pk, email, phone in updates:
+        Employee.objects.filter(pk=pk).update(email=email, phone=phone)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0003_employee_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_contacts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='employee_email_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['phone'], name='employee_phone_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='employee',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), condition=models.Q(('is_draft', False)), name='unique_completed_employee_email', violation_error_message='Email already exists.'),
+        ),
+        migrations.AddConstraint(
+            model_name='employee',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_draft', False)), fields=('phone',), name='unique_completed_employee_phone', violation_error_message='Phone number already exists.'),
+        ),
+    ]
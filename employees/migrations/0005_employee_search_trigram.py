@@ -0,0 +1,55 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:57
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copies of the employees.search helpers as of this migration
+SEARCH_FIELDS = ("employee_code", "phone", "first_name", "last_name", "email")
+
+
+def employee_trigrams(values):
+    trigrams = {}
+    for value in values:
+        value = re.sub(r"\s+", " ", str(value or "").strip().lower())
+        for pos in range(len(value) - 2):
+            tri = value[pos:pos + 3]
+            if tri not in trigrams or pos < trigrams[tri]:
+                trigrams[tri] = pos
+    return trigrams
+
+
+def build_index(apps, schema_editor):
+    Employee = apps.get_model('employees', 'Employee')
+    EmployeeSearchTrigram = apps.get_model('employees', 'EmployeeSearchTrigram')
+    rows = [
+        EmployeeSearchTrigram(employee_id=emp.pk, trigram=tri, position=min(pos, 32767))
+        for emp in Employee.objects.only(*SEARCH_FIELDS).iterator()
+        for tri, pos in employee_trigrams(getattr(emp, f) for f in SEARCH_FIELDS).items()
+    ]
+    EmployeeSearchTrigram.objects.bulk_create(rows, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0004_email_phone_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeSearchTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_trigrams', to='employees.employee')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['trigram', 'employee'], name='employee_trigram_idx')],
+                'constraints': [models.UniqueConstraint(fields=('employee', 'trigram'), name='unique_employee_trigram')],
+            },
+        ),
+        migrations.RunPython(build_index, migrations.RunPython.noop),
+    ]
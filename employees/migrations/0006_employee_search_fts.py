@@ -0,0 +1,67 @@
+import re
+
+from django.db import migrations, OperationalError
+
+FTS_TABLE = "employees_search_fts"
+# Frozen copy of employees.search.SEARCH_FIELDS as of this migration
+SEARCH_FIELDS = ("employee_code", "phone", "first_name", "last_name", "email")
+
+
+def create_fts_index(apps, schema_editor):
+    """SQLite builds with FTS5 get a trigram full-text table; other databases keep the trigram model."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    cursor = schema_editor.connection.cursor()
+    try:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(code, phone, name, email, tokenize='trigram')"
+        )
+    except OperationalError:
+        return  # no FTS5 / trigram tokenizer in this SQLite build
+
+    normalize = lambda value: " ".join(str(value or "").lower().split())
+    Employee = apps.get_model('employees', 'Employee')
+    cursor.executemany(
+        f"INSERT INTO {FTS_TABLE} (rowid, code, phone, name, email) VALUES (%s, %s, %s, %s, %s)",
+        [
+            (emp.pk, normalize(emp.employee_code), normalize(emp.phone),
+             normalize(f"{emp.first_name or ''} {emp.last_name or ''}"), normalize(emp.email))
+            for emp in Employee.objects.iterator()
+        ],
+    )
+    # Only the active backend is maintained: the trigram rows would go stale from here on
+    apps.get_model('employees', 'EmployeeSearchTrigram').objects.all().delete()
+
+
+def drop_fts_index(apps, schema_editor):
+    """Back to the trigram backend: drop the FTS table and rebuild the trigram rows it replaced."""
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.connection.cursor().execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+    Employee = apps.get_model('employees', 'Employee')
+    EmployeeSearchTrigram = apps.get_model('employees', 'EmployeeSearchTrigram')
+    rows = []
+    for emp in Employee.objects.only(*SEARCH_FIELDS).iterator():
+        trigrams = {}
+        for value in (getattr(emp, f) for f in SEARCH_FIELDS):
+            value = re.sub(r"\s+", " ", str(value or "").strip().lower())
+            for pos in range(len(value) - 2):
+                tri = value[pos:pos + 3]
+                if tri not in trigrams or pos < trigrams[tri]:
+                    trigrams[tri] = pos
+        rows.extend(EmployeeSearchTrigram(employee_id=emp.pk, trigram=tri, position=min(pos, 32767))
+                    for tri, pos in trigrams.items())
+    EmployeeSearchTrigram.objects.all().delete()
+    EmployeeSearchTrigram.objects.bulk_create(rows, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0005_employee_search_trigram'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0006_employee_search_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompensationRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('offer', 'Offer Letter'), ('hike', 'Hike Letter')], max_length=10)),
+                ('effective_date', models.DateField()),
+                ('ctc_per_annum', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('variable_pay_per_annum', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('employee_code', models.CharField(blank=True, max_length=20, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='compensation_history', to='employees.employee')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='current_compensation',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='employees.compensationrecord'),
+        ),
+        migrations.AddIndex(
+            model_name='compensationrecord',
+            index=models.Index(fields=['employee', 'effective_date', 'id'], name='compensation_effective_idx'),
+        ),
+    ]
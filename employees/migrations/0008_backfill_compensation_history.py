@@ -0,0 +1,51 @@
+from decimal import Decimal
+
+from django.db import migrations
+
+
+def backfill(apps, schema_editor):
+    """One offer record per offer letter and one hike record per hike letter, then the current pointer."""
+    Employee = apps.get_model('employees', 'Employee')
+    CompensationRecord = apps.get_model('employees', 'CompensationRecord')
+    OfferLetter = apps.get_model('offerletters', 'OfferLetter')
+    HikeLetter = apps.get_model('hikeletters', 'HikeLetter')
+
+    records = []
+    for offer in OfferLetter.objects.select_related('employee').order_by('id').iterator():
+        emp = offer.employee
+        ctc = emp.package_per_annum or (emp.package_per_month or Decimal('0')) * 12
+        records.append(CompensationRecord(
+            employee=emp, source='offer', effective_date=offer.offer_date or offer.date_created.date(),
+            ctc_per_annum=ctc, variable_pay_per_annum=offer.variable_pay_per_annum or 0,
+            employee_code=offer.employee_code,
+        ))
+    for hike in HikeLetter.objects.order_by('id').iterator():
+        records.append(CompensationRecord(
+            employee_id=hike.employee_id, source='hike', effective_date=hike.hike_start_date,
+            ctc_per_annum=hike.new_package, employee_code=hike.employee_code,
+        ))
+    CompensationRecord.objects.bulk_create(records, batch_size=1000)
+
+    latest = {}
+    for pk, employee_id in CompensationRecord.objects.order_by('effective_date', 'id').values_list('pk', 'employee_id'):
+        latest[employee_id] = pk
+    for employee_id, pk in latest.items():
+        Employee.objects.filter(pk=employee_id).update(current_compensation_id=pk)
+
+
+def unfill(apps, schema_editor):
+    apps.get_model('employees', 'Employee').objects.update(current_compensation=None)
+    apps.get_model('employees', 'CompensationRecord').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0007_compensation_history'),
+        ('offerletters', '0007_offerletter_pdf_file'),
+        ('hikeletters', '0004_hikeletter_pdf_file'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, unfill),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:48
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def supersede_and_repoint(apps, schema_editor):
+    """
+    Hike records that no longer match the employee's (single, overwritten) hike letter are
+    superseded, and every pointer moves to the record in force today instead of the latest.
+    """
+    Employee = apps.get_model('employees', 'Employee')
+    CompensationRecord = apps.get_model('employees', 'CompensationRecord')
+    HikeLetter = apps.get_model('hikeletters', 'HikeLetter')
+
+    now = timezone.now()
+    letters = {
+        employee_id: (start, package)
+        for employee_id, start, package in HikeLetter.objects.values_list('employee_id', 'hike_start_date', 'new_package')
+    }
+    retired = [
+        pk for pk, employee_id, start, ctc in CompensationRecord.objects.filter(source='hike')
+        .values_list('pk', 'employee_id', 'effective_date', 'ctc_per_annum').iterator()
+        if letters.get(employee_id) != (start, ctc)
+    ]
+    for offset in range(0, len(retired), 500):
+        CompensationRecord.objects.filter(pk__in=retired[offset:offset + 500]).update(superseded_at=now)
+
+    today = timezone.localdate()
+    current = {}
+    for pk, employee_id in (CompensationRecord.objects.filter(superseded_at__isnull=True, effective_date__lte=today)
+                            .order_by('effective_date', 'id').values_list('pk', 'employee_id')):
+        current[employee_id] = pk
+    Employee.objects.update(current_compensation=None)
+    for employee_id, pk in current.items():
+        Employee.objects.filter(pk=employee_id).update(current_compensation_id=pk)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0008_backfill_compensation_history'),
+        ('hikeletters', '0004_hikeletter_pdf_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='compensationrecord',
+            name='superseded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(supersede_and_repoint, migrations.RunPython.noop),
+    ]
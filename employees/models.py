@@ -1,4 +1,30 @@
+import re
+
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+
+def normalize_phone(phone):
+    """Strip spaces, dashes, dots and brackets so '98765 43210' and '98765-43210' compare equal."""
+    phone = re.sub(r"[\s\-().]", "", phone or "")
+    return phone or None
+
+
+class EmployeeQuerySet(models.QuerySet):
+    # Both lookups hit the functional / phone indexes below instead of an iexact table scan
+    def with_email(self, email):
+        return self.alias(email_lower=Lower("email")).filter(email_lower=(email or "").strip().lower())
+
+    def with_phone(self, phone):
+        return self.filter(phone=normalize_phone(phone))
+
+
+class CompensationRecordQuerySet(models.QuerySet):
+    def active(self):
+        """Records still standing — not superseded by a regenerated letter."""
+        return self.filter(superseded_at__isnull=True)
+
 
 # Create your models here.
 class Employee(models.Model):
@@ -14,6 +40,94 @@ class Employee(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     employee_code = models.CharField(max_length=20, blank=True, null=True)  # NEW FIELD
+    # Denormalized pointer to the CompensationRecord in force today (maintained by employees.history)
+    current_compensation = models.ForeignKey(
+        "CompensationRecord", on_delete=models.SET_NULL, null=True, blank=True, related_name="+",
+    )
+
+    objects = EmployeeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="employee_created_id_idx"),  # list keyset pagination
+            models.Index(Lower("email"), name="employee_email_lower_idx"),
+            models.Index(fields=["phone"], name="employee_phone_idx"),
+        ]
+        constraints = [
+            # Drafts may repeat; completed employees may not (same rule add_employee applies)
+            models.UniqueConstraint(
+                Lower("email"), condition=Q(is_draft=False), name="unique_completed_employee_email",
+                violation_error_message="Email already exists.",
+            ),
+            models.UniqueConstraint(
+                fields=["phone"], condition=Q(is_draft=False), name="unique_completed_employee_phone",
+                violation_error_message="Phone number already exists.",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.email = (self.email or "").strip()
+        self.phone = normalize_phone(self.phone)
+        super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"{self.first_name} ({'Draft' if self.is_draft else 'Completed'})"
\ No newline at end of file
+        return f"{self.first_name} ({'Draft' if self.is_draft else 'Completed'})"
+
+    @property
+    def current_ctc(self):
+        """Annual CTC in force per the compensation history; the profile package when there is none."""
+        if self.current_compensation_id:
+            return self.current_compensation.ctc_per_annum
+        return self.package_per_annum
+
+
+class CompensationRecord(models.Model):
+    """
+    Append-only compensation history: one row per offer / hike that set an employee's CTC,
+    effective from ``effective_date``. Rows are never updated, except that a record replaced
+    by a regenerated letter gets ``superseded_at``; see employees/history.py.
+    """
+    OFFER = "offer"
+    HIKE = "hike"
+    SOURCE_CHOICES = [
+        (OFFER, "Offer Letter"),
+        (HIKE, "Hike Letter"),
+    ]
+
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="compensation_history")
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES)
+    effective_date = models.DateField()
+    ctc_per_annum = models.DecimalField(max_digits=12, decimal_places=2)
+    variable_pay_per_annum = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    employee_code = models.CharField(max_length=20, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    superseded_at = models.DateTimeField(blank=True, null=True)
+
+    objects = CompensationRecordQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["employee", "effective_date", "id"], name="compensation_effective_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.employee.first_name}: {self.ctc_per_annum} from {self.effective_date} ({self.source})"
+
+
+class EmployeeSearchTrigram(models.Model):
+    """
+    Search index row: one per distinct 3-character slice of an employee's code, phone,
+    name and email (lower-cased). ``position`` is the earliest offset the slice occurs at,
+    so prefix matches rank first. Maintained by employees.search via signals.
+    """
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="search_trigrams")
+    trigram = models.CharField(max_length=3)
+    position = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["employee", "trigram"], name="unique_employee_trigram"),
+        ]
+        indexes = [
+            models.Index(fields=["trigram", "employee"], name="employee_trigram_idx"),
+        ]
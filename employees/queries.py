@@ -0,0 +1,88 @@
+# employees/queries.py — annotated employee querysets shared by the list page and reports
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.db.models import Case, CharField, Exists, F, OuterRef, Prefetch, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from offerletters.models import OfferLetter
+from hikeletters.models import HikeLetter
+from releaving.models import ReleavingLetter
+
+
+def annotate_latest_letters(queryset):
+    """
+    Annotate each employee with their latest offer / hike / relieving data and a ``status``
+    (draft / active / relieved / joined) using correlated subqueries — no per-row queries.
+    "Latest" matches the old ``.last()`` calls on the related managers (highest id).
+    ``ctc_per_annum`` is the current CTC, read through the ``current_compensation`` join.
+    """
+    latest_offer = OfferLetter.objects.filter(employee=OuterRef("pk")).order_by("-id")
+    latest_rel = ReleavingLetter.objects.filter(employee=OuterRef("pk")).order_by("-id")
+    latest_hike = HikeLetter.objects.filter(employee=OuterRef("pk")).order_by("-id")
+
+    return queryset.annotate(
+        latest_offer_date=Subquery(latest_offer.values("offer_date")[:1]),
+        has_relieving=Exists(latest_rel),
+        relieving_date=Subquery(latest_rel.values("releaving_date")[:1]),
+        relieving_company=Subquery(latest_rel.values("placed_in_company")[:1]),
+        latest_hike_package=Subquery(latest_hike.values("new_package")[:1]),
+        latest_hike_date=Subquery(latest_hike.values("date")[:1]),
+        ctc_per_annum=Coalesce(F("current_compensation__ctc_per_annum"), F("package_per_annum")),
+    ).annotate(
+        status=Case(
+            When(Q(has_relieving=True) & Q(relieving_company__gt=""), then=Value("joined")),
+            When(has_relieving=True, then=Value("relieved")),
+            When(is_draft=True, then=Value("draft")),
+            default=Value("active"),
+            output_field=CharField(),
+        ),
+    )
+
+
+def with_letter_status(queryset):
+    """
+    Latest-letter annotations plus offer letters prefetched newest first into ``latest_offers``
+    (the list page needs the FileField). The whole page renders in a fixed number of queries.
+    """
+    return annotate_latest_letters(queryset).prefetch_related(
+        Prefetch("offerletter_set", queryset=OfferLetter.objects.order_by("-id"), to_attr="latest_offers")
+    )
+
+
+# -------------------------------
+# KEYSET PAGINATION — newest first on (created_at, id)
+# -------------------------------
+def encode_cursor(employee):
+    raw = f"{employee.created_at.isoformat()}|{employee.id}"
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return (created_at, id) from a cursor, or None when missing / tampered."""
+    if not cursor:
+        return None
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def keyset_page(queryset, cursor=None, page_size=50):
+    """
+    One page of employees strictly after ``cursor`` in (-created_at, -id) order.
+    Seeks straight to the cursor via the (created_at, id) index, so page 500 costs the same as page 1.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    queryset = queryset.order_by("-created_at", "-id")
+    position = decode_cursor(cursor)
+    if position:
+        created_at, pk = position
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    rows = list(queryset[:page_size + 1])
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
@@ -0,0 +1,176 @@
+# employees/reports.py — employee master report rows + streaming exports
+
+import csv
+import tempfile
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+try:  # Parquet export is optional
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+COLUMN_MAPPING = [
+    ("emp_code", "Emp Code"),
+    ("full_name", "Full Name"),
+    ("email", "Email"),
+    ("phone", "Phone"),
+    ("designation", "Designation"),
+    ("ctc_annual", "CTC (Annual)"),
+    ("ctc_monthly", "CTC (Monthly)"),
+    ("offer_date", "Offer Date"),
+    ("latest_hike", "Latest Hike"),
+    ("hike_date", "Hike Date"),
+    ("relieving_date", "Relieving Date"),
+    ("status", "Status"),
+    ("created", "Created"),
+]
+
+COLUMN_KEYS = {key for key, _ in COLUMN_MAPPING}
+
+EXPORT_CHUNK_SIZE = 2000
+SPOOL_MAX_SIZE = 10 * 1024 * 1024  # spill to disk beyond 10 MB
+MAX_COLUMN_WIDTH = 50
+
+
+def select_columns(param):
+    """
+    Project COLUMN_MAPPING onto a comma separated ``?columns=`` value (original order kept).
+    Empty means every column; unknown keys raise ValueError.
+    """
+    if not param:
+        return COLUMN_MAPPING
+    wanted = {key.strip() for key in param.split(",") if key.strip()}
+    unknown = wanted - COLUMN_KEYS
+    if unknown:
+        raise ValueError(f"Unknown column(s): {', '.join(sorted(unknown))}")
+    return [(key, label) for key, label in COLUMN_MAPPING if key in wanted]
+
+
+def master_report_row(emp):
+    """One report row from an employee annotated by ``queries.annotate_latest_letters``."""
+    full_name = f"{emp.first_name or ''} {emp.last_name or ''}".strip() or "—"
+    original_ctc = emp.ctc_per_annum or 0
+    ctc_annual_display = f"₹{original_ctc:,.0f}"
+    ctc_monthly_display = f"₹{original_ctc / 12:,.0f}" if original_ctc else "₹0"
+    latest_hike_amount = "-"
+    hike_date_str = "-"
+
+    if emp.latest_hike_package:
+        latest_hike_amount = f"₹{emp.latest_hike_package:,.0f}"
+        hike_date_str = emp.latest_hike_date.strftime("%d-%b-%Y") if emp.latest_hike_date else "-"
+
+    offer_date = emp.latest_offer_date.strftime("%d-%b-%Y") if emp.latest_offer_date else "-"
+    relieving_date = emp.relieving_date.strftime("%d-%b-%Y") if emp.relieving_date else "-"
+    placed_in = emp.relieving_company or "-"
+
+    status = "Draft" if emp.is_draft else "Active"
+    if emp.has_relieving:
+        status = f"Relieved to {placed_in}" if placed_in != "-" else "Relieved"
+
+    return {
+        "emp_code": emp.employee_code or "-",
+        "full_name": full_name,
+        "email": emp.email or "-",
+        "phone": emp.phone or "-",
+        "designation": emp.designation or "-",
+        "ctc_annual": ctc_annual_display,
+        "ctc_monthly": ctc_monthly_display,
+        "offer_date": offer_date,
+        "latest_hike": latest_hike_amount,
+        "hike_date": hike_date_str,
+        "relieving_date": relieving_date,
+        "status": status,
+        "created": emp.created_at.strftime("%d-%b-%Y %I:%M %p"),
+    }
+
+
+def iter_master_report(employees, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield report rows one by one; the queryset is read in chunks, never materialized."""
+    for emp in employees.iterator(chunk_size=chunk_size):
+        yield master_report_row(emp)
+
+
+def excel_master_report(rows, columns=COLUMN_MAPPING):
+    """
+    Write ``rows`` to an .xlsx held in a spooled temp file and return it rewound.
+
+    openpyxl's write-only mode emits column widths before the first row, so rows are
+    first streamed into a spooled CSV buffer while widths are tracked, then replayed
+    into the workbook. Memory stays flat however many employees there are.
+    """
+    keys = [key for key, _ in columns]
+    labels = [label for _, label in columns]
+    widths = [len(label) for label in labels]
+
+    buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode="w+", newline="", encoding="utf-8")
+    writer = csv.writer(buffer)
+    for row in rows:
+        values = [str(row[key]) for key in keys]
+        for i, value in enumerate(values):
+            if len(value) > widths[i]:
+                widths[i] = len(value)
+        writer.writerow(values)
+    buffer.seek(0)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Employees")
+    for i, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(i)].width = min(width + 5, MAX_COLUMN_WIDTH)
+    ws.append(labels)
+    for values in csv.reader(buffer):
+        ws.append(values)
+    buffer.close()
+
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    wb.save(output)
+    output.seek(0)
+    return output
+
+
+class _Echo:
+    """File-like object whose write() hands the line back, for csv.writer + StreamingHttpResponse."""
+    def write(self, value):
+        return value
+
+
+def csv_master_report(rows, columns=COLUMN_MAPPING):
+    """Yield CSV lines (header first) — meant for StreamingHttpResponse."""
+    keys = [key for key, _ in columns]
+    writer = csv.writer(_Echo())
+    yield "\ufeff" + writer.writerow([label for _, label in columns])  # BOM so Excel reads ₹ correctly
+    for row in rows:
+        yield writer.writerow([row[key] for key in keys])
+
+
+def parquet_available():
+    return pq is not None
+
+
+def parquet_master_report(rows, columns=COLUMN_MAPPING, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Write ``rows`` to a Parquet file (one row group per chunk) in a spooled temp file.
+    Requires pyarrow — check ``parquet_available()`` first.
+    """
+    keys = [key for key, _ in columns]
+    schema = pa.schema([(label, pa.string()) for _, label in columns])
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+
+    with pq.ParquetWriter(output, schema) as writer:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                writer.write_table(_parquet_table(chunk, keys, schema))
+                chunk = []
+        if chunk:
+            writer.write_table(_parquet_table(chunk, keys, schema))
+
+    output.seek(0)
+    return output
+
+
+def _parquet_table(chunk, keys, schema):
+    return pa.Table.from_arrays([pa.array([row[key] for row in chunk], pa.string()) for key in keys], schema=schema)
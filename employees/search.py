@@ -0,0 +1,206 @@
+# employees/search.py — search index for employee lookup by code, phone, name and email
+
+"""
+Two interchangeable backends behind one API (``index_employees`` / ``remove_employees`` /
+``matching_ids`` / ``search_employees``):
+
+* SQLite with FTS5 — an ``employees_search_fts`` virtual table (trigram tokenizer, rowid =
+  employee id) created by migration 0006 when the build supports it. Ranked with bm25,
+  code and phone weighted above name and email.
+* Anything else — the portable EmployeeSearchTrigram table: one row per distinct 3-character
+  slice of each field. A query matches employees holding *all* of its trigrams, found through
+  the (trigram, employee) index; earlier (prefix) matches rank first.
+
+Only the active backend is kept in sync, by the signals in employees/signals.py: with FTS5
+the trigram table stays empty (migration 0006 clears it, and reversing 0006 rebuilds it).
+After moving the data to another backend any other way, run ``manage.py rebuild_search_index``.
+Trigrams only shortlist candidates, so that path keeps the employees whose fields really
+contain the query (``icontains``), not just all of its trigrams somewhere.
+"""
+
+import re
+
+from django.db import connection, transaction
+from django.db.models import Count, Min, Q, Sum, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce, Concat
+
+from .models import Employee, EmployeeSearchTrigram
+
+MIN_QUERY_LENGTH = 2
+SEARCH_FIELDS = ("employee_code", "phone", "first_name", "last_name", "email")
+FTS_TABLE = "employees_search_fts"
+
+_fts_enabled = {}
+
+
+def normalize(text):
+    return re.sub(r"\s+", " ", str(text or "").strip().lower())
+
+
+def employee_trigrams(values):
+    """{trigram: earliest position} over the given field values."""
+    trigrams = {}
+    for value in values:
+        value = normalize(value)
+        for pos in range(len(value) - 2):
+            tri = value[pos:pos + 3]
+            if tri not in trigrams or pos < trigrams[tri]:
+                trigrams[tri] = pos
+    return trigrams
+
+
+def fts_enabled():
+    """True when the FTS5 table exists on the default database (checked once per process)."""
+    if connection.alias not in _fts_enabled:
+        _fts_enabled[connection.alias] = (
+            connection.vendor == "sqlite" and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_enabled[connection.alias]
+
+
+def _fts_row(emp):
+    return (
+        emp.pk,
+        normalize(emp.employee_code),
+        normalize(emp.phone),
+        normalize(f"{emp.first_name or ''} {emp.last_name or ''}"),
+        normalize(emp.email),
+    )
+
+
+# -------------------------------
+# INDEX MAINTENANCE
+# -------------------------------
+def remove_employees(employee_ids):
+    employee_ids = list(employee_ids)
+    if not employee_ids or not fts_enabled():
+        return  # trigram rows go with the employee through the FK cascade
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(employee_ids))})", employee_ids
+        )
+
+
+def index_employees(employees):
+    """(Re)build index rows for the given saved employees."""
+    employees = list(employees)
+    if not employees:
+        return
+
+    with transaction.atomic():
+        if fts_enabled():
+            remove_employees(emp.pk for emp in employees)
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f"INSERT INTO {FTS_TABLE} (rowid, code, phone, name, email) VALUES (%s, %s, %s, %s, %s)",
+                    [_fts_row(emp) for emp in employees],
+                )
+            return
+
+        rows = [
+            EmployeeSearchTrigram(employee_id=emp.pk, trigram=tri, position=min(pos, 32767))
+            for emp in employees
+            for tri, pos in employee_trigrams(getattr(emp, f) for f in SEARCH_FIELDS).items()
+        ]
+        EmployeeSearchTrigram.objects.filter(employee_id__in=[emp.pk for emp in employees]).delete()
+        EmployeeSearchTrigram.objects.bulk_create(rows, batch_size=2000)
+
+
+def rebuild_index(chunk_size=2000):
+    """Re-index every employee; returns how many the active index (FTS5 or trigram table) now holds."""
+    if fts_enabled():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    EmployeeSearchTrigram.objects.all().delete()   # inactive with FTS5, so never left stale
+
+    batch = []
+    for emp in Employee.objects.only(*SEARCH_FIELDS).iterator(chunk_size=chunk_size):
+        batch.append(emp)
+        if len(batch) >= chunk_size:
+            index_employees(batch)
+            batch = []
+    index_employees(batch)
+
+    if fts_enabled():
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {FTS_TABLE}")
+            return cursor.fetchone()[0]
+    return EmployeeSearchTrigram.objects.values("employee_id").distinct().count()
+
+
+# -------------------------------
+# QUERYING
+# -------------------------------
+def _fts_sql(query, limit=None, ranked=True):
+    """(sql, params) selecting the rowids (employee ids) of FTS hits, best first when ``ranked``."""
+    if len(query) < 3:
+        # trigram tokenizer cannot MATCH two characters; LIKE over the FTS content is still cheap
+        pattern = "%" + re.sub(r"([\\%_])", r"\\\1", query) + "%"
+        where = " OR ".join(f"{col} LIKE %s ESCAPE '\\'" for col in ("code", "phone", "name", "email"))
+        params = [pattern] * 4
+        sql = f"SELECT rowid FROM {FTS_TABLE} WHERE {where}"
+    else:
+        params = ['"' + query.replace('"', '""') + '"']
+        sql = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+        if ranked:
+            sql += f" ORDER BY bm25({FTS_TABLE}, 4.0, 4.0, 2.0, 1.0)"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    return sql, params
+
+
+def _fts_matching_ids(query, limit=None):
+    with connection.cursor() as cursor:
+        cursor.execute(*_fts_sql(query, limit))
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _trigram_matching_ids(query):
+    if len(query) < 3:
+        rows = EmployeeSearchTrigram.objects.filter(trigram__gte=query, trigram__lt=query + "\uffff")
+        return rows.values("employee_id").annotate(score=Min("position")).order_by("score", "-employee_id")
+
+    wanted = set(employee_trigrams([query]))
+    return (
+        EmployeeSearchTrigram.objects.filter(trigram__in=wanted)
+        .alias(name=Concat(
+            Coalesce("employee__first_name", Value("")), Value(" "), Coalesce("employee__last_name", Value("")),
+        ))
+        .filter(
+            # the trigrams may be spread over several fields or out of order: keep real substrings only
+            Q(employee__employee_code__icontains=query) | Q(employee__phone__icontains=query)
+            | Q(name__icontains=query) | Q(employee__email__icontains=query)
+        )
+        .values("employee_id")
+        .annotate(hits=Count("id"), score=Sum("position"))
+        .filter(hits=len(wanted))
+        .order_by("score", "-employee_id")
+    )
+
+
+def matching_ids(query):
+    """
+    Every employee id whose indexed fields contain ``query`` as a subquery — raw SQL over
+    the FTS5 table or a ``values('employee_id')`` queryset (trigram table) — for ``id__in``,
+    so no id list ever goes through Python. None when the query is too short to search.
+    """
+    query = normalize(query)
+    if len(query) < MIN_QUERY_LENGTH:
+        return None
+    if fts_enabled():
+        return RawSQL(*_fts_sql(query, ranked=False))
+    return _trigram_matching_ids(query).values("employee_id")
+
+
+def search_employees(query, limit=20):
+    """Ranked employees for ``query`` (best first), at most ``limit``."""
+    query = normalize(query)
+    if len(query) < MIN_QUERY_LENGTH:
+        return []
+    if fts_enabled():
+        ids = _fts_matching_ids(query, limit)
+    else:
+        ids = [row["employee_id"] for row in _trigram_matching_ids(query)[:limit]]
+    by_id = Employee.objects.in_bulk(ids)
+    return [by_id[pk] for pk in ids if pk in by_id]
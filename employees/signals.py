@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Employee
+from .search import SEARCH_FIELDS, index_employees, remove_employees
+
+
+@receiver(post_save, sender=Employee)
+def reindex_employee(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(SEARCH_FIELDS):
+        return
+    index_employees([instance])
+
+
+@receiver(post_delete, sender=Employee)
+def unindex_employee(sender, instance, **kwargs):
+    remove_employees([instance.pk])
@@ -1,3 +1,358 @@
-from django.test import TestCase
+import io
+from importlib import import_module
+import tempfile
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from unittest import mock, skipUnless
+from openpyxl import load_workbook
+
+from hikeletters.models import HikeLetter
+from jobs.queue import submit
+from offerletters.models import OfferLetter
+from releaving.models import ReleavingLetter
+from .history import compensation_on, ctc_before, record_compensation, refresh_due_compensation
+from .models import CompensationRecord, Employee, EmployeeSearchTrigram
+from .queries import annotate_latest_letters
+from .reports import parquet_available
+from .search import fts_enabled, index_employees, rebuild_index, search_employees
+
+
+def make_employees(count, start=0):
+    for i in range(start, start + count):
+        emp = Employee.objects.create(
+            first_name=f"Emp{i}", last_name="Test", email=f"emp{i}@example.com",
+            phone=f"90000{i:05d}", designation="Developer", package_per_annum=600000, is_draft=False,
+            employee_code=f"STPL0125{i:03d}",
+        )
+        OfferLetter.objects.create(
+            employee=emp, offer_date=date(2025, 1, 1), employee_code=f"STPL0125{i:03d}",
+            series_number=i, file=f"offer_letters/Offer_{i}.docx",
+        )
+        HikeLetter.objects.create(
+            employee=emp, date=date(2025, 6, 1), hike_start_date=date(2025, 7, 1),
+            employee_code=f"STPL0125{i:03d}", old_package=600000, new_package=700000,
+        )
+        if i % 2:
+            ReleavingLetter.objects.create(
+                employee=emp, releaving_date=date(2025, 9, 30),
+                placed_in_company="Acme" if i % 4 == 1 else None,
+            )
+
+
+class EmployeeListTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("hr", password="pass")
+        self.client.force_login(user)
+
+    def list_query_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("employees:employee_list"))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_is_constant(self):
+        self.client.get(reverse("accounts:dashboard"))   # session loaded and activity stamped up front
+        make_employees(3)
+        small, _ = self.list_query_count()
+        make_employees(20, start=3)
+        large, response = self.list_query_count()
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.context["employees"]), 23)
+
+    def test_status_annotations(self):
+        make_employees(4)
+        _, response = self.list_query_count()
+        status = {emp.first_name: emp.status for emp in response.context["employees"]}
+        self.assertEqual(status, {"Emp0": "active", "Emp1": "joined", "Emp2": "active", "Emp3": "relieved"})
+
+    def test_keyset_pagination_and_status_filter(self):
+        make_employees(7)
+        url = reverse("employees:employee_list")
+
+        seen = []
+        response = self.client.get(url, {"page_size": 3})
+        while True:
+            seen += [emp.first_name for emp in response.context["employees"]]
+            cursor = response.context["next_cursor"]
+            if not cursor:
+                break
+            response = self.client.get(url, {"page_size": 3, "after": cursor})
+        self.assertEqual(seen, [f"Emp{i}" for i in reversed(range(7))])
+
+        response = self.client.get(url, {"status": "relieved"})
+        self.assertEqual([emp.first_name for emp in response.context["employees"]], ["Emp3"])
+
+
+class MasterReportTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("hr", password="pass"))
+
+    def test_excel_download(self):
+        make_employees(5)
+        response = self.client.get(reverse("employees:employee_master_report"), {"download": 1})
+        self.assertEqual(response.status_code, 200)
+
+        workbook = load_workbook(io.BytesIO(b"".join(response.streaming_content)), read_only=True)
+        rows = list(workbook["Employees"].values)
+        self.assertEqual(rows[0][:3], ("Emp Code", "Full Name", "Email"))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][0], "STPL0125004")
+
+    def test_csv_download_with_column_projection(self):
+        make_employees(3)
+        url = reverse("employees:employee_master_report")
+        response = self.client.get(url, {"download": "csv", "columns": "full_name,emp_code"})
+        lines = b"".join(response.streaming_content).decode("utf-8-sig").splitlines()
+        self.assertEqual(lines[0], "Emp Code,Full Name")
+        self.assertEqual(lines[1], "STPL0125002,Emp2 Test")
+        self.assertEqual(len(lines), 4)
+
+        response = self.client.get(url, {"download": "csv", "columns": "salary"})
+        self.assertEqual(response.status_code, 400)
+
+    @skipUnless(parquet_available(), "pyarrow not installed")
+    def test_parquet_download(self):
+        import pyarrow.parquet as pq
+
+        make_employees(3)
+        response = self.client.get(
+            reverse("employees:employee_master_report"), {"download": "parquet", "columns": "emp_code,status"}
+        )
+        table = pq.read_table(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(table.column_names, ["Emp Code", "Status"])
+        self.assertEqual(table.num_rows, 3)
+
+    def test_report_query_count_is_constant(self):
+        url = reverse("employees:employee_master_report")
+        self.client.get(reverse("accounts:dashboard"))   # session loaded and activity stamped up front
+        make_employees(2)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url)
+        make_employees(15, start=2)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+        rows = {row["emp_code"]: row for row in response.context["employees"]}
+        self.assertEqual(rows["STPL0125001"]["status"], "Relieved to Acme")
+        self.assertEqual(rows["STPL0125003"]["status"], "Relieved")
+        self.assertEqual(rows["STPL0125002"]["latest_hike"], "₹700,000")
+        self.assertEqual(rows["STPL0125002"]["offer_date"], "01-Jan-2025")
+
+
+class ImportEmployeesTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("hr", password="pass"))
+
+    def test_import_reports_row_errors(self):
+        Employee.objects.create(first_name="Old", email="taken@example.com", phone="9000000001", is_draft=False)
+        sheet = (
+            "First Name,Last Name,Email,Phone,Address,Designation,Package Per Annum,Package Per Month,Is Draft\n"
+            "Asha,K,asha@example.com,9000000002,Pune,Dev,\"6,00,000\",50000,no\n"
+            "Ravi,,TAKEN@example.com,9000000003,Pune,Dev,600000,50000,no\n"
+            "Meena,,asha@example.com,9000000004,Pune,Dev,600000,50000,no\n"
+            "Draft,,draft@example.com,,,,,,yes\n"
+            ",,bad-email,123,,,abc,,no\n"
+        )
+        upload = SimpleUploadedFile("hires.csv", sheet.encode(), content_type="text/csv")
+        response = self.client.post(reverse("employees:import_employees"), {"file": upload})
+
+        result = response.context["result"]
+        self.assertEqual(result.created, 2)
+        errors = dict(result.errors)
+        self.assertEqual(errors[3], ["Email already exists"])
+        self.assertEqual(errors[4], ["Duplicate email in file"])
+        self.assertIn("Invalid email", errors[6])
+        self.assertIn("Invalid package per annum", errors[6])
+        self.assertTrue(Employee.objects.filter(email="draft@example.com", is_draft=True).exists())
+        self.assertEqual(Employee.objects.get(email="asha@example.com").package_per_annum, 600000)
+
+    def test_import_rejects_amounts_the_decimal_fields_cannot_hold(self):
+        sheet = (
+            "First Name,Email,Phone,Address,Designation,Package Per Annum,Package Per Month,Is Draft\n"
+            "Inf,inf@example.com,9000000005,Pune,Dev,inf,50000,no\n"
+            "Big,big@example.com,9000000006,Pune,Dev,123456789012,50000,no\n"
+            "Frac,frac@example.com,9000000007,Pune,Dev,600000.125,50000,no\n"
+            "Fine,fine@example.com,9000000008,Pune,Dev,99999999.99,50000,no\n"
+        )
+        upload = SimpleUploadedFile("hires.csv", sheet.encode(), content_type="text/csv")
+        result = self.client.post(reverse("employees:import_employees"), {"file": upload}).context["result"]
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual(dict(result.errors), {
+            2: ["Invalid package per annum"],
+            3: ["Package per annum must be below 100,000,000"],
+            4: ["Package per annum allows at most 2 decimal places"],
+        })
+        self.assertEqual(self.client.get(reverse("employees:employee_list")).status_code, 200)
+
+
+class EmployeeUniquenessTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("hr", password="pass"))
+        Employee.objects.create(first_name="Asha", email="Asha@Example.com", phone="98765 43210", is_draft=False)
+
+    def test_lookups_are_normalized(self):
+        response = self.client.get(
+            reverse("employees:check_unique_employee"), {"email": " asha@example.COM", "phone": "98765-43210"}
+        )
+        self.assertEqual(response.json(), {"email_exists": True, "phone_exists": True})
+
+    def test_database_rejects_duplicate_completed_employee(self):
+        Employee.objects.create(first_name="Draft", email="asha@example.com", phone="9876543210", is_draft=True)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Employee.objects.create(first_name="Copy", email="ASHA@example.com", is_draft=False)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Employee.objects.create(first_name="Copy", email="other@example.com", phone="987654-3210", is_draft=False)
+
+
+    def test_contact_migration_stops_on_duplicates_instead_of_demoting(self):
+        copy = Employee.objects.create(first_name="Copy", email="copy@example.com", is_draft=False)
+        Employee.objects.filter(pk=copy.pk).update(phone="98765-43210")   # pre-normalization data
+        migration = import_module("employees.migrations.0004_email_phone_lookup_indexes")
+
+        with self.assertRaisesMessage(RuntimeError, f"#{copy.pk} Copy: phone '9876543210' is also used by"):
+            migration.normalize_contacts(apps, None)
+        self.assertEqual(Employee.objects.filter(is_draft=False).count(), 2)
+        self.assertEqual(Employee.objects.get(pk=copy.pk).phone, "98765-43210")
+
+
+class EmployeeSearchTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("hr", password="pass"))
+        make_employees(3)
+        Employee.objects.create(first_name="Priya", last_name="Sharma", email="priya@corp.in",
+                                phone="9123456789", is_draft=False, employee_code="STPL0325042")
+
+    def search(self, q):
+        response = self.client.get(reverse("employees:search_employees"), {"q": q})
+        return [row["name"] for row in response.json()["results"]]
+
+    def test_search_by_name_email_phone_and_code(self):
+        self.assertEqual(self.search("sharm"), ["Priya Sharma"])
+        self.assertEqual(self.search("PRIYA@corp"), ["Priya Sharma"])
+        self.assertEqual(self.search("3456"), ["Priya Sharma"])
+        self.assertEqual(self.search("0325"), ["Priya Sharma"])
+        self.assertEqual(self.search("emp1"), ["Emp1 Test"])
+        self.assertEqual(self.search("x"), [])
+
+    def test_index_follows_edits_and_deletes(self):
+        emp = Employee.objects.get(first_name="Priya")
+        emp.last_name = "Verma"
+        emp.save()
+        self.assertEqual(self.search("sharma"), [])
+        self.assertEqual(self.search("verma"), ["Priya Verma"])
+        emp.delete()
+        self.assertEqual(self.search("verma"), [])
+
+    def test_prefix_matches_rank_first(self):
+        Employee.objects.create(first_name="Ann", last_name="K", email="k1@example.com", is_draft=True)
+        Employee.objects.create(first_name="Mariann", last_name="K", email="k2@example.com", is_draft=True)
+        self.assertEqual(self.search("ann"), ["Ann K", "Mariann K"])
+
+    def test_best_hit_is_ranked_among_all_matches_and_list_filters_in_sql(self):
+        weak = Employee.objects.bulk_create(
+            Employee(first_name=f"W{i}", email=f"w{i}.zorbex@example.com", phone=f"80000{i:05d}") for i in range(600)
+        )
+        strong = Employee.objects.create(first_name="Zorbex", last_name="Zorbex", email="z@corp.in",
+                                         employee_code="ZORBEX01")
+        index_employees(weak)
+        self.assertEqual(self.search("zorbex")[0], "Zorbex Zorbex")   # indexed last, still ranked first
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("employees:employee_list"), {"search": "zorbex", "page_size": 500})
+        self.assertEqual(len(response.context["employees"]), 500)
+        self.assertTrue(all(len(q["sql"]) < 5000 for q in ctx.captured_queries))   # no 601-id IN list
+
+        out = io.StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn(f"{Employee.objects.count()} employees indexed", out.getvalue())
+        self.assertIn(strong.pk, [e.pk for e in search_employees("zorbex")])
+
+
+    def test_trigram_backend_keeps_real_substrings_only(self):
+        Employee.objects.create(first_name="Abcx", last_name="Bcdy", email="ab@example.com")   # abc + bcd, no "abcd"
+        Employee.objects.create(first_name="Zabcd", last_name="K", email="zk@example.com")
+        with mock.patch("employees.search.fts_enabled", return_value=False):
+            rebuild_index()
+            self.assertEqual([e.first_name for e in search_employees("abcd")], ["Zabcd"])
+            self.assertEqual([e.first_name for e in search_employees("sharm")], ["Priya"])
+        if fts_enabled():
+            rebuild_index()
+            self.assertFalse(EmployeeSearchTrigram.objects.exists())   # only the active backend is kept
+
+
+class CompensationHistoryTests(TestCase):
+    def setUp(self):
+        self.emp = Employee.objects.create(
+            first_name="Ravi", email="ravi@example.com", package_per_annum=600000, is_draft=False,
+        )
+
+    def test_history_is_appended_and_current_pointer_follows_latest(self):
+        record_compensation(self.emp, CompensationRecord.OFFER, 600000, date(2025, 1, 1))
+        record_compensation(self.emp, CompensationRecord.HIKE, 700000, date(2025, 7, 1))
+        record_compensation(self.emp, CompensationRecord.HIKE, 700000, date(2025, 7, 1))   # regenerated, unchanged
+        record_compensation(self.emp, CompensationRecord.HIKE, 750000, date(2025, 7, 1))   # regenerated, corrected
+
+        self.assertEqual(
+            list(self.emp.compensation_history.order_by("id").values_list("ctc_per_annum", flat=True)),
+            [600000, 700000, 750000],
+        )
+        emp = Employee.objects.select_related("current_compensation").get(pk=self.emp.pk)
+        self.assertEqual(emp.current_ctc, 750000)
+        with self.assertNumQueries(0):
+            self.assertEqual(compensation_on(emp, date(2025, 8, 1)).ctc_per_annum, 750000)
+        self.assertEqual(compensation_on(emp, date(2025, 6, 30)).ctc_per_annum, 600000)
+        self.assertEqual(ctc_before(emp, date(2025, 7, 1)), 600000)
+
+    def test_future_hike_is_not_current_until_it_starts(self):
+        today = timezone.localdate()
+        starts = today + timedelta(days=40)
+        record_compensation(self.emp, CompensationRecord.OFFER, 600000, today - timedelta(days=200))
+        record_compensation(self.emp, CompensationRecord.HIKE, 700000, starts)
+
+        emp = Employee.objects.select_related("current_compensation").get(pk=self.emp.pk)
+        self.assertEqual(emp.current_ctc, 600000)
+        self.assertEqual(annotate_latest_letters(Employee.objects.all()).get().ctc_per_annum, 600000)
+        self.assertEqual(compensation_on(emp, starts).ctc_per_annum, 700000)
+
+        self.assertEqual(refresh_due_compensation(starts - timedelta(days=1)), 0)
+        self.assertEqual(refresh_due_compensation(starts), 1)
+        self.assertEqual(Employee.objects.select_related("current_compensation").get().current_ctc, 700000)
+
+    @override_settings(JOBS_RUN_ASYNC=False, PDF_CONVERSION_ENABLED=False)
+    def test_regenerated_hike_supersedes_the_previous_hike(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        OfferLetter.objects.create(employee=self.emp, offer_date=date(2025, 1, 1), employee_code="STPL0125001")
+        record_compensation(self.emp, CompensationRecord.OFFER, 600000, date(2025, 1, 1))
+
+        hike = {"employee_id": self.emp.pk, "new_package": "700000"}
+        submit("hike_letter", {**hike, "date_obj": "2025-11-10"}, employee=self.emp)   # starts 1 Dec
+        submit("hike_letter", {**hike, "date_obj": "2025-09-10"}, employee=self.emp)   # corrected: 1 Oct
+
+        self.assertEqual(
+            list(self.emp.compensation_history.active().values_list("source", "effective_date")),
+            [("offer", date(2025, 1, 1)), ("hike", date(2025, 10, 1))],
+        )
+        self.assertEqual(self.emp.compensation_history.filter(superseded_at__isnull=False).get().effective_date,
+                         date(2025, 12, 1))
+        self.assertEqual(HikeLetter.objects.get(employee=self.emp).old_package, 600000)
+        emp = Employee.objects.get(pk=self.emp.pk)
+        self.assertEqual(compensation_on(emp, date(2025, 11, 1)).ctc_per_annum, 700000)
+
+    def test_report_reads_current_ctc(self):
+        self.client.force_login(User.objects.create_user("hr", password="pass"))
+        record_compensation(self.emp, CompensationRecord.HIKE, 720000, date(2025, 7, 1))
+        response = self.client.get(reverse("employees:employee_list"))
+        self.assertContains(response, "₹720000")
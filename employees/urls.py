@@ -3,9 +3,11 @@ from . import views
 app_name="employees"
 urlpatterns = [
     path('add/', views.add_employee, name='add_employee'),
+    path('import/', views.import_employees_view, name='import_employees'),
     path('list/', views.employee_list, name='employee_list'),
     path('edit/<int:id>/', views.edit_employee, name='edit_employee'),
     path('delete/<int:id>/', views.delete_employee, name='delete_employee'),
+    path('search/', views.search_employees_view, name='search_employees'),
     path('check_unique/', views.check_unique_employee, name='check_unique_employee'),
     path('master-report/', views.employee_master_report, name='employee_master_report'),
 ]
\ No newline at end of file
@@ -1,12 +1,27 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
+from django.conf import settings
+from django.db import IntegrityError
 from django.urls import reverse
 from .models import Employee
+from offerletters.models import OfferLetter
+from hrms.storage import documents_present
 from .forms import EmployeeForm
-from django.http import JsonResponse, HttpResponse
+from .importer import import_employees
+from .search import matching_ids, search_employees
+from .queries import annotate_latest_letters, with_letter_status, keyset_page
+from .reports import (
+    select_columns, master_report_row, iter_master_report,
+    excel_master_report, csv_master_report, parquet_master_report, parquet_available,
+)
+from django.http import JsonResponse, FileResponse, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
-import pandas as pd
 from datetime import datetime
+import time
+
+EMPLOYEE_STATUSES = ("draft", "active", "relieved", "joined")
+MAX_PAGE_SIZE = 500
+
 
 # -------------------------------
 # ADD EMPLOYEE
@@ -47,8 +62,8 @@ def add_employee(request):
                 email = form.cleaned_data.get('email')
                 phone = form.cleaned_data.get('phone')
 
-                email_exists = Employee.objects.filter(email__iexact=email, is_draft=False).exists()
-                phone_exists = Employee.objects.filter(phone__iexact=phone, is_draft=False).exists()
+                email_exists = Employee.objects.filter(is_draft=False).with_email(email).exists()
+                phone_exists = Employee.objects.filter(is_draft=False).with_phone(phone).exists()
 
                 if email_exists and phone_exists:
                     messages.error(request, "Both email and phone number already exist.")
@@ -59,7 +74,12 @@ def add_employee(request):
                 else:
                     employee = form.save(commit=False)
                     employee.is_draft = False
-                    employee.save()
+                    try:
+                        employee.save()
+                    except IntegrityError:
+                        # Another submission with the same email / phone won the race
+                        messages.error(request, "Email or phone number already exists.")
+                        return render(request, "employees/add_employee.html", {"form": form})
                     messages.success(request, "Employee details saved successfully.")
                     return redirect(reverse("employees:employee_list"))
             else:
@@ -71,20 +91,70 @@ def add_employee(request):
 
 
 # -------------------------------
-# LIST EMPLOYEES
+# BULK IMPORT EMPLOYEES (EXCEL / CSV)
 # -------------------------------
 @login_required
-def employee_list(request):
-    employees = Employee.objects.all().order_by("-created_at")
+def import_employees_view(request):
+    result = None
 
     if request.method == "POST":
-        search_value = request.POST.get("search", "").strip()
-        if search_value:
-            by_code = employees.filter(employee_code__icontains=search_value)
-            by_phone = employees.filter(phone__icontains=search_value)
-            employees = by_code | by_phone
+        upload = request.FILES.get("file")
+        if not upload:
+            messages.error(request, "Please choose a file to import.")
+            return redirect(reverse("employees:import_employees"))
+
+        try:
+            result = import_employees(upload, upload.name)
+        except ValueError as e:
+            messages.error(request, str(e))
+            return redirect(reverse("employees:import_employees"))
+
+        messages.success(request, f"Imported {result.created} of {result.total} rows.")
+        if result.errors:
+            messages.warning(request, f"{len(result.errors)} row(s) were rejected — see the report below.")
 
-    return render(request, "employees/employee_list.html", {"employees": employees})
+    return render(request, "employees/import_employees.html", {"result": result})
+
+
+# -------------------------------
+# LIST EMPLOYEES
+# -------------------------------
+@login_required
+def employee_list(request):
+    employees = with_letter_status(Employee.objects.all())
+
+    search_value = (request.POST.get("search") or request.GET.get("search", "")).strip()
+    matches = matching_ids(search_value)
+    if matches is not None:
+        employees = employees.filter(id__in=matches)
+
+    status = request.GET.get("status", "all")
+    if status in EMPLOYEE_STATUSES:
+        employees = employees.filter(status=status)
+
+    try:
+        page_size = int(request.GET.get("page_size", settings.EMPLOYEE_LIST_PAGE_SIZE))
+    except ValueError:
+        page_size = settings.EMPLOYEE_LIST_PAGE_SIZE
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+    cursor = request.GET.get("after")
+    employees, next_cursor = keyset_page(employees, cursor, page_size)
+
+    # Download links for the whole page from one presence-cache read
+    offers = [emp.latest_offers[0] for emp in employees if emp.latest_offers]
+    present = documents_present([offer.file.name for offer in offers], OfferLetter.file.field.storage)
+    for offer in offers:
+        offer.file_present = offer.file.name in present
+
+    return render(request, "employees/employee_list.html", {
+        "employees": employees,
+        "next_cursor": next_cursor,
+        "is_first_page": not cursor,
+        "status": status,
+        "search": search_value,
+        "page_size": page_size,
+    })
 
 
 # -------------------------------
@@ -125,7 +195,11 @@ def edit_employee(request, id):
             if form.is_valid():
                 emp = form.save(commit=False)
                 emp.is_draft = False
-                emp.save()
+                try:
+                    emp.save()
+                except IntegrityError:
+                    messages.error(request, "Email or phone number already exists.")
+                    return render(request, "employees/add_employee.html", {"form": form})
                 messages.success(request, "Employee details updated successfully.")
                 return redirect(reverse("employees:employee_list"))
             else:
@@ -158,98 +232,84 @@ def check_unique_employee(request):
     response = {"email_exists": False, "phone_exists": False}
 
     if email:
-        response["email_exists"] = Employee.objects.filter(email__iexact=email).exists()
+        response["email_exists"] = Employee.objects.with_email(email).exists()
 
     if phone:
-        response["phone_exists"] = Employee.objects.filter(phone__iexact=phone).exists()
+        response["phone_exists"] = Employee.objects.with_phone(phone).exists()
 
     return JsonResponse(response)
 
 
 # -------------------------------
-# EMPLOYEE MASTER REPORT (EXCEL)
+# SEARCH / AUTOCOMPLETE (JSON)
 # -------------------------------
 @login_required
-def employee_master_report(request):
-    employees = Employee.objects.all().prefetch_related(
-        'offerletter_set', 'hike_letters', 'releaving_letters'
-    ).order_by('-created_at')
-
-    COLUMN_MAPPING = [
-        ("emp_code", "Emp Code"),
-        ("full_name", "Full Name"),
-        ("email", "Email"),
-        ("phone", "Phone"),
-        ("designation", "Designation"),
-        ("ctc_annual", "CTC (Annual)"),
-        ("ctc_monthly", "CTC (Monthly)"),
-        ("offer_date", "Offer Date"),
-        ("latest_hike", "Latest Hike"),
-        ("hike_date", "Hike Date"),
-        ("relieving_date", "Relieving Date"),
-        ("status", "Status"),
-        ("created", "Created"),
+def search_employees_view(request):
+    started = time.perf_counter()
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 20)), 100))
+    except ValueError:
+        limit = 20
+
+    results = [
+        {
+            "id": emp.id,
+            "employee_code": emp.employee_code or "",
+            "name": f"{emp.first_name} {emp.last_name or ''}".strip(),
+            "email": emp.email,
+            "phone": emp.phone or "",
+            "designation": emp.designation or "",
+            "is_draft": emp.is_draft,
+        }
+        for emp in search_employees(request.GET.get("q", ""), limit=limit)
     ]
+    return JsonResponse({
+        "results": results,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+    })
 
-    data = []
-    for emp in employees:
-        offer = emp.offerletter_set.last()
-        hike = emp.hike_letters.last() if hasattr(emp, 'hike_letters') and emp.hike_letters.exists() else None
-        rel = emp.releaving_letters.last() if hasattr(emp, 'releaving_letters') else None
-
-        full_name = f"{emp.first_name or ''} {emp.last_name or ''}".strip() or "—"
-        original_ctc = emp.package_per_annum or 0
-        ctc_annual_display = f"₹{original_ctc:,.0f}"
-        ctc_monthly_display = f"₹{original_ctc / 12:,.0f}" if original_ctc else "₹0"
-        latest_hike_amount = "-"
-        hike_date_str = "-"
-
-        if hike and hike.new_package:
-            latest_hike_amount = f"₹{hike.new_package:,.0f}"
-            hike_date_str = hike.date.strftime("%d-%b-%Y") if hike.date else "-"
-
-        offer_date = offer.offer_date.strftime("%d-%b-%Y") if offer and offer.offer_date else "-"
-        relieving_date = rel.releaving_date.strftime("%d-%b-%Y") if rel and rel.releaving_date else "-"
-        placed_in = rel.placed_in_company if rel and rel.placed_in_company else "-"
-
-        status = "Draft" if getattr(emp, 'is_draft', False) else "Active"
-        if rel:
-            status = f"Relieved to {placed_in}" if placed_in != "-" else "Relieved"
-
-        data.append({
-            "emp_code": emp.employee_code or "-",
-            "full_name": full_name,
-            "email": emp.email or "-",
-            "phone": emp.phone or "-",
-            "designation": emp.designation or "-",
-            "ctc_annual": ctc_annual_display,
-            "ctc_monthly": ctc_monthly_display,
-            "offer_date": offer_date,
-            "latest_hike": latest_hike_amount,
-            "hike_date": hike_date_str,
-            "relieving_date": relieving_date,
-            "status": status,
-            "created": emp.created_at.strftime("%d-%b-%Y %I:%M %p"),
-        })
-
-    # Excel download
-    if request.GET.get('download'):
-        df = pd.DataFrame(data)
-        df = df[[key for key, _ in COLUMN_MAPPING]]
-        df.columns = [label for _, label in COLUMN_MAPPING]
-
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-        response['Content-Disposition'] = f'attachment; filename="Employee_Master_{datetime.now().strftime("%Y%m%d_%H%M")}.xlsx"'
 
-        with pd.ExcelWriter(response, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name="Employees", index=False)
-            worksheet = writer.sheets["Employees"]
-            for i, col in enumerate(df.columns, 1):
-                max_len = max(df[col].astype(str).map(len).max(), len(col)) + 5
-                worksheet.column_dimensions[worksheet.cell(row=1, column=i).column_letter].width = min(max_len, 50)
+# -------------------------------
+# EMPLOYEE MASTER REPORT (HTML / EXCEL / CSV / PARQUET)
+# -------------------------------
+@login_required
+def employee_master_report(request):
+    employees = annotate_latest_letters(Employee.objects.all()).order_by('-created_at')
+
+    download = request.GET.get('download')
+    if download:
+        try:
+            columns = select_columns(request.GET.get('columns'))
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+
+        rows = iter_master_report(employees)
+        filename = f"Employee_Master_{datetime.now().strftime('%Y%m%d_%H%M')}"
+
+        # CSV — streamed line by line, nothing buffered
+        if download == 'csv':
+            response = StreamingHttpResponse(csv_master_report(rows, columns), content_type="text/csv; charset=utf-8")
+            response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+            return response
+
+        # Parquet — needs pyarrow
+        if download == 'parquet':
+            if not parquet_available():
+                return HttpResponse("Parquet export needs pyarrow installed on the server.", status=501)
+            return FileResponse(
+                parquet_master_report(rows, columns),
+                as_attachment=True,
+                filename=f"{filename}.parquet",
+                content_type="application/vnd.apache.parquet",
+            )
 
-        return response
+        # Excel (download=1 / xlsx) — streamed from the queryset iterator into a spooled temp file
+        return FileResponse(
+            excel_master_report(rows, columns),
+            as_attachment=True,
+            filename=f"{filename}.xlsx",
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
 
+    data = [master_report_row(emp) for emp in employees]
     return render(request, 'employees/master_report.html', {'employees': data, 'total': len(data)})
@@ -9,6 +9,8 @@ class HikeLetter(models.Model):
     old_package = models.DecimalField(max_digits=10, decimal_places=2)
     new_package = models.DecimalField(max_digits=10, decimal_places=2)
     hike_letter_file = models.FileField(upload_to="hike_letters/", blank=True, null=True)
+    pdf_file = models.FileField(upload_to="hike_letters/", blank=True, null=True)  # PDF copy next to the DOCX, if a converter is installed
+    render_fingerprint = models.CharField(max_length=64, blank=True, default="")  # template + context hash of the file
 
     def __str__(self):
         return f"Hike Letter - {self.employee.first_name} ({self.employee_code})"
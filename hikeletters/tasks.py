@@ -0,0 +1,120 @@
+# hikeletters/tasks.py — hike letter rendering, run by a background worker (see jobs/queue.py)
+
+from decimal import Decimal
+from datetime import date
+import os
+import re
+from hrms.formatting import indian_format
+from hrms.docx_templates import get_template, render_fingerprint, render_is_current
+from hrms.perf import span
+from hrms.storage import delete_document, save_docx
+from django.conf import settings
+
+from employees.history import ctc_before, record_compensation, supersede_compensation
+from employees.models import CompensationRecord, Employee
+from hikeletters.models import HikeLetter
+from jobs.queue import task
+from jobs.tasks import queue_pdf_conversion
+from .views import (
+    calculate_salary_breakup, get_first_day_of_next_month, hike_letter_reference, num_to_words,
+)
+
+
+@task("hike_letter")
+def hike_letter(job, employee_id, date_obj, new_package):
+    employee = Employee.objects.get(id=employee_id)
+    date_obj = date.fromisoformat(date_obj)
+    new_package = Decimal(new_package)
+
+    employee_name = f"{employee.first_name} {employee.last_name or ''}".strip()
+    designation = employee.designation or ""
+    employee_code, _, old_variable_pay = hike_letter_reference(employee)
+    new_variable_pay = old_variable_pay
+
+    # ---------------------------
+    # IMPORTANT: Updated Rule
+    # Hike MUST start from 1st of next month ALWAYS
+    # ---------------------------
+    hike_start_date = get_first_day_of_next_month(date_obj)
+
+    # One hike letter per employee: regenerating it with other terms replaces the hike it recorded
+    previous = HikeLetter.objects.filter(employee=employee).first()
+    if previous and (previous.hike_start_date, previous.new_package) != (hike_start_date, new_package):
+        supersede_compensation(employee, CompensationRecord.HIKE, previous.hike_start_date, previous.new_package)
+    old_package = ctc_before(employee, hike_start_date)   # also right when this hike is regenerated
+
+    # Update or create hike record
+    hike_record, created = HikeLetter.objects.update_or_create(
+        employee=employee,
+        defaults={
+            'date': date_obj,
+            'hike_start_date': hike_start_date,
+            'employee_code': employee_code,
+            'old_package': old_package,
+            'new_package': new_package
+        }
+    )
+    record_compensation(
+        employee, CompensationRecord.HIKE, new_package, hike_start_date,
+        variable_pay_per_annum=new_variable_pay, employee_code=employee_code,
+    )
+
+    job.report(20, "Rendering hike letter")
+
+    # Generate DOCX
+    template_path = os.path.join(settings.BASE_DIR, "templates", "hike_letter_template.docx")
+
+    old_breakup = calculate_salary_breakup(old_package)
+    new_breakup = calculate_salary_breakup(new_package)
+    old_package_per_annum = old_package + old_variable_pay
+    new_package_per_annum = new_package + new_variable_pay
+
+    context = {
+        "date": date_obj.strftime("%d %B %Y"),
+        "employee_name": employee_name,
+        "employee_code": employee_code,
+        "designation": designation,
+        "hike_start_date": hike_start_date.strftime("%d %B %Y"),
+        "old_package": indian_format(old_package_per_annum),
+        "new_package": indian_format(new_package_per_annum),
+        "old_basic": indian_format(old_breakup['Basic']),
+        "old_hra": indian_format(old_breakup['HRA']),
+        "old_conveyance": indian_format(old_breakup['Conveyance']),
+        "old_perf": indian_format(old_breakup['Performance_Incentives']),
+        "old_special": indian_format(old_breakup['Special_Allowance']),
+        "new_basic": indian_format(new_breakup['Basic']),
+        "new_hra": indian_format(new_breakup['HRA']),
+        "new_conveyance": indian_format(new_breakup['Conveyance']),
+        "new_perf": indian_format(new_breakup['Performance_Incentives']),
+        "new_special": indian_format(new_breakup['Special_Allowance']),
+        "hike_month_year": hike_start_date.strftime("%B %Y"),
+        "new_package_words": num_to_words(new_package_per_annum),
+        "Variable_Pay_annum": indian_format(old_variable_pay),
+    }
+
+    filename = f"{re.sub(r'[^\w]', '_', employee_name)}_{employee_code}_hike_letter.docx"
+
+    # Same template + same context as the stored file → keep it, skip the render
+    fingerprint = render_fingerprint(template_path, context)
+    if render_is_current(hike_record.render_fingerprint, fingerprint, hike_record.hike_letter_file.name):
+        if not hike_record.pdf_file:
+            queue_pdf_conversion("hikeletters.HikeLetter", {"pk": hike_record.pk}, "hike_letter_file", employee=employee)
+        job.report(100, f"Hike letter for {employee_name} is already up to date.")
+        return hike_record.hike_letter_file.name
+
+    doc = get_template(template_path)
+    with span("docx_render"):
+        doc.render(context)
+
+    job.report(70, "Saving hike letter")
+
+    with span("file_save"):
+        hike_record.hike_letter_file.name = save_docx(f"hike_letters/{filename}", doc)
+    hike_record.render_fingerprint = fingerprint
+    delete_document(hike_record.pdf_file.name)
+    hike_record.pdf_file = None   # stale until the new PDF is converted
+    hike_record.save()
+    queue_pdf_conversion("hikeletters.HikeLetter", {"pk": hike_record.pk}, "hike_letter_file", employee=employee)
+
+    job.report(100, f"Hike letter generated successfully for {employee_name}!")
+    return hike_record.hike_letter_file.name
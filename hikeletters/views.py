@@ -4,12 +4,14 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from decimal import Decimal
 from datetime import datetime, date
-import os
-import re
-from docxtpl import DocxTemplate
+from django.urls import reverse
+from hrms.compensation import annual_breakup
+from hrms.storage import document_exists
 
 from employees.models import Employee
 from hikeletters.models import HikeLetter
+from jobs.queue import submit
+from jobs.views import respond_to_job
 from offerletters.models import OfferLetter
 
 
@@ -22,29 +24,6 @@ def get_first_day_of_next_month(input_date):
         return date(year, month + 1, 1)
 
 
-def indian_format(amount):
-    try:
-        amount = float(amount)
-    except:
-        return str(amount)
-
-    s, d = f"{amount:.2f}".split(".")
-    if len(s) > 3:
-        int_part = s[-3:]
-        s = s[:-3]
-        parts = []
-        while len(s) > 2:
-            parts.append(s[-2:])
-            s = s[:-2]
-        if s:
-            parts.append(s)
-        parts.reverse()
-        int_part = ",".join(parts) + "," + int_part
-    else:
-        int_part = s
-    return f"{int_part}.{d}"
-
-
 def num_to_words(num):
     num = float(num)
     if num >= 10000000:
@@ -59,31 +38,18 @@ def num_to_words(num):
 
 
 def calculate_salary_breakup(per_annum):
-    basic_pct = Decimal('0.45')
-    hra_pct = Decimal('0.225')
-    conveyance_amt = Decimal('14400')
-
-    salary_annum = {
-        'Basic': (per_annum * basic_pct).quantize(Decimal('0.01')),
-        'HRA': (per_annum * hra_pct).quantize(Decimal('0.01')),
-        'Conveyance': conveyance_amt,
+    breakup = annual_breakup(per_annum)
+    return {
+        'Basic': breakup.basic,
+        'HRA': breakup.hra,
+        'Conveyance': breakup.conveyance,
+        'Performance_Incentives': breakup.performance,
+        'Special_Allowance': breakup.special,
     }
 
-    perf_base = per_annum - (salary_annum['Basic'] + salary_annum['HRA'] + conveyance_amt)
-    salary_annum['Performance_Incentives'] = (perf_base * Decimal('0.60')).quantize(Decimal('0.01'))
-    salary_annum['Special_Allowance'] = (perf_base * Decimal('0.40')).quantize(Decimal('0.01'))
-
-    return salary_annum
-
-
-def generate_hike_letter(request, employee_id):
-    employee = get_object_or_404(Employee, id=employee_id)
-
-    employee_name = f"{employee.first_name} {employee.last_name or ''}".strip()
-    designation = employee.designation or ""
-    old_package = getattr(employee, 'package_per_annum', Decimal('0.00'))
 
-    # Get original offer letter
+def hike_letter_reference(employee):
+    """(employee_code, original joining date, variable pay) taken from the employee's offer letter."""
     offerletter = OfferLetter.objects.filter(employee=employee).first()
     if offerletter and offerletter.offer_date:
         employee_code = offerletter.employee_code
@@ -96,7 +62,18 @@ def generate_hike_letter(request, employee_id):
     if offerletter and offerletter.variable_pay_per_annum:
         old_variable_pay = offerletter.variable_pay_per_annum.quantize(Decimal('0.01'))
 
-    new_variable_pay = old_variable_pay
+    return employee_code, original_joining_date, old_variable_pay
+
+
+def generate_hike_letter(request, employee_id):
+    employee = get_object_or_404(Employee, id=employee_id)
+
+    designation = employee.designation or ""
+    old_package = employee.current_ctc or Decimal('0.00')
+
+    # Get original offer letter
+    _, original_joining_date, _ = hike_letter_reference(employee)
+
     min_date = original_joining_date
     error_message = None
 
@@ -122,92 +99,21 @@ def generate_hike_letter(request, employee_id):
                     if date_obj < min_date:
                         error_message = f"Hike date cannot be before original joining date: {min_date.strftime('%d %B %Y')}"
                     else:
-
-                        # ---------------------------
-                        # IMPORTANT: Updated Rule
-                        # Hike MUST start from 1st of next month ALWAYS
-                        # ---------------------------
-                        hike_start_date = get_first_day_of_next_month(date_obj)
-
-                        # Update or create hike record
-                        hike_record, created = HikeLetter.objects.update_or_create(
+                        # Record update + rendering run in hikeletters/tasks.py
+                        job = submit(
+                            "hike_letter",
+                            {"employee_id": employee.id, "date_obj": date_obj.isoformat(), "new_package": str(new_package)},
                             employee=employee,
-                            defaults={
-                                'date': date_obj,
-                                'hike_start_date': hike_start_date,
-                                'employee_code': employee_code,
-                                'old_package': old_package,
-                                'new_package': new_package
-                            }
+                            user=request.user,
+                            next_url=reverse("employees:employee_list"),
                         )
-
-                        # Generate DOCX
-                        template_path = os.path.join("templates", "hike_letter_template.docx")
-                        doc = DocxTemplate(template_path)
-
-                        old_breakup = calculate_salary_breakup(old_package)
-                        new_breakup = calculate_salary_breakup(new_package)
-                        old_package_per_annum = old_package + old_variable_pay
-                        new_package_per_annum = new_package + new_variable_pay
-
-                        context = {
-                            "date": date_obj.strftime("%d %B %Y"),
-                            "employee_name": employee_name,
-                            "employee_code": employee_code,
-                            "designation": designation,
-                            "hike_start_date": hike_start_date.strftime("%d %B %Y"),
-                            "old_package": indian_format(old_package_per_annum),
-                            "new_package": indian_format(new_package_per_annum),
-                            "old_basic": indian_format(old_breakup['Basic']),
-                            "old_hra": indian_format(old_breakup['HRA']),
-                            "old_conveyance": indian_format(old_breakup['Conveyance']),
-                            "old_perf": indian_format(old_breakup['Performance_Incentives']),
-                            "old_special": indian_format(old_breakup['Special_Allowance']),
-                            "new_basic": indian_format(new_breakup['Basic']),
-                            "new_hra": indian_format(new_breakup['HRA']),
-                            "new_conveyance": indian_format(new_breakup['Conveyance']),
-                            "new_perf": indian_format(new_breakup['Performance_Incentives']),
-                            "new_special": indian_format(new_breakup['Special_Allowance']),
-                            "hike_month_year": hike_start_date.strftime("%B %Y"),
-                            "new_package_words": num_to_words(new_package_per_annum),
-                            "Variable_Pay_annum": indian_format(old_variable_pay),
-                        }
-
-                        doc.render(context)
-
-                        # File operations
-                        output_dir = os.path.join("media", "hike_letters")
-                        os.makedirs(output_dir, exist_ok=True)
-                        filename = f"{re.sub(r'[^\w]', '_', employee_name)}_{employee_code}_hike_letter.docx"
-                        output_path = os.path.join(output_dir, filename)
-
-                        if os.path.exists(output_path):
-                            try:
-                                os.remove(output_path)
-                            except PermissionError:
-                                messages.error(request, "Previous hike letter is open in Word. Close it and try again.")
-                                return redirect(request.path)
-
-                        try:
-                            doc.save(output_path)
-                        except PermissionError:
-                            messages.error(request, "Cannot save: File is open in Word. Close it first.")
-                            return redirect(request.path)
-
-                        hike_record.hike_letter_file.name = f"hike_letters/{filename}"
-                        hike_record.save()
-
-                        hike_record.hike_letter_file.close()
-                        hike_record.hike_letter_file = hike_record.hike_letter_file
-
-                        messages.success(request, f"Hike letter generated successfully for {employee_name}!")
-                        return redirect('employee_list')
+                        return respond_to_job(request, job, error_url=request.path)
 
     latest_hike = HikeLetter.objects.filter(employee=employee).first()
 
     file_exists = False
     if latest_hike and latest_hike.hike_letter_file:
-        file_exists = latest_hike.hike_letter_file.storage.exists(latest_hike.hike_letter_file.name)
+        file_exists = document_exists(latest_hike.hike_letter_file.name, latest_hike.hike_letter_file.storage)
 
     return render(request, "hikeletters/hike_letter.html", {
         "employee": employee,
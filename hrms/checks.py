@@ -0,0 +1,52 @@
+# hrms/checks.py — system checks for settings that only work when shared between processes
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.checks import Error, Warning
+from django.db import DatabaseError, connections, router
+
+# Cache aliases read by one process and invalidated by another (web workers, run_workers, commands)
+SHARED_CACHE_SETTINGS = ("FILE_PRESENCE_CACHE", "DASHBOARD_METRICS_CACHE")
+PROCESS_LOCAL_BACKENDS = ("django.core.cache.backends.locmem.LocMemCache",)
+
+
+def _missing_cache_table(alias, databases):
+    """The DatabaseCache table of ``alias`` when it is absent from a database being checked."""
+    cache = caches[alias]
+    if not isinstance(cache, DatabaseCache):
+        return None
+    database = router.db_for_write(cache.cache_model_class)
+    if database not in databases:
+        return None
+    try:
+        tables = connections[database].introspection.table_names()
+    except DatabaseError:
+        return None
+    return None if cache._table in tables else cache._table
+
+
+def shared_cache_check(app_configs, databases=None, **kwargs):
+    """The caches behind SHARED_CACHE_SETTINGS must exist and be visible to every process."""
+    problems = []
+    for setting in SHARED_CACHE_SETTINGS:
+        alias = getattr(settings, setting, "default")
+        if alias not in settings.CACHES:
+            problems.append(Error(
+                f"{setting} names the cache alias {alias!r}, which is not in CACHES.",
+                id="hrms.E001",
+            ))
+        elif settings.CACHES[alias].get("BACKEND") in PROCESS_LOCAL_BACKENDS:
+            problems.append(Warning(
+                f"{setting} uses the process-local cache alias {alias!r}; invalidations from workers "
+                f"and management commands will not reach the web processes.",
+                hint="Point it at a shared backend (DatabaseCache, Redis or Memcached).",
+                id="hrms.W001",
+            ))
+        elif databases and (table := _missing_cache_table(alias, databases)):
+            problems.append(Warning(
+                f"{setting} uses the cache alias {alias!r}, whose table {table!r} does not exist.",
+                hint="Run `manage.py migrate` (or `manage.py createcachetable`).",
+                id="hrms.W002",
+            ))
+    return problems
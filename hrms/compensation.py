@@ -0,0 +1,116 @@
+# hrms/compensation.py — the one salary-breakup engine behind offer, hike and payslip generation
+
+"""
+Every CTC is split the same way:
+
+    Basic        45%   of the amount
+    HRA          22.5% of the amount
+    Conveyance   fixed (14,400 a year / 1,200 a month)
+    remaining  = amount - Basic - HRA - Conveyance
+    Performance  60% of remaining
+    Special      40% of remaining
+
+Offer and hike letters split the annual CTC; payslips split the monthly salary
+(annual / 12). Each step rounds to the paisa exactly like ``Decimal.quantize``
+(half-even), so results match the old per-view ``Decimal`` code to the paisa.
+
+The arithmetic is done on integer paisa with numpy: ``annual_breakups`` /
+``monthly_breakups`` take a whole array of CTCs in one call, and the scalar
+helpers are the same code on a one-element array.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+
+import numpy as np
+
+PAISA = Decimal("0.01")
+ANNUAL_CONVEYANCE = Decimal("14400")
+MONTHLY_CONVEYANCE = Decimal("1200")
+
+COMPONENTS = ("basic", "hra", "conveyance", "performance", "special")
+
+
+def to_paisa(amount):
+    """Rupee amount (Decimal / str / int / None) → integer paisa, rounded half-even."""
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount or 0))
+    return int(amount.scaleb(2).to_integral_value())
+
+
+def from_paisa(paisa):
+    return (Decimal(int(paisa)) / 100).quantize(PAISA)
+
+
+def _div_round(numerator, denominator):
+    """numerator / denominator rounded half-even, on int64 arrays (exact — no floats involved)."""
+    quotient, remainder = np.divmod(numerator, denominator)
+    twice = 2 * remainder
+    round_up = (twice > denominator) | ((twice == denominator) & (quotient % 2 == 1))
+    return quotient + round_up
+
+
+def split_paisa(amounts, conveyance):
+    """
+    Vectorized breakup of ``amounts`` (int64 paisa array) with a fixed ``conveyance`` (paisa).
+    Returns {component: int64 paisa array}.
+    """
+    amounts = np.asarray(amounts, dtype=np.int64)
+    basic = _div_round(amounts * 45, 100)
+    hra = _div_round(amounts * 225, 1000)
+    remaining = amounts - basic - hra - conveyance
+    return {
+        "basic": basic,
+        "hra": hra,
+        "conveyance": np.full_like(amounts, conveyance),
+        "performance": _div_round(remaining * 60, 100),
+        "special": _div_round(remaining * 40, 100),
+    }
+
+
+def _paisa_array(amounts):
+    return np.fromiter((to_paisa(amount) for amount in amounts), dtype=np.int64, count=len(amounts))
+
+
+def annual_breakups(ctcs):
+    """Annual split for many CTCs at once: {component: int64 paisa array}, plus ``total``."""
+    totals = _paisa_array(ctcs)
+    result = split_paisa(totals, to_paisa(ANNUAL_CONVEYANCE))
+    result["total"] = totals
+    return result
+
+
+def monthly_breakups(annual_packages):
+    """Monthly (payslip) split for many annual packages at once, plus ``total`` = monthly gross."""
+    monthly = _div_round(_paisa_array(annual_packages), 12)
+    result = split_paisa(monthly, to_paisa(MONTHLY_CONVEYANCE))
+    result["total"] = monthly
+    return result
+
+
+@dataclass(frozen=True)
+class SalaryBreakup:
+    basic: Decimal
+    hra: Decimal
+    conveyance: Decimal
+    performance: Decimal
+    special: Decimal
+    total: Decimal
+
+    @classmethod
+    def from_arrays(cls, arrays, index=0):
+        return cls(**{name: from_paisa(arrays[name][index]) for name in COMPONENTS + ("total",)})
+
+    def per_month(self):
+        """Each annual component / 12, rounded to the paisa (the offer letter's monthly column)."""
+        return SalaryBreakup(**{
+            name: (getattr(self, name) / 12).quantize(PAISA) for name in COMPONENTS + ("total",)
+        })
+
+
+def annual_breakup(ctc):
+    return SalaryBreakup.from_arrays(annual_breakups([ctc]))
+
+
+def monthly_breakup(annual_package):
+    return SalaryBreakup.from_arrays(monthly_breakups([annual_package]))
@@ -0,0 +1,97 @@
+# hrms/docx_templates.py — parse-once cache for the .docx letter templates
+
+"""
+Every letter generator used to build ``DocxTemplate(path)`` per request, which
+re-unzips and re-parses the whole template each time.  The registry below
+parses each template once per worker process, keeps that pristine copy and
+hands every render a deep copy of the parsed document instead.
+
+Entries are keyed by absolute path, re-loaded when the file's mtime/size
+changes on disk and evicted least-recently-used beyond
+``settings.DOCX_TEMPLATE_CACHE_SIZE`` templates.
+
+``render_fingerprint`` hashes a template's version together with a render
+context; generators store it next to the file and skip re-rendering when
+neither has changed.
+"""
+
+from collections import OrderedDict
+import copy
+import hashlib
+import json
+import os
+import threading
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from docxtpl import DocxTemplate
+
+DEFAULT_CACHE_SIZE = 8
+
+_cache = OrderedDict()   # abspath -> (stat_key, sha256, pristine DocxTemplate)
+_lock = threading.Lock()
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _load(path):
+    with open(path, "rb") as fh:
+        digest = hashlib.sha256(fh.read()).hexdigest()
+    pristine = DocxTemplate(path)
+    pristine.init_docx()
+    return digest, pristine
+
+
+def _entry(template_path):
+    path = os.path.abspath(template_path)
+    stat_key = _stat_key(path)
+
+    with _lock:
+        entry = _cache.get(path)
+        if entry and entry[0] == stat_key:
+            _cache.move_to_end(path)
+            return entry
+
+    digest, pristine = _load(path)
+    entry = (stat_key, digest, pristine)
+
+    with _lock:
+        _cache[path] = entry
+        _cache.move_to_end(path)
+        max_size = getattr(settings, "DOCX_TEMPLATE_CACHE_SIZE", DEFAULT_CACHE_SIZE)
+        while len(_cache) > max_size:
+            _cache.popitem(last=False)
+    return entry
+
+
+def get_template(template_path):
+    """Return a fresh, renderable DocxTemplate cloned from the cached parse of ``template_path``."""
+    _, _, pristine = _entry(template_path)
+    doc = DocxTemplate(pristine.template_file)
+    doc.docx = copy.deepcopy(pristine.docx)
+    return doc
+
+
+def template_version(template_path):
+    """SHA-256 of the template file currently on disk (served from the cache)."""
+    return _entry(template_path)[1]
+
+
+def render_fingerprint(template_path, context):
+    """SHA-256 over the template's content hash and the fully computed render ``context``."""
+    payload = json.dumps(context, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(f"{template_version(template_path)}\n{payload}".encode("utf-8")).hexdigest()
+
+
+def render_is_current(stored_fingerprint, fingerprint, stored_name):
+    """True when the stored document ``stored_name`` already holds the render identified by ``fingerprint``."""
+    # asks the storage itself, not the presence cache: skipping a render on a stale "present" would lose the file
+    return bool(stored_fingerprint) and stored_fingerprint == fingerprint and bool(stored_name) and default_storage.exists(stored_name)
+
+
+def clear_template_cache():
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,94 @@
+# hrms/formatting.py — Indian currency formatting + amount-in-words shared by every document
+
+"""
+``indian_format`` groups rupees the Indian way (lakh / crore): 2,40,000.00 and
+1,23,45,678.90. It rounds with ``Decimal`` (half-even, to the paisa) and groups
+with integer divmod, so there is no float round-trip. Anything that is not a number
+formats as "0.00".
+
+``amount_in_words`` wraps ``num2words(..., lang="en_IN")``. Both are LRU-memoized:
+a payroll run formats the same few hundred amounts over and over. The ``*_many``
+helpers format a whole batch and convert each distinct value only once.
+"""
+
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+
+from num2words import num2words
+
+PAISA = Decimal("0.01")
+FORMAT_CACHE_SIZE = 8192
+WORDS_CACHE_SIZE = 4096
+
+
+def _format_paisa(paisa):
+    """Integer paisa → '1,23,45,678.90' with integer arithmetic only (common sizes unrolled)."""
+    if paisa < 0:
+        return "-" + _format_paisa(-paisa)
+    rupees, paise = divmod(paisa, 100)
+    if rupees < 1000:
+        return "%d.%02d" % (rupees, paise)
+    if rupees < 100000:
+        return "%d,%03d.%02d" % (rupees // 1000, rupees % 1000, paise)
+    if rupees < 10000000:
+        return "%d,%02d,%03d.%02d" % (rupees // 100000, rupees // 1000 % 100, rupees % 1000, paise)
+
+    head, last_three = divmod(rupees, 1000)
+    groups = []
+    while head >= 100:
+        head, pair = divmod(head, 100)
+        groups.append("%02d" % pair)
+    groups.append(str(head))
+    return "%s,%03d.%02d" % (",".join(reversed(groups)), last_three, paise)
+
+
+@lru_cache(maxsize=FORMAT_CACHE_SIZE)
+def _format_decimal(amount):
+    return _format_paisa(int(round(amount * 100)))   # Decimal round() is half-even
+
+
+def indian_format(amount):
+    """Indian currency format: 240000 → 2,40,000.00 (None / invalid → 0.00)"""
+    if amount is None:
+        return "0.00"
+    try:
+        if not isinstance(amount, Decimal):
+            amount = Decimal(str(amount).strip())
+        if not amount.is_finite():
+            return "0.00"
+        return _format_decimal(amount)
+    except (InvalidOperation, ValueError, TypeError):
+        return "0.00"
+
+
+@lru_cache(maxsize=WORDS_CACHE_SIZE)
+def _rupees_in_words(rupees):
+    return num2words(rupees, lang="en_IN").title()
+
+
+def amount_in_words(amount):
+    """Whole rupees of ``amount`` in Indian English, title-cased: 120000 → 'One Lakh, Twenty Thousand'."""
+    return _rupees_in_words(int(amount))
+
+
+def indian_format_many(amounts):
+    """``indian_format`` over a batch; each distinct amount is formatted once."""
+    seen = {}
+    return [seen[a] if a in seen else seen.setdefault(a, indian_format(a)) for a in amounts]
+
+
+def amounts_in_words_many(amounts):
+    """``amount_in_words`` over a batch; each distinct rupee value is converted once."""
+    seen = {}
+    result = []
+    for amount in amounts:
+        rupees = int(amount)
+        if rupees not in seen:
+            seen[rupees] = _rupees_in_words(rupees)
+        result.append(seen[rupees])
+    return result
+
+
+def clear_format_caches():
+    _format_decimal.cache_clear()
+    _rupees_in_words.cache_clear()
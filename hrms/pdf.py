@@ -0,0 +1,212 @@
+# hrms/pdf.py — optional DOCX → PDF conversion through a long-lived headless LibreOffice
+
+"""
+Starting LibreOffice costs seconds, so each process that converts (in practice each
+``run_workers`` process) starts one headless ``soffice`` on first use and keeps it.
+The process talks to it over UNO, so N workers make a pool of N warm converters.
+If soffice dies mid-conversion it is restarted once and the file retried.
+
+Backends, best first:
+
+* ``uno``: the long-lived soffice described above. Needs the ``uno`` Python
+  bindings, which LibreOffice ships as python3-uno.
+* ``cli``: ``soffice --convert-to pdf``, one process per file. The profile
+  directory is reused, which makes it faster than a cold start.
+* neither (or ``PDF_CONVERSION_ENABLED = False``): ``pdf_backend()`` is None and
+  every generator stays DOCX-only.
+"""
+
+import atexit
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+try:  # shipped with LibreOffice (python3-uno), not installable from PyPI
+    import uno
+    from com.sun.star.beans import PropertyValue
+    from com.sun.star.connection import NoConnectException
+except ImportError:
+    uno = PropertyValue = NoConnectException = None
+
+DEFAULT_TIMEOUT = 120        # seconds for one conversion / for soffice to come up
+SOFFICE_NAMES = ("soffice", "libreoffice")
+
+
+class ConversionError(Exception):
+    pass
+
+
+def soffice_binary():
+    configured = getattr(settings, "SOFFICE_BINARY", None)
+    if configured:
+        return configured if os.path.exists(configured) else shutil.which(configured)
+    for name in SOFFICE_NAMES:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def pdf_backend():
+    """'uno', 'cli' or None when PDFs are switched off or no LibreOffice is installed."""
+    if not getattr(settings, "PDF_CONVERSION_ENABLED", True) or not soffice_binary():
+        return None
+    return "uno" if uno is not None else "cli"
+
+
+def pdf_path_for(docx_path):
+    return os.path.splitext(docx_path)[0] + ".pdf"
+
+
+def _timeout():
+    return getattr(settings, "PDF_CONVERSION_TIMEOUT", DEFAULT_TIMEOUT)
+
+
+def _profile_dir():
+    """Per-process LibreOffice profile: soffice refuses to share one between instances."""
+    path = os.path.join(tempfile.gettempdir(), f"hrms-soffice-{os.getpid()}")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+# -------------------------------
+# LONG-LIVED SOFFICE (UNO)
+# -------------------------------
+class OfficeConverter:
+    """One headless soffice owned by the current process, reused for every conversion."""
+
+    def __init__(self, binary):
+        self.binary = binary
+        self.pipe_name = f"hrms-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.process = None
+        self.desktop = None
+
+    def start(self):
+        self.process = subprocess.Popen(
+            [
+                self.binary, "--headless", "--invisible", "--nologo", "--norestore", "--nodefault",
+                f"-env:UserInstallation={Path(_profile_dir()).as_uri()}",
+                f"--accept=pipe,name={self.pipe_name};urp;StarOffice.ComponentContext",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+        deadline = time.monotonic() + _timeout()
+        while True:
+            try:
+                context = resolver.resolve(f"uno:pipe,name={self.pipe_name};urp;StarOffice.ComponentContext")
+                break
+            except NoConnectException:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise ConversionError("LibreOffice did not start.")
+                time.sleep(0.25)
+        self.desktop = context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+
+    def convert(self, docx_path, pdf_path):
+        if self.desktop is None:
+            self.start()
+        document = self.desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(os.path.abspath(docx_path)), "_blank", 0,
+            (PropertyValue("Hidden", 0, True, 0),),
+        )
+        if document is None:
+            raise ConversionError(f"LibreOffice could not open {os.path.basename(docx_path)}.")
+        try:
+            document.storeToURL(
+                uno.systemPathToFileUrl(os.path.abspath(pdf_path)),
+                (PropertyValue("FilterName", 0, "writer_pdf_Export", 0),),
+            )
+        finally:
+            document.close(True)
+
+    def stop(self):
+        self.desktop = None
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+
+_converter = None
+_converter_lock = threading.Lock()
+
+
+def _process_converter():
+    global _converter
+    if _converter is None:
+        _converter = OfficeConverter(soffice_binary())
+        atexit.register(shutdown_converter)
+    return _converter
+
+
+def shutdown_converter():
+    global _converter
+    if _converter is not None:
+        _converter.stop()
+        _converter = None
+
+
+def _convert_uno(docx_path, pdf_path):
+    with _converter_lock:   # one soffice handles one document at a time
+        converter = _process_converter()
+        try:
+            converter.convert(docx_path, pdf_path)
+        except ConversionError:
+            raise
+        except Exception:
+            # soffice crashed or the bridge was disposed: restart once and retry
+            converter.stop()
+            converter.convert(docx_path, pdf_path)
+
+
+# -------------------------------
+# ONE-SHOT CLI FALLBACK
+# -------------------------------
+def _convert_cli(docx_path, pdf_path):
+    out_dir = tempfile.mkdtemp(prefix="hrms-pdf-")
+    try:
+        subprocess.run(
+            [
+                soffice_binary(), "--headless", "--norestore", "--nologo",
+                f"-env:UserInstallation={Path(_profile_dir()).as_uri()}",
+                "--convert-to", "pdf", "--outdir", out_dir, os.path.abspath(docx_path),
+            ],
+            check=True, capture_output=True, timeout=_timeout(),
+        )
+        produced = os.path.join(out_dir, os.path.splitext(os.path.basename(docx_path))[0] + ".pdf")
+        if not os.path.exists(produced):
+            raise ConversionError(f"LibreOffice produced no PDF for {os.path.basename(docx_path)}.")
+        shutil.move(produced, pdf_path)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        raise ConversionError(f"PDF conversion failed: {e}")
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def convert_to_pdf(docx_path, pdf_path=None):
+    """
+    Convert ``docx_path`` to PDF (next to it unless ``pdf_path`` is given).
+    Returns the PDF path, or None when no converter is available. Raises ConversionError on failure.
+    """
+    backend = pdf_backend()
+    if backend is None:
+        return None
+    pdf_path = pdf_path or pdf_path_for(docx_path)
+    if backend == "uno":
+        _convert_uno(docx_path, pdf_path)
+    else:
+        _convert_cli(docx_path, pdf_path)
+    return pdf_path
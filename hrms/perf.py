@@ -0,0 +1,183 @@
+# hrms/perf.py — lightweight per-request / per-job timing: SQL, template and document spans
+
+"""
+``measure(key)`` times one unit of work: a request (PerformanceMiddleware in
+accounts/middleware.py) or a background job (jobs.queue.run_job). While it is open:
+
+* every SQL statement on every database connection is counted and timed through
+  ``connection.execute_wrapper``;
+* ``span(name)`` blocks add their duration under ``name``: Django template rendering
+  (TimedDjangoTemplates below), ``docx_render`` and ``file_save`` in the generators.
+
+When it closes, the sample goes into an in-process rolling window of the last
+``PERF_HISTORY_SIZE`` samples per key. ``perf_summary()`` turns the windows into
+latency histograms and percentiles for the staff-only ``accounts:perf_stats``
+endpoint. Each process keeps its own window (web workers and job workers alike).
+It is a regression detector, not a profiler.
+"""
+
+from collections import defaultdict, deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.template.exceptions import TemplateDoesNotExist
+
+DEFAULT_HISTORY_SIZE = 500
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_current = ContextVar("hrms_perf_sample", default=None)
+_history = defaultdict(deque)   # key -> deque of Sample (bounded, newest last)
+_history_lock = threading.Lock()
+
+
+def enabled():
+    return getattr(settings, "PERF_INSTRUMENTATION", True)
+
+
+class Sample:
+    __slots__ = ("key", "started", "wall", "sql_count", "sql_time", "spans")
+
+    def __init__(self, key):
+        self.key = key
+        self.started = time.perf_counter()
+        self.wall = 0.0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.spans = defaultdict(float)   # name -> seconds
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.sql_count += 1
+
+    def server_timing(self):
+        """``Server-Timing`` header value (durations in ms)."""
+        parts = [
+            f"app;dur={self.wall * 1000:.1f}",
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.sql_count} queries"',
+        ]
+        parts += [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.spans.items()]
+        return ", ".join(parts)
+
+
+def _record(sample):
+    size = getattr(settings, "PERF_HISTORY_SIZE", DEFAULT_HISTORY_SIZE)
+    with _history_lock:
+        window = _history[sample.key]
+        if window.maxlen != size:
+            window = _history[sample.key] = deque(window, maxlen=size)
+        window.append(sample)
+
+
+@contextmanager
+def measure(key):
+    """Time the enclosed block as one sample under ``key``; yields the Sample (None when disabled)."""
+    if not enabled():
+        yield None
+        return
+
+    sample = Sample(key)
+    token = _current.set(sample)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(sample.sql_wrapper))
+            yield sample
+    finally:
+        sample.wall = time.perf_counter() - sample.started
+        _current.reset(token)
+        parent = _current.get()
+        if parent is not None:   # e.g. a job run inline inside a request: its spans show up in the request too
+            for name, seconds in sample.spans.items():
+                parent.spans[name] += seconds
+        _record(sample)
+
+
+@contextmanager
+def span(name):
+    """Add the enclosed block's duration to the current sample under ``name`` (no-op outside ``measure``)."""
+    sample = _current.get()
+    if sample is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        sample.spans[name] += time.perf_counter() - started
+
+
+# -------------------------------
+# TEMPLATE RENDER SPANS
+# -------------------------------
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with span("template"):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The stock Django template backend with every top-level render timed as the ``template`` span."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+# -------------------------------
+# HISTOGRAMS
+# -------------------------------
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def perf_summary():
+    """{key: stats} over each rolling window, slowest p95 first. Times in ms."""
+    with _history_lock:
+        windows = {key: list(window) for key, window in _history.items() if window}
+
+    summary = {}
+    for key, samples in windows.items():
+        walls = sorted(sample.wall * 1000 for sample in samples)
+        buckets = {f"<={bound}": 0 for bound in HISTOGRAM_BUCKETS_MS}
+        buckets[f">{HISTOGRAM_BUCKETS_MS[-1]}"] = 0
+        for wall in walls:
+            bound = next((b for b in HISTOGRAM_BUCKETS_MS if wall <= b), None)
+            buckets[f"<={bound}" if bound else f">{HISTOGRAM_BUCKETS_MS[-1]}"] += 1
+
+        span_totals = defaultdict(float)
+        for sample in samples:
+            for name, seconds in sample.spans.items():
+                span_totals[name] += seconds
+        count = len(samples)
+        summary[key] = {
+            "count": count,
+            "p50_ms": round(_percentile(walls, 0.50), 2),
+            "p95_ms": round(_percentile(walls, 0.95), 2),
+            "p99_ms": round(_percentile(walls, 0.99), 2),
+            "max_ms": round(walls[-1], 2),
+            "avg_sql_queries": round(sum(s.sql_count for s in samples) / count, 2),
+            "avg_sql_ms": round(sum(s.sql_time for s in samples) * 1000 / count, 2),
+            "avg_span_ms": {name: round(total * 1000 / count, 2) for name, total in sorted(span_totals.items())},
+            "histogram_ms": buckets,
+        }
+    return dict(sorted(summary.items(), key=lambda item: item[1]["p95_ms"], reverse=True))
+
+
+def reset_history():
+    with _history_lock:
+        _history.clear()
@@ -45,9 +45,11 @@ INSTALLED_APPS = [
     'payslips',
     'releaving',
     'accounts',
+    'jobs',
 ]
 
 MIDDLEWARE = [
+    'accounts.middleware.PerformanceMiddleware',   # first, so it times every other middleware too
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -63,7 +65,7 @@ ROOT_URLCONF = 'hrms.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'hrms.perf.TimedDjangoTemplates',   # DjangoTemplates + a render-time span
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -139,10 +141,69 @@ LOGIN_REDIRECT_URL = '/dashboard/'  # where to go after login
 
 
 # --- Session timeout ---
-SESSION_COOKIE_AGE = 60*15 # 60 seconds = 1 minute
-SESSION_SAVE_EVERY_REQUEST = True  # Reset timer on each request
+# AuthRequiredMiddleware logs a user out after SESSION_TIMEOUT idle seconds. It only rewrites
+# the session's last_activity once it is SESSION_ACTIVITY_GRANULARITY seconds old, so most
+# requests do not save the session at all.
+SESSION_TIMEOUT = 60*15
+SESSION_ACTIVITY_GRANULARITY = 60
+SESSION_COOKIE_AGE = SESSION_TIMEOUT + SESSION_ACTIVITY_GRANULARITY  # store-side expiry, a backstop
+SESSION_SAVE_EVERY_REQUEST = False  # saved only when modified (login, messages, activity refresh)
+
+# Sessions live in the database, so every web process sees the same ones.
+# A cache-backed engine needs a shared cache alias; the granularity above already keeps writes rare.
+SESSION_ENGINE = "django.contrib.sessions.backends.db"
 
 # Optional security settings
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True  # Logs out when browser closes
 SESSION_COOKIE_HTTPONLY = True           # Prevent JavaScript access
-CSRF_COOKIE_HTTPONLY = True              # Extra security
\ No newline at end of file
+CSRF_COOKIE_HTTPONLY = True              # Extra security
+
+# --- Generated documents ---
+DOCX_TEMPLATE_CACHE_SIZE = 8  # parsed .docx templates kept per worker process
+
+# Generated letters / payslips / PDFs are written through the default storage (hrms/storage.py)
+STORAGES = {
+    "default": {"BACKEND": "hrms.storage.AtomicFileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+# Shared S3 / MinIO bucket for several app servers (pip install django-storages boto3):
+# STORAGES["default"] = {
+#     "BACKEND": "storages.backends.s3.S3Storage",
+#     "OPTIONS": {"bucket_name": "hrms-documents", "endpoint_url": "http://minio:9000", "file_overwrite": True},
+# }
+
+# --- Caches ---
+# "shared" is read and invalidated by every process (web workers, run_workers, management
+# commands), so it must not be per-process LocMem (system check hrms.W001). The database
+# backend needs no extra service; create its table once with `manage.py createcachetable`.
+# Swap in Redis / Memcached here when several app servers run.
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "shared": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "hrms_cache"},
+}
+
+# Known-present document names are cached so list pages skip a stat per row (hrms/storage.py).
+FILE_PRESENCE_CACHE = "shared"
+FILE_PRESENCE_TTL = 300   # seconds; None = until invalidated or `manage.py reconcile_documents`
+
+# --- Dashboard KPIs (accounts/metrics.py) ---
+DASHBOARD_METRICS_CACHE = "shared"    # invalidated by workers and commands too, so never per-process
+DASHBOARD_METRICS_TTL = 600           # seconds; saves and deletes invalidate sooner
+
+# --- Employee list ---
+EMPLOYEE_LIST_PAGE_SIZE = 50  # rows per page (?page_size= overrides, max 500)
+
+# --- Background jobs (letter / payslip generation) ---
+JOBS_RUN_ASYNC = True      # queue for `manage.py run_workers`; False renders inline in the request
+JOBS_POLL_INTERVAL = 1.0   # seconds an idle worker waits before checking the queue again
+JOBS_STALE_AFTER = 600     # seconds before a "running" job with a dead worker is re-queued
+
+# --- PDF copies of generated documents (needs LibreOffice; DOCX-only without it) ---
+PDF_CONVERSION_ENABLED = True
+SOFFICE_BINARY = None           # path or command name; None looks for soffice / libreoffice on PATH
+PDF_CONVERSION_TIMEOUT = 120    # seconds
+
+# --- Request / job timing (hrms/perf.py) ---
+PERF_INSTRUMENTATION = True   # SQL + span timing per request and per job
+PERF_SERVER_TIMING = True     # add a Server-Timing header to every response
+PERF_HISTORY_SIZE = 500       # samples kept per view / job kind for the histograms (per process)
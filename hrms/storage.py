@@ -0,0 +1,232 @@
+# hrms/storage.py — persistence of generated documents through Django's Storage API
+
+"""
+Generators render into memory and hand the bytes to ``save_docx`` / ``save_document``,
+which write through ``default_storage``. They never touch paths. Which backend that is
+comes from ``settings.STORAGES["default"]``:
+
+* ``AtomicFileSystemStorage`` (the default): MEDIA_ROOT on local disk. Each file is
+  written to a temporary file in the target directory and then ``os.replace``-d
+  over the old one. Two regenerations racing each other leave one complete file,
+  never a torn one.
+* any S3-compatible backend, e.g. django-storages' ``S3Storage`` with
+  ``file_overwrite=True`` (AWS, MinIO). An object PUT is atomic there anyway.
+
+Document names are deterministic, so a regeneration replaces the previous file in
+place. Callers store the name returned by the storage on the FileField.
+
+``documents_present`` / ``document_exists`` answer from a presence cache (the
+``FILE_PRESENCE_CACHE`` alias in CACHES) before asking the storage, so list pages do not
+stat one file per row; a page of names is one ``get_many``. The alias must be shared by
+every process (web workers, ``run_workers``, management commands) or a delete in one
+is invisible to the others — the ``hrms.W001`` check warns when it is process-local.
+``manage.py migrate`` creates a DatabaseCache table (jobs migration 0004). A failing
+cache only costs stats: its errors read as misses and are never raised.
+``save_document`` marks a name present and ``delete_document`` forgets it. Entries
+expire after ``FILE_PRESENCE_TTL`` seconds (None keeps them until invalidated), and
+``manage.py reconcile_documents`` rescans the media directories to correct files
+added or removed behind the application's back. Only presence is cached: a miss
+always asks the storage, so a file another process has just written shows up at once.
+"""
+
+from dataclasses import dataclass, field
+import io
+import os
+import tempfile
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import models
+
+DEFAULT_PRESENCE_TTL = 300   # seconds
+
+
+class AtomicFileSystemStorage(FileSystemStorage):
+    """FileSystemStorage that overwrites an existing name atomically (temp file + rename)."""
+
+    def get_available_name(self, name, max_length=None):
+        name = str(name).replace("\\", "/")
+        if max_length is not None and len(name) > max_length:
+            raise SuspiciousFileOperation(f"Storage can not find an available filename for {name!r}.")
+        return name
+
+    def _save(self, name, content):
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        if self.directory_permissions_mode is not None:
+            os.chmod(directory, self.directory_permissions_mode)
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.splitext(full_path)[1])
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                for chunk in content.chunks():
+                    fh.write(chunk)
+                fh.flush()
+                os.fsync(fh.fileno())
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)   # mkstemp creates 0600
+            os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return str(name).replace("\\", "/")
+
+
+# -------------------------------
+# FILE PRESENCE CACHE
+# -------------------------------
+def _presence_cache():
+    return caches[getattr(settings, "FILE_PRESENCE_CACHE", "default")]
+
+
+def _presence_ttl():
+    return getattr(settings, "FILE_PRESENCE_TTL", DEFAULT_PRESENCE_TTL)
+
+
+def presence_key(name, storage=None):
+    storage = storage or default_storage
+    return f"docexists:{storage.__class__.__name__}:{name}"
+
+
+def mark_present(names, storage=None):
+    if names:
+        try:
+            _presence_cache().set_many({presence_key(name, storage): True for name in names}, _presence_ttl())
+        except Exception:   # cache down / table missing: the next lookup stats instead
+            pass
+
+
+def forget_presence(names, storage=None):
+    if names:
+        try:
+            _presence_cache().delete_many([presence_key(name, storage) for name in names])
+        except Exception:   # entries still expire after FILE_PRESENCE_TTL
+            pass
+
+
+def _cached_present(keys):
+    try:
+        return _presence_cache().get_many(keys)
+    except Exception:   # a cache failure is a miss, never a broken page
+        return {}
+
+
+def documents_present(names, storage=None):
+    """
+    The subset of ``names`` that is in storage: one cache read for the lot, and a stat
+    only for the names the cache does not know to be there.
+    """
+    storage = storage or default_storage
+    keys = {presence_key(name, storage): name for name in names if name}
+    if not keys:
+        return set()
+    present = {keys[key] for key in _cached_present(list(keys))}
+    found = [name for name in set(keys.values()) - present if storage.exists(name)]
+    mark_present(found, storage)
+    return present.union(found)
+
+
+def document_exists(name, storage=None):
+    """True when ``name`` is in storage — from the presence cache when it is known to be there."""
+    return bool(name) and name in documents_present([name], storage)
+
+
+# -------------------------------
+# SAVE / DELETE
+# -------------------------------
+def save_document(name, content, storage=None, mark=True):
+    """
+    Store ``content`` (bytes or a File) as ``name``; returns the stored name. ``mark=False``
+    skips the presence cache (a forked worker with no database connection of its own);
+    the caller then marks the names itself.
+    """
+    storage = storage or default_storage
+    if not isinstance(content, File):
+        content = ContentFile(content)
+    name = storage.save(name, content)
+    if mark:
+        mark_present([name], storage)
+    return name
+
+
+def save_docx(name, doc, storage=None, mark=True):
+    """Serialize a rendered DocxTemplate in memory and store it as ``name``; returns the stored name."""
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return save_document(name, buffer.getvalue(), storage, mark=mark)
+
+
+def delete_document(name, storage=None):
+    """Remove ``name`` from storage (no-op when it is already gone) and from the presence cache."""
+    if not name:
+        return
+    storage = storage or default_storage
+    forget_presence([name], storage)
+    storage.delete(name)
+
+
+# -------------------------------
+# RECONCILIATION
+# -------------------------------
+@dataclass
+class ReconcileResult:
+    present: int = 0
+    missing: list = field(default_factory=list)   # [(model label, pk, field name, file name)]
+
+
+def document_fields():
+    """(model, FileField) for every file field of the installed models."""
+    for model in apps.get_models():
+        for model_field in model._meta.get_fields():
+            if isinstance(model_field, models.FileField):
+                yield model, model_field
+
+
+def stored_names(storage, directories):
+    """Every file name under ``directories`` — one os.scandir per directory on local disk."""
+    names = set()
+    for directory in directories:
+        if isinstance(storage, FileSystemStorage):
+            try:
+                with os.scandir(storage.path(directory)) as entries:
+                    names.update(f"{directory}/{entry.name}" if directory else entry.name
+                                 for entry in entries if entry.is_file())
+            except FileNotFoundError:
+                continue
+        else:
+            _, files = storage.listdir(directory)
+            names.update(f"{directory}/{name}" if directory else name for name in files)
+    return names
+
+
+def reconcile_documents():
+    """
+    Rescan the media directories behind every FileField and make the presence cache match:
+    files that are there are marked present, referenced files that are gone are forgotten.
+    """
+    result = ReconcileResult()
+    referenced = {}   # storage -> {file name: [(model label, pk, field name)]}
+    for model, model_field in document_fields():
+        rows = model.objects.exclude(**{f"{model_field.name}__isnull": True}).exclude(**{model_field.name: ""})
+        for pk, name in rows.values_list("pk", model_field.name).iterator():
+            referenced.setdefault(model_field.storage, {}).setdefault(name, []).append(
+                (model._meta.label, pk, model_field.name)
+            )
+
+    for storage, names in referenced.items():
+        found = stored_names(storage, {os.path.dirname(name) for name in names})
+        present = [name for name in names if name in found]
+        gone = [name for name in names if name not in found]
+        mark_present(present, storage)
+        forget_presence(gone, storage)
+        result.present += len(present)
+        result.missing.extend((label, pk, field_name, name) for name in gone for label, pk, field_name in names[name])
+
+    result.missing.sort()
+    return result
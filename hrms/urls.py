@@ -27,6 +27,7 @@ urlpatterns = [
     path('hikeletters/', include('hikeletters.urls')),
     path('payslips/', include('payslips.urls')),
     path('releaving/', include('releaving.urls')),
+    path('jobs/', include('jobs.urls', namespace='jobs')),
     path('', home, name='home'),
 
 ]
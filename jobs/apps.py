@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+from django.core import checks
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs'
+
+    def ready(self):
+        # Each app registers its background tasks in <app>/tasks.py
+        autodiscover_modules('tasks')
+
+        # Workers and web processes must share the caches they invalidate for each other
+        from hrms.checks import shared_cache_check
+        checks.register(shared_cache_check, checks.Tags.caches)
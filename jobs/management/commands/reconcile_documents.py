@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hrms.storage import reconcile_documents
+
+
+class Command(BaseCommand):
+    help = "Rescan the generated-document directories and refresh the file presence cache"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=None,
+                            help="Repeat every N seconds instead of running once (or schedule it with cron)")
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        if interval is not None and interval <= 0:
+            raise CommandError("--interval must be positive.")
+
+        while True:
+            started = time.perf_counter()
+            result = reconcile_documents()
+            self.stdout.write(
+                f"{result.present} document(s) present, {len(result.missing)} missing "
+                f"({time.perf_counter() - started:.2f}s)."
+            )
+            if options["verbosity"] > 1:
+                for label, pk, field_name, name in result.missing:
+                    self.stdout.write(f"  missing: {label} #{pk} {field_name} -> {name}")
+            if interval is None:
+                return
+            time.sleep(interval)
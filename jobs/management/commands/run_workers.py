@@ -0,0 +1,61 @@
+import multiprocessing
+import signal
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from jobs.queue import recover_stale_jobs, work, worker_name
+
+
+def _worker_main(index, poll_interval, burst, stop):
+    """Entry point of one worker process (safe under both fork and spawn)."""
+    django.setup()
+    # Finish the job in hand on Ctrl+C / SIGTERM instead of dying mid-render
+    signal.signal(signal.SIGINT, lambda *args: stop.set())
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    work(worker_name(index), poll_interval=poll_interval, burst=burst, should_stop=stop.is_set)
+
+
+class Command(BaseCommand):
+    help = "Run background worker processes for queued letter / payslip jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Number of worker processes (default: 2)")
+        parser.add_argument("--poll-interval", type=float, default=None,
+                            help="Seconds to sleep when the queue is empty (default: JOBS_POLL_INTERVAL)")
+        parser.add_argument("--burst", action="store_true",
+                            help="Exit once the queue is empty instead of waiting for new jobs")
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1.")
+
+        recovered = recover_stale_jobs()
+        if recovered:
+            self.stdout.write(f"Recovered {recovered} job(s) left running by a stopped worker.")
+
+        connections.close_all()   # never share a DB connection with forked children
+        stop = multiprocessing.Event()
+        processes = [
+            multiprocessing.Process(
+                target=_worker_main,
+                args=(index, options["poll_interval"], options["burst"], stop),
+                name=f"hrms-worker-{index}",
+            )
+            for index in range(options["workers"])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(self.style.SUCCESS(f"Started {len(processes)} worker(s). Press Ctrl+C to stop."))
+
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            stop.set()
+            self.stdout.write("Stopping workers after their current job...")
+            for process in processes:
+                process.join()
+        self.stdout.write("Workers stopped.")
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='job',
+            name='kind',
+            field=models.CharField(choices=[('offer_letter', 'Offer Letter'), ('hike_letter', 'Hike Letter'), ('payslip', 'Payslip'), ('relieving_letter', 'Relieving Letter'), ('pdf', 'PDF Conversion')], max_length=50),
+        ),
+    ]
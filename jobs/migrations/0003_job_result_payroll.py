@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_alter_job_kind'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='result',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name='job',
+            name='kind',
+            field=models.CharField(choices=[('offer_letter', 'Offer Letter'), ('hike_letter', 'Hike Letter'), ('payslip', 'Payslip'), ('relieving_letter', 'Relieving Letter'), ('pdf', 'PDF Conversion'), ('payroll', 'Payroll Run')], max_length=50),
+        ),
+    ]
@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import models
+
+from employees.models import Employee
+
+
+class Job(models.Model):
+    """A unit of background work (letter / payslip rendering) picked up by ``manage.py run_workers``."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    KIND_CHOICES = [
+        ("offer_letter", "Offer Letter"),
+        ("hike_letter", "Hike Letter"),
+        ("payslip", "Payslip"),
+        ("relieving_letter", "Relieving Letter"),
+        ("pdf", "PDF Conversion"),
+        ("payroll", "Payroll Run"),
+    ]
+
+    kind = models.CharField(max_length=50, choices=KIND_CHOICES)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    progress = models.PositiveSmallIntegerField(default=0)   # 0-100
+    message = models.CharField(max_length=255, blank=True)
+    result_file = models.CharField(max_length=255, blank=True)   # file name in the default storage
+    result = models.JSONField(default=dict, blank=True)   # structured outcome, e.g. a payroll run's counts
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)
+
+    employee = models.ForeignKey(Employee, on_delete=models.SET_NULL, null=True, blank=True, related_name="jobs")
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    next_url = models.CharField(max_length=255, blank=True)   # where the progress page sends the user afterwards
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-id"]
+        indexes = [
+            # Workers claim the oldest queued job: WHERE status = 'queued' ORDER BY id
+            models.Index(fields=["status", "id"], name="job_status_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED)
+
+    @property
+    def result_url(self):
+        return default_storage.url(self.result_file) if self.result_file else ""
+
+    def report(self, progress, message=""):
+        """Record progress from inside a running task."""
+        self.progress = max(0, min(int(progress), 100))
+        self.message = message[:255]
+        Job.objects.filter(pk=self.pk).update(progress=self.progress, message=self.message)
+
+    def as_dict(self):
+        return {
+            "id": self.pk,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+            "result_url": self.result_url,
+            "next_url": self.next_url,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,154 @@
+# jobs/queue.py — database-backed job queue (no broker: the Job table *is* the queue)
+
+"""
+Producers call ``submit(kind, payload)``; ``manage.py run_workers`` processes claim
+queued jobs oldest first and run the task registered for ``kind``.
+
+Claiming is a conditional ``UPDATE ... WHERE status = 'queued'`` on one row, so two
+workers can never take the same job on any database, SQLite included.  Tasks live in
+each app's ``tasks.py`` (autodiscovered by ``JobsConfig.ready``) and are plain
+functions ``task(job, **payload)`` returning the generated file's name in the
+default storage.
+
+With ``settings.JOBS_RUN_ASYNC = False`` ``submit`` runs the job inline, so the same
+code path works without any worker running (tests, a laptop install).
+"""
+
+from datetime import timedelta
+import os
+import socket
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from hrms.perf import measure
+from .models import Job
+
+TASKS = {}
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_STALE_AFTER = 600   # seconds a job may stay "running" before it is considered orphaned
+MAX_ATTEMPTS = 3
+
+
+def task(kind):
+    """Register ``func`` as the handler for jobs of ``kind``."""
+    def register(func):
+        TASKS[kind] = func
+        return func
+    return register
+
+
+def run_async():
+    return getattr(settings, "JOBS_RUN_ASYNC", False)
+
+
+def worker_name(index=0):
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+# -------------------------------
+# PRODUCER
+# -------------------------------
+def submit(kind, payload, employee=None, user=None, next_url=""):
+    """Queue a job (or run it straight away when JOBS_RUN_ASYNC is off) and return it."""
+    if kind not in TASKS:
+        raise LookupError(f"No task registered for job kind '{kind}'")
+
+    job = Job.objects.create(
+        kind=kind,
+        payload=payload,
+        employee=employee,
+        created_by=user if user is not None and user.is_authenticated else None,
+        next_url=next_url,
+    )
+    if not run_async() and _claim(job.pk, "inline"):
+        job.refresh_from_db()
+        run_job(job)
+    return job
+
+
+# -------------------------------
+# CONSUMER
+# -------------------------------
+def _claim(pk, worker):
+    return Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+        status=Job.RUNNING,
+        worker=worker,
+        started_at=timezone.now(),
+        attempts=F("attempts") + 1,
+        progress=0,
+        error="",
+    )
+
+
+def claim_next(worker):
+    """Take the oldest queued job for ``worker``, or None when the queue is empty."""
+    while True:
+        pk = Job.objects.filter(status=Job.QUEUED).order_by("id").values_list("pk", flat=True).first()
+        if pk is None:
+            return None
+        if _claim(pk, worker):
+            return Job.objects.get(pk=pk)
+        # another worker won the race for this row — try the next one
+
+
+def run_job(job):
+    """Run a claimed job's task and record the outcome. Task errors mark the job failed, never raise."""
+    func = TASKS.get(job.kind)
+    try:
+        if func is None:
+            raise LookupError(f"No task registered for job kind '{job.kind}'")
+        with measure(f"job {job.kind}"):
+            result_file = func(job, **job.payload)
+    except Exception as e:
+        job.status = Job.FAILED
+        job.error = str(e) or e.__class__.__name__
+    else:
+        job.status = Job.DONE
+        job.progress = 100
+        job.result_file = result_file or ""
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "progress", "message", "result_file", "result", "error", "finished_at"])
+    return job
+
+
+def recover_stale_jobs(stale_after=None):
+    """
+    Jobs left "running" by a worker that died are re-queued (or failed after MAX_ATTEMPTS).
+    Returns the number of jobs touched.
+    """
+    stale_after = stale_after or getattr(settings, "JOBS_STALE_AFTER", DEFAULT_STALE_AFTER)
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    stale = Job.objects.filter(status=Job.RUNNING, started_at__lt=cutoff)
+
+    failed = stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=Job.FAILED, error="Worker stopped while running this job.", finished_at=timezone.now()
+    )
+    requeued = stale.update(status=Job.QUEUED, worker="")
+    return failed + requeued
+
+
+def work(worker, poll_interval=None, burst=False, should_stop=None):
+    """
+    Worker loop: claim and run jobs until ``should_stop()`` is true, or — with ``burst`` —
+    until the queue is empty. Returns the number of jobs processed.
+    """
+    poll_interval = poll_interval or getattr(settings, "JOBS_POLL_INTERVAL", DEFAULT_POLL_INTERVAL)
+    processed = 0
+
+    while not (should_stop and should_stop()):
+        close_old_connections()
+        job = claim_next(worker)
+        if job is None:
+            if burst:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
+    return processed
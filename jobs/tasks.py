@@ -0,0 +1,51 @@
+# jobs/tasks.py — background PDF conversion of generated documents
+
+import os
+import shutil
+import tempfile
+
+from django.apps import apps
+from django.core.files import File
+
+from hrms.pdf import convert_to_pdf, pdf_backend
+from hrms.storage import save_document
+from .queue import submit, task
+
+
+def queue_pdf_conversion(model_label, lookup, field, employee=None):
+    """
+    Queue a PDF conversion of ``field`` on the ``model_label`` row matching ``lookup``.
+    No-op (returns None) when no converter is installed — documents then stay DOCX-only.
+    """
+    if pdf_backend() is None:
+        return None
+    return submit("pdf", {"model": model_label, "lookup": lookup, "field": field}, employee=employee)
+
+
+@task("pdf")
+def convert_document(job, model, lookup, field):
+    Model = apps.get_model(model)
+    document = Model.objects.get(**lookup)
+    docx = getattr(document, field)
+    if not docx:
+        raise ValueError("There is no document to convert.")
+
+    job.report(10, "Converting to PDF")
+    # LibreOffice needs local files: copy the DOCX out of storage, convert, store the PDF back
+    with tempfile.TemporaryDirectory(prefix="hrms-pdf-") as workdir:
+        local_docx = os.path.join(workdir, os.path.basename(docx.name))
+        with docx.storage.open(docx.name, "rb") as source, open(local_docx, "wb") as target:
+            shutil.copyfileobj(source, target)
+
+        local_pdf = convert_to_pdf(local_docx)
+        if local_pdf is None:
+            job.report(100, "PDF conversion is not available; the DOCX is ready.")
+            return docx.name
+
+        job.report(80, "Saving PDF")
+        with open(local_pdf, "rb") as fh:
+            pdf_name = save_document(os.path.splitext(docx.name)[0] + ".pdf", File(fh), docx.storage)
+
+    Model.objects.filter(**lookup).update(pdf_file=pdf_name)
+    job.report(100, "PDF ready.")
+    return pdf_name
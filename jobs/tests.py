@@ -0,0 +1,196 @@
+from datetime import date
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from employees.models import Employee
+from hrms.checks import shared_cache_check
+from hrms.storage import AtomicFileSystemStorage, document_exists, reconcile_documents, save_document
+from offerletters.models import OfferLetter
+from releaving.models import ReleavingLetter
+from .models import Job
+from .queue import claim_next, submit, work
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media.name))
+        self.client.force_login(User.objects.create_user("hr", password="pass"))
+
+        self.employee = Employee.objects.create(
+            first_name="Ravi", last_name="Kumar", email="ravi@example.com", designation="Developer",
+        )
+        OfferLetter.objects.create(employee=self.employee, offer_date=date(2025, 1, 6), employee_code="STPL0125001")
+        self.url = reverse("generate_releaving", args=[self.employee.id])
+        self.form = {"releaving_date": "2025-06-30", "placed_in_company": "Acme"}
+
+    def test_job_pages_need_a_login(self):
+        job = Job.objects.create(kind="payroll", payload={"payroll_month": "2025-11-01"})
+        self.client.logout()
+        for name in ("jobs:job_detail", "jobs:job_status"):
+            url = reverse(name, args=[job.id])
+            response = self.client.get(url)
+            self.assertRedirects(response, f"{settings.LOGIN_URL}?next={url}", fetch_redirect_response=False)
+
+    @override_settings(JOBS_RUN_ASYNC=True)
+    def test_view_enqueues_and_worker_renders(self):
+        response = self.client.post(self.url, self.form)
+        job = Job.objects.get()
+        self.assertRedirects(response, reverse("jobs:job_detail", args=[job.id]))
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertFalse(ReleavingLetter.objects.exists())
+
+        self.assertEqual(work("test-worker", burst=True), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.progress, 100)
+        self.assertTrue(os.path.exists(os.path.join(self.media.name, job.result_file)))
+        letter = ReleavingLetter.objects.get(employee=self.employee)
+        self.assertEqual(letter.letter_file.name, job.result_file)
+
+        status = self.client.get(reverse("jobs:job_status", args=[job.id])).json()
+        self.assertEqual(status["status"], "done")
+        self.assertEqual(status["result_url"], f"/media/{job.result_file}")
+
+    @override_settings(JOBS_RUN_ASYNC=False)
+    def test_inline_mode_renders_in_request(self):
+        response = self.client.post(self.url, self.form)
+        self.assertRedirects(response, self.url)
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+        self.assertTrue(ReleavingLetter.objects.filter(employee=self.employee).exists())
+
+    @override_settings(JOBS_RUN_ASYNC=True)
+    def test_failed_task_is_recorded_and_claimed_once(self):
+        OfferLetter.objects.all().delete()   # task needs the offer letter the view checked for
+        job = submit("relieving_letter", {"employee_id": self.employee.id, "releaving_date": "2025-06-30"})
+
+        self.assertEqual(claim_next("worker-a").pk, job.pk)
+        self.assertIsNone(claim_next("worker-b"))
+
+        Job.objects.filter(pk=job.pk).update(status=Job.QUEUED)
+        work("worker-a", burst=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertTrue(job.error)
+
+    @override_settings(JOBS_RUN_ASYNC=True)
+    def test_unchanged_letter_is_not_rendered_again(self):
+        payload = {"employee_id": self.employee.id, "releaving_date": "2025-06-30", "placed_in_company": "Acme"}
+        submit("relieving_letter", payload)
+        work("test-worker", burst=True)
+        letter = ReleavingLetter.objects.get(employee=self.employee)
+        path = letter.letter_file.path
+        first_mtime = os.stat(path).st_mtime_ns
+        self.assertTrue(letter.render_fingerprint)
+
+        with patch("releaving.tasks.get_template") as get_template:
+            job = submit("relieving_letter", payload)
+            work("test-worker", burst=True)
+        get_template.assert_not_called()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(os.stat(path).st_mtime_ns, first_mtime)
+
+        submit("relieving_letter", {**payload, "placed_in_company": "Globex"})
+        work("test-worker", burst=True)
+        self.assertNotEqual(ReleavingLetter.objects.get(pk=letter.pk).render_fingerprint, letter.render_fingerprint)
+
+    @override_settings(JOBS_RUN_ASYNC=True)
+    def test_pdf_copy_is_converted_in_the_background(self):
+        def fake_convert(docx_path):
+            pdf_path = os.path.splitext(docx_path)[0] + ".pdf"
+            with open(pdf_path, "wb") as fh:
+                fh.write(b"%PDF-1.4")
+            return pdf_path
+
+        with patch("jobs.tasks.pdf_backend", return_value="uno"), \
+                patch("jobs.tasks.convert_to_pdf", side_effect=fake_convert):
+            submit("relieving_letter", {"employee_id": self.employee.id, "releaving_date": "2025-06-30"})
+            work("test-worker", burst=True)   # renders the DOCX, then runs the queued PDF job
+
+        letter = ReleavingLetter.objects.get(employee=self.employee)
+        self.assertEqual(letter.pdf_file.name, letter.letter_file.name.replace(".docx", ".pdf"))
+        self.assertEqual(Job.objects.get(kind="pdf").status, Job.DONE)
+
+    @override_settings(JOBS_RUN_ASYNC=True, PDF_CONVERSION_ENABLED=False)
+    def test_without_converter_documents_stay_docx_only(self):
+        submit("relieving_letter", {"employee_id": self.employee.id, "releaving_date": "2025-06-30"})
+        work("test-worker", burst=True)
+        self.assertFalse(Job.objects.filter(kind="pdf").exists())
+        self.assertFalse(ReleavingLetter.objects.get(employee=self.employee).pdf_file)
+
+
+class AtomicStorageTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        self.storage = AtomicFileSystemStorage(location=self.media.name)
+
+    def test_regeneration_replaces_the_file_in_place(self):
+        self.assertEqual(self.storage.save("payslips/a.docx", ContentFile(b"first")), "payslips/a.docx")
+        self.assertEqual(self.storage.save("payslips/a.docx", ContentFile(b"second")), "payslips/a.docx")
+        self.assertEqual(os.listdir(os.path.join(self.media.name, "payslips")), ["a.docx"])
+        with self.storage.open("payslips/a.docx") as fh:
+            self.assertEqual(fh.read(), b"second")
+
+    def test_failed_write_keeps_the_previous_file(self):
+        self.storage.save("payslips/a.docx", ContentFile(b"complete"))
+        with patch("os.fsync", side_effect=OSError("disk full")):   # fails after the partial write
+            with self.assertRaises(OSError):
+                self.storage.save("payslips/a.docx", ContentFile(b"partial"))
+        self.assertEqual(os.listdir(os.path.join(self.media.name, "payslips")), ["a.docx"])
+        with self.storage.open("payslips/a.docx") as fh:
+            self.assertEqual(fh.read(), b"complete")
+
+
+class FilePresenceCacheTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media.name))
+        caches["shared"].clear()
+
+    def test_saved_documents_are_known_without_a_stat_until_reconciled(self):
+        employee = Employee.objects.create(first_name="Ravi", email="ravi@example.com")
+        name = save_document("releaving_letters/Relieving_Ravi.docx", b"docx")
+        ReleavingLetter.objects.create(employee=employee, releaving_date=date(2025, 6, 30), letter_file=name)
+
+        with patch.object(default_storage, "exists", side_effect=AssertionError("stat")):
+            self.assertTrue(document_exists(name))
+
+        os.remove(os.path.join(self.media.name, name))   # deleted behind the application's back
+        self.assertTrue(document_exists(name))
+
+        result = reconcile_documents()
+        self.assertEqual(result.missing, [("releaving.ReleavingLetter", employee.releaving_letters.get().pk, "letter_file", name)])
+        self.assertFalse(document_exists(name))
+
+    def test_missing_cache_table_reads_as_misses_and_is_flagged(self):
+        self.assertEqual(shared_cache_check(None, databases=["default"]), [])
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TABLE hrms_cache")   # rolled back with the test
+        name = save_document("releaving_letters/Relieving_Ravi.docx", b"docx")
+        self.assertTrue(document_exists(name))
+        self.assertFalse(document_exists("releaving_letters/missing.docx"))
+        self.assertEqual([problem.id for problem in shared_cache_check(None, databases=["default"])],
+                         ["hrms.W002", "hrms.W002"])
+
+    def test_process_local_presence_cache_is_flagged(self):
+        self.assertEqual(shared_cache_check(None), [])
+        local = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        with override_settings(CACHES=local, FILE_PRESENCE_CACHE="default", DASHBOARD_METRICS_CACHE="default"):
+            self.assertEqual([problem.id for problem in shared_cache_check(None)], ["hrms.W001", "hrms.W001"])
+        with override_settings(CACHES=local, FILE_PRESENCE_CACHE="shared", DASHBOARD_METRICS_CACHE="default"):
+            self.assertEqual([problem.id for problem in shared_cache_check(None)], ["hrms.E001", "hrms.W001"])
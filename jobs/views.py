@@ -0,0 +1,38 @@
+# jobs/views.py — progress page + polling endpoint for background jobs
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+
+from .models import Job
+
+
+def respond_to_job(request, job, error_url=None):
+    """
+    Response for a view that just submitted ``job``. When it already ran inline the user goes
+    straight to ``job.next_url`` (or ``error_url`` on failure) with the outcome as a message;
+    otherwise to the progress page, which polls until the file is ready.
+    """
+    next_url = job.next_url or reverse("employees:employee_list")
+    if job.status == Job.DONE:
+        messages.success(request, job.message or "Done.")
+        return redirect(next_url)
+    if job.status == Job.FAILED:
+        messages.error(request, job.error)
+        return redirect(error_url or next_url)
+    messages.info(request, "Queued — the document is being generated in the background.")
+    return redirect("jobs:job_detail", job_id=job.id)
+
+
+@login_required
+def job_detail(request, job_id):
+    job = get_object_or_404(Job, id=job_id)
+    return render(request, "jobs/job_detail.html", {"job": job})
+
+
+@login_required
+def job_status(request, job_id):
+    job = get_object_or_404(Job, id=job_id)
+    return JsonResponse(job.as_dict())
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 01:49
+
+from django.db import migrations, models
+
+
+def backfill_series(apps, schema_editor):
+    """Copy the numeric part of existing STPLMMYY### codes into series_number and seed the sequence."""
+    OfferLetter = apps.get_model('offerletters', 'OfferLetter')
+    EmployeeCodeSequence = apps.get_model('offerletters', 'EmployeeCodeSequence')
+
+    highest = 0
+    for offer in OfferLetter.objects.exclude(employee_code__isnull=True).exclude(employee_code=""):
+        code = str(offer.employee_code).strip()
+        series_part = code[8:]
+        if code.startswith("STPL") and len(code) >= 11 and series_part.isdigit():
+            offer.series_number = int(series_part)
+            offer.save(update_fields=['series_number'])
+            highest = max(highest, offer.series_number)
+
+    EmployeeCodeSequence.objects.update_or_create(name="STPL", defaults={"last_value": highest})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offerletters', '0004_offerletter_variable_pay_per_annum'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeCodeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20, unique=True)),
+                ('last_value', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='offerletter',
+            name='series_number',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_series, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offerletters', '0005_employeecodesequence_series_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offerletter',
+            name='render_fingerprint',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
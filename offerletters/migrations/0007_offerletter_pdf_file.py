@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offerletters', '0006_offerletter_render_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='offerletter',
+            name='pdf_file',
+            field=models.FileField(blank=True, null=True, upload_to='offer_letters/'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:42
+
+from django.db import migrations, models
+
+
+def clear_duplicate_series(apps, schema_editor):
+    """Keep series_number on the oldest offer holding it; later duplicates (legacy data) lose it."""
+    OfferLetter = apps.get_model('offerletters', 'OfferLetter')
+    seen = set()
+    duplicates = []
+    for pk, series in OfferLetter.objects.exclude(series_number__isnull=True).order_by('id').values_list('id', 'series_number'):
+        if series in seen:
+            duplicates.append(pk)
+        seen.add(series)
+    OfferLetter.objects.filter(pk__in=duplicates).update(series_number=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offerletters', '0007_offerletter_pdf_file'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_series, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='offerletter',
+            name='series_number',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='offerletter',
+            constraint=models.UniqueConstraint(fields=('series_number',), name='unique_offer_series_number'),
+        ),
+    ]
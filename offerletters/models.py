@@ -6,8 +6,9 @@ class OfferLetter(models.Model):
     date_created = models.DateTimeField(auto_now_add=True)
     offer_date = models.DateField(null=True, blank=True)
     file = models.FileField(upload_to='offer_letters/')  # stores generated docx/pdf
+    pdf_file = models.FileField(upload_to="offer_letters/", blank=True, null=True)  # PDF copy next to the DOCX, if a converter is installed
     employee_code = models.CharField(max_length=20, blank=True, null=True)
-    series_number = models.IntegerField(blank=True, null=True)
+    series_number = models.IntegerField(blank=True, null=True)  # numeric part of STPLMMYY###, unique (see Meta)
     variable_pay_per_annum = models.DecimalField(
         max_digits=14, 
         decimal_places=2, 
@@ -16,6 +17,21 @@ class OfferLetter(models.Model):
         null=True,
         help_text="Optional Variable Pay (Annual) from offer letter"
     )
+    render_fingerprint = models.CharField(max_length=64, blank=True, default="")  # template + context hash of the file
+
+    class Meta:
+        constraints = [
+            # Backs the duplicate check in generate_offer_letter: two offers racing for one series cannot both save
+            models.UniqueConstraint(fields=["series_number"], name="unique_offer_series_number"),
+        ]
+
+    def __str__(self):
+        return f"Offer Letter for {self.employee.first_name}"
+
+class EmployeeCodeSequence(models.Model):
+    """Last STPL series handed out — one row per prefix, bumped with a single UPDATE while allocating."""
+    name = models.CharField(max_length=20, unique=True)
+    last_value = models.PositiveIntegerField(default=0)
 
     def __str__(self):
-        return f"Offer Letter for {self.employee.first_name}"
\ No newline at end of file
+        return f"{self.name}: {self.last_value}"
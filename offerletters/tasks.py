@@ -0,0 +1,189 @@
+# offerletters/tasks.py — offer letter rendering, run by a background worker (see jobs/queue.py)
+
+from django.conf import settings
+from django.db import IntegrityError
+from employees.history import offer_ctc, record_compensation
+from employees.models import CompensationRecord, Employee
+from jobs.queue import task
+from jobs.tasks import queue_pdf_conversion
+from .models import OfferLetter
+from .views import parse_series
+from hrms.compensation import annual_breakup
+from hrms.formatting import amount_in_words, indian_format
+from hrms.docx_templates import get_template, render_fingerprint, render_is_current
+from hrms.perf import span
+from hrms.storage import delete_document, save_docx
+from decimal import Decimal
+import os
+import re
+from datetime import date
+
+
+@task("offer_letter")
+def offer_letter(job, employee_id, offer_date, employee_code, variable_pay_annum="0.00", regenerated=False):
+    employee = Employee.objects.get(id=employee_id)
+    offer_date = date.fromisoformat(offer_date)
+    variable_pay_annum = Decimal(variable_pay_annum)
+
+    # Format date: 20th November, 2025
+    day = offer_date.day
+    suffix = "th" if 11 <= day <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+    formatted_date = f"{day}{suffix} {offer_date.strftime('%B, %Y')}"
+
+    # ===================================================================
+    # SALARY BREAKUP (hrms/compensation.py)
+    # ===================================================================
+    try:
+        per_month = Decimal(employee.package_per_month or 0)
+    except:
+        per_month = (Decimal(getattr(employee, "package_per_annum", 0) or 0) / 12).quantize(Decimal("0.01"))
+    per_annum = (per_month * 12).quantize(Decimal("0.01"))
+
+    pf_employer = Decimal("0.00")
+    target_incentives = Decimal("0.00")
+
+    annual = annual_breakup(per_annum)
+    monthly = annual.per_month()
+    total_ctc_annum = per_annum  # This is your original CTC
+
+    # Original CTC in words
+    try:
+        total_ctc_words = amount_in_words(total_ctc_annum)
+        total_ctc_words = re.sub(r"\s+", " ", total_ctc_words.replace(",", "")) + " Indian Rupees Only"
+    except:
+        total_ctc_words = ""
+
+    # Grand Total = Original CTC + Variable Pay
+    grand_total_ctc_annum = total_ctc_annum + variable_pay_annum
+
+    # Grand Total in Words (THIS is what you show in final offer letter)
+    try:
+        grand_total_words = amount_in_words(grand_total_ctc_annum)
+        grand_total_words = re.sub(r"\s+", " ", grand_total_words.replace(",", "")) + " Indian Rupees Only"
+    except:
+        grand_total_words = "Invalid Amount"
+
+    job.report(20, "Rendering offer letter")
+
+    # ===================================================================
+    # RENDER DOCX TEMPLATE
+    # ===================================================================
+    template_path = os.path.join(settings.BASE_DIR, "templates", "offer_template.docx")
+    if not os.path.exists(template_path):
+        raise FileNotFoundError("Offer template not found.")
+
+    address_lines = [line.strip() for line in str(getattr(employee, "address", "")).splitlines() if line.strip()]
+    formatted_address = "<w:br/>".join(address_lines) if address_lines else ""
+
+    display_total_ctc_annum = grand_total_ctc_annum if variable_pay_annum > 0 else total_ctc_annum
+    display_total_ctc_words = grand_total_words if variable_pay_annum > 0 else total_ctc_words
+
+    context = {
+        "date": formatted_date,
+        "first_name": employee.first_name,
+        "last_name": employee.last_name or "",
+        "address": formatted_address,
+        "designation": employee.designation or "",
+        "package_per_month": indian_format(per_month),
+        "package_per_annum": indian_format(per_annum),
+
+        # Original Breakup (unchanged)
+        "Basic_annum": indian_format(annual.basic),
+        "HRA_annum": indian_format(annual.hra),
+        "Conveyance_annum": indian_format(annual.conveyance),
+        "Performance_Incentives_annum": indian_format(annual.performance),
+        "Special_Allowance_annum": indian_format(annual.special),
+        "PF_Employer_annum": indian_format(pf_employer),
+        "Variable_Pay_annum": indian_format(variable_pay_annum),           # NEW
+        "Target_Incentives_annum": indian_format(target_incentives),
+
+        "Basic_month": indian_format(monthly.basic),
+        "HRA_month": indian_format(monthly.hra),
+        "Conveyance_month": indian_format(monthly.conveyance),
+        "Performance_Incentives_month": indian_format(monthly.performance),
+        "Special_Allowance_month": indian_format(monthly.special),
+        "SubTotal":indian_format(total_ctc_annum),
+
+        "Total_CTC_annum": indian_format(display_total_ctc_annum),   # Auto switches
+        "Total_CTC_words": display_total_ctc_words,                # Original CTC
+        "Total_CTC_month": indian_format(per_month),
+                                       # Old words
+
+        # NEW FINAL FIELDS (USE THESE IN TEMPLATE)
+        "Grand_Total_CTC_annum": indian_format(grand_total_ctc_annum),
+        "Grand_Total_CTC_words": grand_total_words,
+        "Has_Variable_Pay": variable_pay_annum > 0,
+
+        "employee_code": employee_code,
+    }
+
+    safe_name = re.sub(r"[^\w]", "_", f"{employee.first_name}_{employee.last_name or ''}".strip())
+    filename = f"Offer_{employee_code}_{safe_name}.docx"
+
+    # Same template + same context as the stored file → keep it, skip the render
+    fingerprint = render_fingerprint(template_path, context)
+    existing = OfferLetter.objects.filter(employee=employee).first()
+    unchanged = existing is not None and render_is_current(existing.render_fingerprint, fingerprint, existing.file.name)
+
+    if unchanged:
+        file_name = existing.file.name
+    else:
+        if existing is not None:
+            delete_document(existing.pdf_file.name)   # the new DOCX makes the old PDF stale
+        doc = get_template(template_path)
+        try:
+            with span("docx_render"):
+                doc.render(context)
+        except Exception as e:
+            raise RuntimeError(f"Template rendering failed: {e}")
+
+        job.report(70, "Saving offer letter")
+
+        # ===================================================================
+        # SAVE FILE (default storage, replaced atomically) & DATABASE
+        # ===================================================================
+        try:
+            with span("file_save"):
+                file_name = save_docx(f"offer_letters/{filename}", doc)
+        except Exception as e:
+            raise RuntimeError(f"Failed to save file: {e}")
+
+    # A reused code keeps its stored series: legacy duplicates were cleared to None by
+    # migration 0008 and re-deriving theirs would collide with the offer that kept it
+    reused_code = existing is not None and existing.employee_code == employee_code
+    try:
+        offer, _ = OfferLetter.objects.update_or_create(
+            employee=employee,
+            defaults={
+                "offer_date": offer_date,
+                "employee_code": employee_code,
+                **({} if reused_code else {"series_number": parse_series(employee_code)}),
+                "file": file_name,
+                "variable_pay_per_annum":variable_pay_annum,
+                "render_fingerprint": fingerprint,
+                **({} if unchanged else {"pdf_file": None}),   # a fresh DOCX makes the old PDF stale
+            }
+        )
+    except IntegrityError:
+        # Another offer took this series between the view's duplicate check and now
+        if not unchanged:
+            delete_document(file_name)
+        raise ValueError(f"Employee code {employee_code} is already used by another offer letter.")
+    # The letter prints the figures above; the history uses the backfill / payslip rule (per annum first)
+    record_compensation(
+        employee, CompensationRecord.OFFER, offer_ctc(employee), offer_date,
+        variable_pay_per_annum=variable_pay_annum, employee_code=employee_code,
+    )
+    if not offer.pdf_file:
+        queue_pdf_conversion("offerletters.OfferLetter", {"pk": offer.pk}, "file", employee=employee)
+
+    if hasattr(employee, 'employee_code'):
+        employee.employee_code = employee_code
+        employee.save(update_fields=['employee_code'])
+
+    if unchanged:
+        job.report(100, f"Offer letter is already up to date: {employee_code}")
+    else:
+        action = "Re-generated" if regenerated else "Generated"
+        job.report(100, f"Offer letter {action.lower()} successfully: {employee_code}")
+    return file_name
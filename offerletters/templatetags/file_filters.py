@@ -1,17 +1,18 @@
-import os
 from django import template
 
+from hrms.storage import document_exists
+
 register = template.Library()
 
 @register.filter
 def file_exists(file_field):
     """
-    Check if a given file actually exists in the media folder.
+    Check if a given file actually exists in its storage (through the presence cache).
     Used in templates like {{ offer.file|file_exists }}
     """
     try:
         if not file_field:
             return False
-        return os.path.exists(file_field.path)
+        return document_exists(file_field.name, file_field.storage)
     except Exception:
         return False
\ No newline at end of file
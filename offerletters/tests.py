@@ -1,3 +1,99 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+from importlib import import_module
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from employees.models import Employee
+from hrms.docx_templates import render_fingerprint
+from hrms.formatting import indian_format
+from .models import EmployeeCodeSequence, OfferLetter
+from .views import get_next_global_series
+
+
+class EmployeeCodeSeriesTests(TestCase):
+    def make_employee(self, name):
+        return Employee.objects.create(first_name=name, last_name="K", email=f"{name.lower()}@example.com",
+                                       designation="Developer", package_per_month=50000, package_per_annum=600000)
+
+    def test_allocation_counts_up_and_manual_series_only_raises_it(self):
+        EmployeeCodeSequence.objects.update_or_create(name="STPL", defaults={"last_value": 7})
+        self.assertEqual([get_next_global_series(), get_next_global_series()], [8, 9])
+        self.assertEqual(get_next_global_series(at_least=40), 40)
+        self.assertEqual(get_next_global_series(at_least=12), 40)   # never goes back down
+        self.assertEqual(get_next_global_series(), 41)
+
+    @override_settings(JOBS_RUN_ASYNC=False, PDF_CONVERSION_ENABLED=False)
+    def test_manual_code_is_used_once_and_auto_numbering_continues_above_it(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.client.force_login(User.objects.create_user("hr", password="pass"))
+        EmployeeCodeSequence.objects.update_or_create(name="STPL", defaults={"last_value": 3})
+        anita, bala, chitra = (self.make_employee(name) for name in ("Anita", "Bala", "Chitra"))
+
+        manual = {"offer_date": "2025-11-03", "code_mode": "manual", "final_employee_code": "STPL1125050"}
+        self.client.post(reverse("generate_offer_letter", args=[anita.id]), manual)
+        self.assertEqual(OfferLetter.objects.get(employee=anita).series_number, 50)
+
+        self.client.post(reverse("generate_offer_letter", args=[bala.id]), manual)   # same code again
+        self.assertFalse(OfferLetter.objects.filter(employee=bala).exists())
+
+        self.client.post(reverse("generate_offer_letter", args=[chitra.id]), {"offer_date": "2025-11-03"})
+        self.assertEqual(OfferLetter.objects.get(employee=chitra).employee_code, "STPL1125051")
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            OfferLetter.objects.create(employee=bala, employee_code="STPL1125050", series_number=50)
+
+    @override_settings(JOBS_RUN_ASYNC=False, PDF_CONVERSION_ENABLED=False)
+    def test_offer_whose_duplicate_series_was_cleared_can_be_regenerated(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.client.force_login(User.objects.create_user("hr", password="pass"))
+        anita, bala = self.make_employee("Anita"), self.make_employee("Bala")
+        OfferLetter.objects.create(employee=anita, employee_code="STPL0125007", series_number=7)
+        # legacy duplicate: migration 0008 cleared its series_number
+        OfferLetter.objects.create(employee=bala, employee_code="STPL0225007", series_number=None)
+
+        self.client.post(reverse("generate_offer_letter", args=[bala.id]), {"offer_date": "2025-02-03"})
+
+        offer = OfferLetter.objects.get(employee=bala)
+        self.assertEqual((offer.employee_code, offer.series_number), ("STPL0225007", None))
+        self.assertTrue(offer.file)
+
+    @override_settings(JOBS_RUN_ASYNC=False, PDF_CONVERSION_ENABLED=False)
+    def test_letter_prints_the_monthly_package_and_history_records_per_annum_first(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.client.force_login(User.objects.create_user("hr", password="pass"))
+        anita = self.make_employee("Anita")
+        Employee.objects.filter(pk=anita.pk).update(package_per_annum=660000)   # disagrees with 50000 / month
+
+        with mock.patch("offerletters.tasks.render_fingerprint", wraps=render_fingerprint) as fingerprint:
+            self.client.post(reverse("generate_offer_letter", args=[anita.id]), {"offer_date": "2025-11-03"})
+        context = fingerprint.call_args.args[1]
+        self.assertEqual((context["package_per_month"], context["package_per_annum"]),
+                         (indian_format(Decimal("50000")), indian_format(Decimal("600000"))))
+        self.assertEqual(anita.compensation_history.get().ctc_per_annum, 660000)
+
+    def test_migration_backfills_series_and_seeds_the_sequence(self):
+        migration = import_module("offerletters.migrations.0005_employeecodesequence_series_index")
+        employee = self.make_employee("Anita")
+        for code in ("STPL0125007", "STPL0325112", "EMP-9", ""):
+            OfferLetter.objects.create(employee=employee, employee_code=code)
+        EmployeeCodeSequence.objects.all().delete()
+
+        migration.backfill_series(apps, None)
+
+        self.assertEqual(
+            list(OfferLetter.objects.order_by("id").values_list("series_number", flat=True)), [7, 112, None, None],
+        )
+        self.assertEqual(EmployeeCodeSequence.objects.get(name="STPL").last_value, 112)
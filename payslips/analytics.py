@@ -0,0 +1,157 @@
+# payslips/analytics.py — payroll register and cost analytics across months (pandas)
+
+"""
+``payroll_analytics`` loads a range of months of payslips with one narrow ``values_list``
+query straight into a DataFrame. Amounts are cast to float in SQL, so no Decimal objects
+are built. The employees on those payslips come from a second query, one row each,
+and are joined in by ``employee_id`` instead of repeating their names on every payslip.
+All the work is vectorized: groupbys for the per-month, per-designation and
+per-employee totals, and ``diff`` / ``pct_change`` for month-over-month deltas. No
+Python loop runs over payslip rows.
+
+``Payslip.month_year`` is free text ("November 2025"). The range filter matches it
+against the labels of the requested months, so every loaded label parses back into a
+month with one ``pd.to_datetime`` call.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+import io
+
+import pandas as pd
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+
+from employees.models import Employee
+from .models import Payslip
+
+AMOUNTS = ["gross", "deductions", "net"]
+DEFAULT_MONTHS = 12
+
+
+@dataclass
+class PayrollAnalytics:
+    first_month: date
+    last_month: date
+    by_month: pd.DataFrame         # month, payslips, employees, gross, deductions, net, net_change, net_change_pct
+    by_designation: pd.DataFrame   # month, designation, employees, gross, deductions, net
+    by_employee: pd.DataFrame      # employee_id, emp_code, name, designation, months, totals, last_net, net_change
+
+    @property
+    def totals(self):
+        return {column: float(self.by_month[column].sum()) for column in AMOUNTS}
+
+
+def month_range(first_month, last_month):
+    """Month labels exactly as the payslip generators write them, first to last inclusive."""
+    return [period.strftime("%B %Y") for period in pd.period_range(first_month, last_month, freq="M")]
+
+
+def payslip_frame(first_month, last_month):
+    """
+    (payslips, employees) for the months in range: one row per payslip with its month and
+    amounts, and one row per employee on them (indexed by id). Two queries, no model instances.
+    """
+    payslips = Payslip.objects.filter(month_year__in=month_range(first_month, last_month))
+    rows = payslips.annotate(
+        gross=Cast("gross_salary", FloatField()),
+        deduction_amount=Cast("deductions", FloatField()),
+        net=Cast("net_salary", FloatField()),
+    ).values_list("month_year", "employee_id", "gross", "deduction_amount", "net")
+    df = pd.DataFrame.from_records(rows.iterator(chunk_size=5000), columns=["month_year", "employee_id", *AMOUNTS])
+    df["month"] = pd.to_datetime(df["month_year"], format="%B %Y")
+    df[AMOUNTS] = df[AMOUNTS].fillna(0.0)
+
+    people = Employee.objects.filter(pk__in=payslips.values("employee_id")).values_list(
+        "id", "employee_code", "first_name", "last_name", "designation",
+    )
+    employees = pd.DataFrame.from_records(
+        people.iterator(), columns=["employee_id", "emp_code", "first_name", "last_name", "designation"],
+    ).set_index("employee_id")
+    employees["emp_code"] = employees["emp_code"].fillna("-")
+    employees["name"] = (employees["first_name"].fillna("") + " " + employees["last_name"].fillna("")).str.strip()
+    employees["designation"] = employees["designation"].fillna("").replace("", "Unassigned")
+    df["designation"] = df["employee_id"].map(employees["designation"])
+    return df, employees[["emp_code", "name", "designation"]]
+
+
+def monthly_totals(df):
+    by_month = (
+        df.groupby("month")
+        .agg(payslips=("employee_id", "size"), employees=("employee_id", "nunique"),
+             gross=("gross", "sum"), deductions=("deductions", "sum"), net=("net", "sum"))
+        .sort_index()
+    )
+    by_month["net_change"] = by_month["net"].diff()
+    by_month["net_change_pct"] = by_month["net"].pct_change() * 100
+    return by_month.reset_index()
+
+
+def designation_totals(df):
+    return (
+        df.groupby(["month", "designation"])
+        .agg(employees=("employee_id", "nunique"),
+             gross=("gross", "sum"), deductions=("deductions", "sum"), net=("net", "sum"))
+        .reset_index()
+        .sort_values(["month", "net"], ascending=[True, False], ignore_index=True)
+    )
+
+
+def employee_totals(df, employees):
+    """Totals per employee, plus their latest net pay and its change from their previous payslip."""
+    ordered = df.sort_values(["employee_id", "month"])
+    ordered = ordered.assign(net_change=ordered.groupby("employee_id")["net"].diff())
+    by_employee = ordered.groupby("employee_id").agg(
+        months=("month", "size"), first_month=("month", "first"), last_month=("month", "last"),
+        gross=("gross", "sum"), deductions=("deductions", "sum"), net=("net", "sum"),
+        last_net=("net", "last"), net_change=("net_change", "last"),   # NaN only for a single payslip
+    )
+    by_employee = employees.join(by_employee, how="inner")
+    return by_employee.reset_index().sort_values("net", ascending=False, ignore_index=True)
+
+
+def payroll_analytics(first_month, last_month):
+    """Register and cost analytics for the months ``first_month``..``last_month`` (dates, day ignored)."""
+    first_month, last_month = first_month.replace(day=1), last_month.replace(day=1)
+    df, employees = payslip_frame(first_month, last_month)
+    return PayrollAnalytics(
+        first_month=first_month,
+        last_month=last_month,
+        by_month=monthly_totals(df),
+        by_designation=designation_totals(df),
+        by_employee=employee_totals(df, employees),
+    )
+
+
+def records(frame, limit=None):
+    """Rows as dicts for a template, NaN (e.g. the first month's delta) as None."""
+    frame = frame.head(limit) if limit else frame
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+def default_range(today):
+    """The last DEFAULT_MONTHS months, ending with ``today``'s month."""
+    last = pd.Period(today, freq="M")
+    return (last - (DEFAULT_MONTHS - 1)).start_time.date(), last.start_time.date()
+
+
+# -------------------------------
+# EXCEL EXPORT
+# -------------------------------
+def _sheet(frame, month_columns=("month", "first_month", "last_month")):
+    frame = frame.copy()
+    for column in month_columns:
+        if column in frame:
+            frame[column] = frame[column].dt.strftime("%b %Y")
+    return frame.round(2)
+
+
+def excel_payroll_analytics(analytics):
+    """The three tables as sheets of one .xlsx, returned as a rewound BytesIO."""
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        _sheet(analytics.by_month).to_excel(writer, sheet_name="By Month", index=False)
+        _sheet(analytics.by_designation).to_excel(writer, sheet_name="By Designation", index=False)
+        _sheet(analytics.by_employee).to_excel(writer, sheet_name="By Employee", index=False)
+    output.seek(0)
+    return output
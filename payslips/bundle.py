@@ -0,0 +1,110 @@
+# payslips/bundle.py — one ZIP of every payslip file for a payroll month, streamed as it is built
+
+"""
+``stream_payslip_bundle`` yields the archive piece by piece: each payslip file is
+copied in ``BUNDLE_CHUNK_SIZE`` reads and every chunk is handed to the response as
+soon as zipfile writes it. So memory stays flat however many employees there are.
+Entries are stored, not deflated, because DOCX/PDF files are already compressed.
+
+Files are read through the FileField's storage, so this works on local disk and on
+S3 alike. A payslip is left out when its file is missing, or stale (empty, or not a
+readable DOCX any more). ``MANIFEST.csv``, written last in the archive, lists every
+payslip of the month with whether it was included and why not.
+"""
+
+import csv
+import io
+import os
+import zipfile
+
+from django.utils import timezone
+
+from .models import Payslip
+
+BUNDLE_CHUNK_SIZE = 64 * 1024
+MANIFEST_NAME = "MANIFEST.csv"
+
+
+class _ChunkSink:
+    """Write-only file object for ZipFile: collects what is written until the generator drains it."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return chunks
+
+
+def payslip_file_problem(payslip):
+    """None when the payslip file can go into the bundle, otherwise the reason it cannot."""
+    if not payslip.payslip_file:
+        return "missing: no file recorded"
+    storage, name = payslip.payslip_file.storage, payslip.payslip_file.name
+    if not storage.exists(name):
+        return "missing: file not found in storage"
+    if storage.size(name) == 0:
+        return "stale: file is empty"
+    with storage.open(name, "rb") as fh:
+        if not zipfile.is_zipfile(fh):   # a DOCX is a zip; anything else is a truncated or foreign file
+            return "stale: file is not a readable document"
+    return None
+
+
+def month_payslips(month_year):
+    return (
+        Payslip.objects.filter(month_year=month_year)
+        .select_related("employee")
+        .order_by("employee__first_name", "employee__last_name", "id")
+    )
+
+
+def _arcname(payslip, used):
+    name = os.path.basename(payslip.payslip_file.name)
+    if name in used:
+        name = f"{payslip.employee_id}_{name}"
+    used.add(name)
+    return name
+
+
+def stream_payslip_bundle(payslips):
+    """Yield the bytes of a ZIP of ``payslips``' files plus MANIFEST.csv."""
+    sink = _ChunkSink()
+    manifest = io.StringIO()
+    writer = csv.writer(manifest)
+    writer.writerow(["employee_id", "employee", "month", "file", "status"])
+    used = set()
+
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for payslip in payslips:
+            employee = f"{payslip.employee.first_name} {payslip.employee.last_name or ''}".strip()
+            problem = payslip_file_problem(payslip)
+            if problem:
+                writer.writerow([payslip.employee_id, employee, payslip.month_year, payslip.payslip_file.name or "", problem])
+                continue
+
+            try:
+                source = payslip.payslip_file.storage.open(payslip.payslip_file.name, "rb")
+            except OSError as e:   # removed between the check and now
+                writer.writerow([payslip.employee_id, employee, payslip.month_year, payslip.payslip_file.name, f"missing: {e}"])
+                continue
+
+            arcname = _arcname(payslip, used)
+            info = zipfile.ZipInfo(arcname, date_time=timezone.localtime(payslip.created_at).timetuple()[:6])
+            with source, archive.open(info, "w") as target:
+                while chunk := source.read(BUNDLE_CHUNK_SIZE):
+                    target.write(chunk)
+                    yield from sink.drain()
+            writer.writerow([payslip.employee_id, employee, payslip.month_year, arcname, "included"])
+            yield from sink.drain()
+
+        archive.writestr(MANIFEST_NAME, manifest.getvalue())
+
+    yield from sink.drain()   # central directory, written on close
@@ -0,0 +1,89 @@
+from decimal import Decimal
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from num2words import num2words
+
+from hrms.formatting import (
+    _format_decimal, amount_in_words, amounts_in_words_many, clear_format_caches, indian_format, indian_format_many,
+)
+
+
+def legacy_indian_format(amount):
+    """The float + string-slicing formatter previously copy-pasted into the view modules (baseline)."""
+    try:
+        amount = float(amount)
+    except:
+        return "0.00"
+    s, d = f"{amount:.2f}".split(".")
+    if len(s) <= 3:
+        return f"{s}.{d}"
+    int_part = s[-3:]
+    s = s[:-3]
+    parts = []
+    while len(s) > 2:
+        parts.append(s[-2:])
+        s = s[:-2]
+    if s:
+        parts.append(s)
+    parts.reverse()
+    return f"{','.join(parts) + ',' + int_part}.{d}"
+
+
+def legacy_amount_in_words(amount):
+    return num2words(int(amount), lang="en_IN").title()
+
+
+def payroll_amounts(count, distinct, seed=15):
+    """``count`` salary figures drawn from ``distinct`` packages — the repetition a payroll run sees."""
+    rng = random.Random(seed)
+    packages = [Decimal(rng.randint(2_000_000, 300_000_000)) / 100 for _ in range(distinct)]
+    return [rng.choice(packages) for _ in range(count)]
+
+
+class Command(BaseCommand):
+    help = "Compare hrms.formatting against the old per-view indian_format / num2words calls"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=100000, help="Amounts formatted per run")
+        parser.add_argument("--distinct", type=int, default=2000, help="Distinct amounts among them")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def time(self, label, func, amounts, repeat, cold=False):
+        timings = []
+        for _ in range(repeat):
+            if cold:
+                clear_format_caches()
+            started = time.perf_counter()
+            func(amounts)
+            timings.append(time.perf_counter() - started)
+        median = statistics.median(timings)
+        self.stdout.write(
+            f"{label:<34} median={median * 1000:9.1f} ms  "
+            f"{len(amounts) / median / 1000:9.1f} k/s"
+        )
+
+    def handle(self, *args, **options):
+        amounts = payroll_amounts(options["count"], options["distinct"])
+        repeat = options["repeat"]
+        words_sample = amounts[: max(1, len(amounts) // 20)]   # num2words is slow; time a slice
+
+        mismatches = [a for a in amounts[:5000] if legacy_indian_format(a) != indian_format(a)]
+        self.stdout.write(f"{len(amounts)} amounts, {options['distinct']} distinct; "
+                          f"format mismatches vs legacy in first 5000: {len(mismatches)}")
+
+        self.time("indian_format  legacy (float)", lambda xs: [legacy_indian_format(a) for a in xs], amounts, repeat)
+        self.time("indian_format  new, no cache", lambda xs: [_format_decimal.__wrapped__(a) for a in xs],
+                  amounts, repeat)
+        self.time("indian_format  new, cold cache", lambda xs: [indian_format(a) for a in xs], amounts, repeat, cold=True)
+        self.time("indian_format  new, warm cache", lambda xs: [indian_format(a) for a in xs], amounts, repeat)
+        self.time("indian_format_many (batch)", indian_format_many, amounts, repeat)
+
+        self.time("amount in words legacy (num2words)", lambda xs: [legacy_amount_in_words(a) for a in xs],
+                  words_sample, repeat)
+        self.time("amount_in_words  cold cache", lambda xs: [amount_in_words(a) for a in xs],
+                  words_sample, repeat, cold=True)
+        self.time("amount_in_words  warm cache", lambda xs: [amount_in_words(a) for a in xs], words_sample, repeat)
+        self.time("amounts_in_words_many (batch)", amounts_in_words_many, words_sample, repeat)
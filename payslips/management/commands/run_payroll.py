@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payslips.payroll import run_payroll
+
+
+class Command(BaseCommand):
+    help = "Generate payslips for every active employee for a month, e.g. run_payroll 2025-11"
+
+    def add_arguments(self, parser):
+        parser.add_argument("month", help="Payroll month as YYYY-MM")
+        parser.add_argument("--days-worked", type=int, default=None,
+                            help="Days worked to print on every payslip (default: days in month)")
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Number of render processes (default: CPU count)")
+
+    def handle(self, *args, **options):
+        try:
+            month_start = datetime.strptime(options["month"], "%Y-%m").date()
+        except ValueError:
+            raise CommandError("Month must be in YYYY-MM format.")
+
+        result = run_payroll(month_start, days_worked=options["days_worked"], max_workers=options["workers"])
+
+        for employee_id, name, error in result.failures:
+            self.stderr.write(f"  #{employee_id} {name}: {error}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Payroll {result.month_year}: {result.generated} payslips generated, "
+            f"{result.unchanged} unchanged, {len(result.failures)} failed in {result.elapsed:.2f}s "
+            f"({result.throughput:.1f} payslips/sec)"
+        ))
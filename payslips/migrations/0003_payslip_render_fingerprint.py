@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payslips', '0002_alter_payslip_options_payslip_payslip_file_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payslip',
+            name='render_fingerprint',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -34,6 +34,8 @@ class Payslip(models.Model):
         blank=True,
         help_text="Generated payslip document"
     )
+    pdf_file = models.FileField(upload_to="payslips/", blank=True, null=True)  # PDF copy next to the DOCX, if a converter is installed
+    render_fingerprint = models.CharField(max_length=64, blank=True, default="")  # template + context hash of the file
 
     def __str__(self):
         return f"Payslip for {self.employee.get_full_name()} - {self.month_year}"
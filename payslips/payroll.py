@@ -0,0 +1,243 @@
+# payslips/payroll.py — month-end payroll run (all active employees in one go)
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+import calendar
+import os
+import time
+
+import django
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Prefetch
+
+from employees.history import compensation_on, refresh_due_compensation
+from employees.models import CompensationRecord, Employee
+from accounts.metrics import invalidate_dashboard_metrics
+from hrms.compensation import SalaryBreakup, monthly_breakups
+from hrms.docx_templates import get_template, render_fingerprint, render_is_current
+from hrms.perf import span
+from hrms.storage import delete_document, mark_present, save_docx
+from jobs.tasks import queue_pdf_conversion
+from offerletters.models import OfferLetter
+from hikeletters.models import HikeLetter
+from .models import Payslip
+from .utils import payslip_salary, build_payslip_context, payslip_filename
+
+
+@dataclass
+class PayrollRunResult:
+    month_year: str
+    month_start: date = None
+    generated: int = 0
+    unchanged: int = 0   # payslips whose file already matched the template + context fingerprint
+    failures: list = field(default_factory=list)   # [(employee_id, employee_name, error)]
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self):
+        return self.generated / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def summary(self):
+        text = f"Payroll for {self.month_year}: {self.generated} payslips generated, {self.unchanged} unchanged"
+        return f"{text}, {len(self.failures)} failed." if self.failures else f"{text}."
+
+    def as_dict(self):
+        """JSON-safe form, kept on the payroll Job (see payslips/tasks.py)."""
+        return {
+            "month_year": self.month_year,
+            "month_start": self.month_start.isoformat() if self.month_start else None,
+            "generated": self.generated,
+            "unchanged": self.unchanged,
+            "failures": [list(failure) for failure in self.failures],
+            "elapsed": self.elapsed,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data["month_start"] = date.fromisoformat(data["month_start"]) if data.get("month_start") else None
+        return cls(**data)
+
+
+def _init_pool_worker():
+    """
+    Pool worker start-up. A forked worker drops any database connection it inherited
+    without closing it: closing would end (roll back) a transaction the parent still owns.
+    """
+    for conn in connections.all(initialized_only=True):
+        conn.connection = None
+    django.setup()
+
+
+def _render_payslip_file(template_path, context, name):
+    """
+    Runs inside a pool worker: render one payslip and store it as ``name``.
+    Returns (stored name, None) on success or (None, error text), so one bad employee never aborts the run.
+    Touches no database: the parent marks the stored names in the presence cache.
+    """
+    try:
+        doc = get_template(template_path)   # parsed once per worker process
+        doc.render(context)
+        return save_docx(name, doc, mark=False), None
+    except Exception as e:
+        return None, str(e) or e.__class__.__name__
+
+
+def payroll_employees(month_start):
+    """Completed (non-draft) employees not relieved before the payroll month, with letters and current CTC loaded."""
+    return (
+        Employee.objects.filter(is_draft=False)
+        .exclude(releaving_letters__releaving_date__lt=month_start)
+        .select_related("current_compensation")
+        .prefetch_related(
+            Prefetch("offerletter_set", queryset=OfferLetter.objects.order_by("id"), to_attr="payroll_offers"),
+            Prefetch("hike_letters", queryset=HikeLetter.objects.order_by("id"), to_attr="payroll_hikes"),
+        )
+        .order_by("id")
+    )
+
+
+def run_payroll(month_start, days_worked=None, max_workers=None):
+    """
+    Render payslips for every payroll employee for the month of ``month_start``.
+    Files are rendered in a process pool; Payslip rows are upserted in one bulk query.
+    Payslips whose stored render fingerprint still matches are not re-rendered, so
+    re-running a month only pays for what changed.
+    """
+    started = time.perf_counter()
+    month_start = date(month_start.year, month_start.month, 1)
+    month_year = month_start.strftime("%B %Y")
+    if days_worked is None:
+        days_worked = calendar.monthrange(month_start.year, month_start.month)[1]
+
+    result = PayrollRunResult(month_year=month_year, month_start=month_start)
+    refresh_due_compensation()   # hikes that started since the last refresh, so compensation_on can trust the pointer
+    template_path = os.path.join(settings.BASE_DIR, 'templates', 'payslip_template.docx')
+
+    stored = {
+        employee_id: (fingerprint, payslip_file, pdf_file)
+        for employee_id, fingerprint, payslip_file, pdf_file in Payslip.objects.filter(month_year=month_year)
+        .values_list("employee_id", "render_fingerprint", "payslip_file", "pdf_file")
+    }
+
+    sources = []   # (employee, employee_name, offer_letter, hike_letter, based_on, annual_package, emp_code)
+    for employee in payroll_employees(month_start):
+        employee_name = f"{employee.first_name} {employee.last_name or ''}".strip()
+        offer_letter = employee.payroll_offers[-1] if employee.payroll_offers else None
+        hike_letter = employee.payroll_hikes[-1] if employee.payroll_hikes else None
+
+        if not offer_letter:
+            result.failures.append((employee.id, employee_name, "No offer letter found."))
+            continue
+
+        # The compensation record in force on the 1st: a hike once it has started, else the offer.
+        # Usually the employee's current record, so no query.
+        record = compensation_on(employee, month_start)
+        if record and record.source == CompensationRecord.HIKE:
+            based_on = "hike"
+            annual_package = record.ctc_per_annum
+            emp_code = record.employee_code or (hike_letter.employee_code if hike_letter else None)
+        elif record:
+            based_on = "offer"
+            hike_letter = None
+            annual_package = record.ctc_per_annum
+            emp_code = record.employee_code or offer_letter.employee_code
+        else:
+            based_on = "offer"
+            hike_letter = None
+            annual_package = employee.package_per_annum or Decimal('0')
+            emp_code = offer_letter.employee_code
+
+        sources.append((employee, employee_name, offer_letter, hike_letter, based_on, annual_package, emp_code))
+
+    # Every employee's salary split in one vectorized pass
+    breakups = monthly_breakups([source[5] for source in sources])
+
+    jobs = {}
+    upserts = []
+    stale_pdfs = {}   # employee_id -> PDF of a payslip being re-rendered
+    for index, (employee, employee_name, offer_letter, hike_letter, based_on, _, emp_code) in enumerate(sources):
+        salary = payslip_salary(SalaryBreakup.from_arrays(breakups, index))
+        context = build_payslip_context(
+            employee, salary, month_start, days_worked, emp_code or "N/A", offer_letter.offer_date
+        )
+        name = f"payslips/{payslip_filename(employee, month_year)}"
+        fingerprint = render_fingerprint(template_path, context)
+
+        payslip = Payslip(
+            employee=employee,
+            month_year=month_year,
+            based_on=based_on,
+            offer_letter=offer_letter if based_on == "offer" else None,
+            hike_letter=hike_letter,
+            days_worked=days_worked,
+            gross_salary=salary['gross_salary'],
+            deductions=salary['deductions'],
+            net_salary=salary['net_salary'],
+            payslip_file=name,
+            render_fingerprint=fingerprint,
+        )
+        stored_fingerprint, stored_file, stored_pdf = stored.get(employee.id, ("", None, None))
+        if render_is_current(stored_fingerprint, fingerprint, stored_file):
+            payslip.payslip_file = stored_file
+            payslip.pdf_file = stored_pdf or None
+            result.unchanged += 1
+            upserts.append(payslip)   # row still refreshed, file left as is
+            continue
+        if stored_pdf:
+            stale_pdfs[employee.id] = stored_pdf
+        jobs[employee.id] = (employee_name, context, name, payslip)
+
+    if jobs:
+        # Never fork with an open SQLite connection (as run_workers does); inside a transaction
+        # it has to stay open, and the workers simply never touch it
+        if not connection.in_atomic_block:
+            connections.close_all()
+        # the initializer's django.setup keeps this working under the "spawn" start method too
+        with span("payslip_pool"), ProcessPoolExecutor(max_workers=max_workers, initializer=_init_pool_worker) as pool:
+            futures = {
+                pool.submit(_render_payslip_file, template_path, context, name): employee_id
+                for employee_id, (_, context, name, _) in jobs.items()
+            }
+            for future in as_completed(futures):
+                employee_id = futures[future]
+                try:
+                    stored_name, error = future.result()
+                except Exception as e:
+                    stored_name, error = None, str(e) or e.__class__.__name__
+                if error:
+                    result.failures.append((employee_id, jobs[employee_id][0], error))
+                else:
+                    payslip = jobs[employee_id][3]
+                    payslip.payslip_file = stored_name
+                    upserts.append(payslip)
+        mark_present([jobs[employee_id][3].payslip_file.name for employee_id in jobs
+                      if jobs[employee_id][3].payslip_file])
+
+    if upserts:
+        Payslip.objects.bulk_create(
+            upserts,
+            update_conflicts=True,
+            unique_fields=['employee', 'month_year'],
+            update_fields=[
+                'based_on', 'offer_letter', 'hike_letter', 'days_worked',
+                'gross_salary', 'deductions', 'net_salary', 'payslip_file', 'render_fingerprint', 'pdf_file',
+            ],
+        )
+        invalidate_dashboard_metrics()   # bulk_create skips post_save
+        for payslip in upserts:
+            if payslip.employee_id in stale_pdfs:
+                delete_document(stale_pdfs[payslip.employee_id])
+            if not payslip.pdf_file:
+                queue_pdf_conversion(
+                    "payslips.Payslip", {"employee_id": payslip.employee_id, "month_year": month_year}, "payslip_file",
+                )
+
+    result.generated = len(upserts) - result.unchanged
+    result.failures.sort(key=lambda failure: failure[0])
+    result.elapsed = time.perf_counter() - started
+    return result
@@ -0,0 +1,108 @@
+# payslips/tasks.py — single payslip rendering, run by a background worker (see jobs/queue.py)
+
+from django.conf import settings
+from decimal import Decimal
+from datetime import datetime
+from employees.history import compensation_on
+from employees.models import Employee
+from offerletters.models import OfferLetter
+from hikeletters.models import HikeLetter
+from jobs.queue import task
+from jobs.tasks import queue_pdf_conversion
+from .models import Payslip
+from .payroll import run_payroll
+from .utils import calculate_payslip_salary, build_payslip_context, payslip_filename
+from hrms.docx_templates import get_template, render_fingerprint, render_is_current
+from hrms.perf import span
+from hrms.storage import delete_document, save_docx
+import os
+
+
+@task("payslip")
+def payslip(job, employee_id, based_on, payslip_date, days_worked):
+    employee = Employee.objects.select_related("current_compensation").get(id=employee_id)
+    offer_letter = OfferLetter.objects.filter(employee=employee).last()
+    hike_letter = HikeLetter.objects.filter(employee=employee).last()
+    date_obj = datetime.strptime(payslip_date, "%Y-%m-%d")
+    month_year = date_obj.strftime("%B %Y")
+
+    # Salary source (validated by the view): the offer / hike CTC in force on the payslip date
+    record = compensation_on(employee, date_obj.date(), source=based_on)
+    if based_on == "hike":
+        annual_package = record.ctc_per_annum if record else (hike_letter.new_package or Decimal('0'))
+        offer_ref = None
+        hike_ref = hike_letter
+    else:
+        annual_package = record.ctc_per_annum if record else (employee.package_per_annum or Decimal('0'))
+        offer_ref = offer_letter
+        hike_ref = None
+
+    # Salary calculation
+    salary = calculate_payslip_salary(annual_package)
+
+    # STORE FULL SALARY (NO PRORATION)
+    payslip_obj, created = Payslip.objects.update_or_create(
+        employee=employee,
+        month_year=month_year,
+        defaults={
+            'based_on': based_on,
+            'offer_letter': offer_ref,
+            'hike_letter': hike_ref,
+            'days_worked': days_worked,
+            'gross_salary': salary['gross_salary'],     # FULL salary
+            'deductions': salary['deductions'],
+            'net_salary': salary['net_salary'],         # FULL net salary
+        }
+    )
+
+    job.report(20, "Rendering payslip")
+
+    # Generate document
+    emp_code = (
+        offer_letter.employee_code if based_on == "offer"
+        else hike_letter.employee_code
+    ) if offer_letter or hike_letter else "N/A"
+    context = build_payslip_context(
+        employee, salary, date_obj, days_worked, emp_code,
+        offer_letter.offer_date if offer_letter else None,
+    )
+
+    template_path = os.path.join(settings.BASE_DIR, 'templates', 'payslip_template.docx')
+    filename = payslip_filename(employee, month_year)
+
+    # Same template + same context as the stored file → keep it, skip the render
+    fingerprint = render_fingerprint(template_path, context)
+    if render_is_current(payslip_obj.render_fingerprint, fingerprint, payslip_obj.payslip_file.name):
+        if not payslip_obj.pdf_file:
+            queue_pdf_conversion("payslips.Payslip", {"pk": payslip_obj.pk}, "payslip_file", employee=employee)
+        job.report(100, f"Payslip for {month_year} is already up to date.")
+        return payslip_obj.payslip_file.name
+
+    doc = get_template(template_path)
+    with span("docx_render"):
+        doc.render(context)
+
+    job.report(70, "Saving payslip")
+
+    with span("file_save"):
+        payslip_obj.payslip_file.name = save_docx(f"payslips/{filename}", doc)
+    payslip_obj.render_fingerprint = fingerprint
+    delete_document(payslip_obj.pdf_file.name)
+    payslip_obj.pdf_file = None   # stale until the new PDF is converted
+    payslip_obj.save(update_fields=['payslip_file', 'render_fingerprint', 'pdf_file'])
+    queue_pdf_conversion("payslips.Payslip", {"pk": payslip_obj.pk}, "payslip_file", employee=employee)
+
+    job.report(100, f"Payslip for {month_year} generated successfully!")
+    return payslip_obj.payslip_file.name
+
+
+@task("payroll")
+def payroll(job, payroll_month, days_worked=None):
+    """Month-end run for every payroll employee; the counts and failures are kept on ``job.result``."""
+    month_start = datetime.strptime(payroll_month, "%Y-%m").date()
+    job.report(5, f"Generating payslips for {month_start:%B %Y}")
+    result = run_payroll(month_start, days_worked=days_worked)
+    job.result = result.as_dict()
+    job.report(100, result.summary)
+    return ""
+
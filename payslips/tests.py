@@ -1,3 +1,281 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+import csv
+import io
+import os
+import random
+import tempfile
+import zipfile
+from unittest import mock
+
+import pandas as pd
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from employees.models import Employee
+from jobs.models import Job
+from jobs.queue import work
+from offerletters.models import OfferLetter
+from releaving.models import ReleavingLetter
+from hikeletters.views import calculate_salary_breakup
+from hrms.compensation import annual_breakup, annual_breakups, from_paisa, monthly_breakups
+from hrms.formatting import amount_in_words, amounts_in_words_many, indian_format, indian_format_many
+from hrms.storage import document_exists
+from .analytics import payroll_analytics
+from .models import Payslip
+from .payroll import run_payroll
+from .utils import calculate_payslip_salary
+
+
+# The per-view Decimal implementations the shared engine replaced, kept as the reference
+def legacy_annual_breakup(per_annum):
+    basic = (per_annum * Decimal("0.45")).quantize(Decimal("0.01"))
+    hra = (per_annum * Decimal("0.225")).quantize(Decimal("0.01"))
+    remaining = per_annum - basic - hra - Decimal("14400")
+    performance = (remaining * Decimal("0.60")).quantize(Decimal("0.01"))
+    special = (remaining * Decimal("0.40")).quantize(Decimal("0.01"))
+    annual = [basic, hra, Decimal("14400"), performance, special]
+    return annual, [(value / 12).quantize(Decimal("0.01")) for value in annual]
+
+
+def legacy_payslip_salary(annual_package):
+    monthly = (annual_package / 12).quantize(Decimal("0.01"))
+    basic = (monthly * Decimal("0.45")).quantize(Decimal("0.01"))
+    hra = (monthly * Decimal("0.225")).quantize(Decimal("0.01"))
+    remaining = monthly - basic - hra - Decimal("1200")
+    performance = (remaining * Decimal("0.60")).quantize(Decimal("0.01"))
+    special = (remaining * Decimal("0.40")).quantize(Decimal("0.01"))
+    return [monthly, basic, hra, Decimal("1200"), performance, special, monthly - Decimal("200")]
+
+
+def random_ctcs(count, seed):
+    rng = random.Random(seed)
+    edge_cases = [Decimal("0"), Decimal("0.01"), Decimal("14400"), Decimal("100000"), Decimal("99999999.99")]
+    # Paisa-level values make half-way ties (…5 after the 2nd decimal) common, which is where rounding differs
+    return edge_cases + [Decimal(rng.randint(0, 10_000_000_000)) / 100 for _ in range(count)]
+
+
+class SalaryBreakupTests(SimpleTestCase):
+    def test_annual_breakup_matches_offer_and_hike_letters(self):
+        for ctc in random_ctcs(2000, seed=14):
+            annual, monthly = legacy_annual_breakup(ctc)
+            breakup = annual_breakup(ctc)
+            per_month = breakup.per_month()
+            self.assertEqual(
+                [breakup.basic, breakup.hra, breakup.conveyance, breakup.performance, breakup.special], annual, ctc
+            )
+            self.assertEqual(
+                [per_month.basic, per_month.hra, per_month.conveyance, per_month.performance, per_month.special],
+                monthly, ctc,
+            )
+            self.assertEqual(list(calculate_salary_breakup(ctc).values()), annual, ctc)
+
+    def test_payslip_salary_matches_payslip_view(self):
+        for ctc in random_ctcs(2000, seed=15):
+            salary = calculate_payslip_salary(ctc)
+            self.assertEqual(
+                [salary[key] for key in ("gross_salary", "basic", "hra", "conveyance", "performance", "special",
+                                         "net_salary")],
+                legacy_payslip_salary(ctc), ctc,
+            )
+
+    def test_batch_matches_scalar(self):
+        ctcs = random_ctcs(500, seed=16)
+        annual = annual_breakups(ctcs)
+        monthly = monthly_breakups(ctcs)
+        for i, ctc in enumerate(ctcs):
+            self.assertEqual(from_paisa(annual["special"][i]), annual_breakup(ctc).special)
+            self.assertEqual(from_paisa(monthly["total"][i]), calculate_payslip_salary(ctc)["gross_salary"])
+
+
+def legacy_indian_format(amount):
+    try:
+        amount = float(amount)
+    except:
+        return "0.00"
+    s, d = f"{amount:.2f}".split(".")
+    if len(s) <= 3:
+        return f"{s}.{d}"
+    int_part = s[-3:]
+    s = s[:-3]
+    parts = []
+    while len(s) > 2:
+        parts.append(s[-2:])
+        s = s[:-2]
+    if s:
+        parts.append(s)
+    parts.reverse()
+    return f"{','.join(parts) + ',' + int_part}.{d}"
+
+
+class FormattingTests(SimpleTestCase):
+    def test_indian_format_matches_legacy_formatter(self):
+        for amount in random_ctcs(2000, seed=17):
+            self.assertEqual(indian_format(amount), legacy_indian_format(amount), amount)
+
+    def test_indian_format_edge_cases(self):
+        self.assertEqual(indian_format(Decimal("240000")), "2,40,000.00")
+        self.assertEqual(indian_format("12345678.9"), "1,23,45,678.90")
+        self.assertEqual(indian_format(999), "999.00")
+        self.assertEqual(indian_format(Decimal("-150000.5")), "-1,50,000.50")
+        self.assertEqual(indian_format(Decimal("2.675")), "2.68")   # no float round-trip (float gives 2.67)
+        self.assertEqual(indian_format(None), "0.00")
+        self.assertEqual(indian_format("abc"), "0.00")
+
+    def test_words_and_batches(self):
+        self.assertEqual(amount_in_words(Decimal("120000.75")), "One Lakh, Twenty Thousand")
+        amounts = [Decimal("1000"), Decimal("250000"), Decimal("1000")]
+        self.assertEqual(indian_format_many(amounts), ["1,000.00", "2,50,000.00", "1,000.00"])
+        self.assertEqual(amounts_in_words_many(amounts), [amount_in_words(a) for a in amounts])
+
+
+class PayslipBundleTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media.name))
+        self.client.force_login(User.objects.create_user("hr", password="pass"))
+
+    def add_payslip(self, name, content=None):
+        employee = Employee.objects.create(first_name=name, email=f"{name.lower()}@example.com")
+        payslip = Payslip(employee=employee, based_on="offer", month_year="November 2025",
+                          days_worked=30, gross_salary=1000, net_salary=800)
+        if content is not None:
+            payslip.payslip_file.save(f"Payslip_{name}.docx", ContentFile(content), save=False)
+        payslip.save()
+        return payslip
+
+    def test_bundle_streams_valid_files_and_lists_skipped_ones(self):
+        docx = io.BytesIO()
+        with zipfile.ZipFile(docx, "w") as fake:
+            fake.writestr("word/document.xml", "<w:document/>" * 10000)
+        self.add_payslip("Anita", docx.getvalue())
+        self.add_payslip("Bala", b"")            # stale: empty file
+        missing = self.add_payslip("Chitra", b"x")
+        os.remove(missing.payslip_file.path)     # missing on disk
+        self.add_payslip("Dev")                  # never generated
+
+        response = self.client.get(reverse("payslip_bundle", args=[2025, 11]))
+        self.assertTrue(response.streaming)
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+
+        self.assertEqual(archive.namelist(), ["Payslip_Anita.docx", "MANIFEST.csv"])
+        self.assertEqual(archive.read("Payslip_Anita.docx"), docx.getvalue())
+        manifest = list(csv.DictReader(io.StringIO(archive.read("MANIFEST.csv").decode())))
+        self.assertEqual(
+            [(row["employee"], row["status"].split(":")[0]) for row in manifest],
+            [("Anita", "included"), ("Bala", "stale"), ("Chitra", "missing"), ("Dev", "missing")],
+        )
+
+    def test_month_without_payslips_redirects(self):
+        response = self.client.get(reverse("payslip_bundle", args=[2025, 12]))
+        self.assertRedirects(response, reverse("run_payroll"))
+
+
+class PayrollRunTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media.name, PDF_CONVERSION_ENABLED=False))
+
+        self.paid = []
+        for i, name in enumerate(["Anita", "Bala"]):
+            employee = Employee.objects.create(first_name=name, last_name="K", email=f"{name.lower()}@example.com",
+                                               designation="Developer", package_per_annum=600000, is_draft=False)
+            OfferLetter.objects.create(employee=employee, offer_date=date(2025, 1, 6), employee_code=f"STPL012500{i}")
+            self.paid.append(employee)
+        self.no_offer = Employee.objects.create(first_name="Chitra", last_name="K", email="chitra@example.com",
+                                                package_per_annum=600000, is_draft=False)
+        Employee.objects.create(first_name="Dev", last_name="K", email="dev@example.com")   # draft
+        relieved = Employee.objects.create(first_name="Esha", last_name="K", email="esha@example.com",
+                                           package_per_annum=600000, is_draft=False)
+        OfferLetter.objects.create(employee=relieved, offer_date=date(2025, 1, 6), employee_code="STPL0125009")
+        ReleavingLetter.objects.create(employee=relieved, releaving_date=date(2025, 10, 31))
+
+    def test_run_skips_unchanged_and_upserts_on_rerun(self):
+        result = run_payroll(date(2025, 11, 1), max_workers=1)
+        self.assertEqual((result.generated, result.unchanged), (2, 0))
+        # One bad employee is reported, the run goes on; drafts and relieved employees are not paid
+        self.assertEqual(result.failures, [(self.no_offer.id, "Chitra K", "No offer letter found.")])
+        self.assertEqual(set(Payslip.objects.values_list("employee_id", flat=True)), {e.id for e in self.paid})
+        for payslip in Payslip.objects.all():
+            self.assertTrue(os.path.exists(payslip.payslip_file.path))
+            # marked present by the parent process, not over a connection the pool worker inherited
+            with mock.patch.object(default_storage, "exists", side_effect=AssertionError("stat")):
+                self.assertTrue(document_exists(payslip.payslip_file.name))
+
+        again = run_payroll(date(2025, 11, 1), max_workers=1)
+        self.assertEqual((again.generated, again.unchanged), (0, 2))
+
+        changed = run_payroll(date(2025, 11, 1), days_worked=20, max_workers=1)
+        self.assertEqual((changed.generated, changed.unchanged), (2, 0))
+        self.assertEqual(Payslip.objects.count(), 2)   # updated in place, not duplicated
+        self.assertEqual(set(Payslip.objects.values_list("days_worked", flat=True)), {20})
+
+    @override_settings(JOBS_RUN_ASYNC=True)
+    def test_view_queues_the_run_as_a_job(self):
+        self.client.force_login(User.objects.create_user("hr", password="pass"))
+        response = self.client.post(reverse("run_payroll"), {"payroll_month": "2025-11"})
+        job = Job.objects.get(kind="payroll")
+        self.assertRedirects(response, reverse("jobs:job_detail", args=[job.id]))
+        self.assertFalse(Payslip.objects.exists())
+
+        work("test-worker", burst=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.result["generated"], 2)
+
+        response = self.client.get(job.next_url)
+        self.assertEqual(response.context["result"].generated, 2)
+        self.assertEqual(len(response.context["result"].failures), 1)
+
+
+class PayrollAnalyticsTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("hr", password="pass"))
+        dev = Employee.objects.create(first_name="Anita", email="anita@example.com", designation="Developer")
+        qa = Employee.objects.create(first_name="Bala", email="bala@example.com", designation="QA")
+        for employee, month, net in [
+            (dev, "September 2025", 800), (qa, "September 2025", 500),
+            (dev, "October 2025", 900), (qa, "October 2025", 500),
+            (dev, "November 2025", 1000),
+            (dev, "November 2024", 1),   # outside the range: never loaded
+        ]:
+            Payslip.objects.create(employee=employee, based_on="offer", month_year=month, days_worked=30,
+                                   gross_salary=net + 100, deductions=100, net_salary=net)
+
+    def test_month_designation_and_employee_totals(self):
+        with self.assertNumQueries(2):   # payslips, then the employees on them
+            analytics = payroll_analytics(date(2025, 9, 1), date(2025, 11, 30))
+
+        by_month = analytics.by_month
+        self.assertEqual(by_month["net"].tolist(), [1300, 1400, 1000])
+        self.assertEqual(by_month["payslips"].tolist(), [2, 2, 1])
+        self.assertEqual(by_month["net_change"].tolist()[1:], [100, -400])
+        self.assertEqual(analytics.totals["deductions"], 500)
+
+        developers = analytics.by_designation[analytics.by_designation["designation"] == "Developer"]
+        self.assertEqual(developers["net"].tolist(), [800, 900, 1000])
+
+        anita = analytics.by_employee.iloc[0]
+        self.assertEqual((anita["name"], anita["months"], anita["net"]), ("Anita", 3, 2700))
+        self.assertEqual((anita["last_net"], anita["net_change"]), (1000, 100))
+
+    def test_view_and_excel_export(self):
+        url = reverse("payroll_analytics")
+        response = self.client.get(url, {"from": "2025-09", "to": "2025-11"})
+        self.assertEqual(len(response.context["months"]), 3)
+        self.assertIsNone(response.context["months"][0]["net_change"])
+
+        response = self.client.get(url, {"from": "2025-09", "to": "2025-11", "download": "1"})
+        sheets = pd.read_excel(io.BytesIO(b"".join(response.streaming_content)), sheet_name=None)
+        self.assertEqual(list(sheets), ["By Month", "By Designation", "By Employee"])
+        self.assertEqual(sheets["By Month"]["month"].tolist(), ["Sep 2025", "Oct 2025", "Nov 2025"])
+
+        response = self.client.get(url, {"from": "2025-11", "to": "2025-09"})
+        self.assertRedirects(response, url, fetch_redirect_response=False)
 
-# Create your tests here.
@@ -3,4 +3,7 @@ from . import views
 
 urlpatterns = [
     path('generate/<int:employee_id>/', views.generate_payslip, name='generate_payslip'),
+    path('payroll-run/', views.run_payroll_view, name='run_payroll'),
+    path('bundle/<int:year>/<int:month>/', views.payslip_bundle, name='payslip_bundle'),
+    path('analytics/', views.payroll_analytics_view, name='payroll_analytics'),
 ]
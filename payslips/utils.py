@@ -0,0 +1,53 @@
+# payslips/utils.py — salary + document helpers shared by the single payslip view and the payroll run
+
+from decimal import Decimal
+from hrms.compensation import monthly_breakup
+from hrms.formatting import amount_in_words, indian_format
+import calendar
+
+
+def calculate_payslip_salary(annual_package):
+    """Monthly payslip split (full salary, no proration)."""
+    return payslip_salary(monthly_breakup(annual_package))
+
+
+def payslip_salary(breakup):
+    """Payslip salary dict from a monthly ``SalaryBreakup`` (see hrms/compensation.py)."""
+    deductions = Decimal('200')
+    return {
+        'basic': breakup.basic,
+        'hra': breakup.hra,
+        'conveyance': breakup.conveyance,
+        'performance': breakup.performance,
+        'special': breakup.special,
+        'gross_salary': breakup.total,
+        'deductions': deductions,
+        'net_salary': breakup.total - deductions,
+    }
+
+
+def build_payslip_context(employee, salary, date_obj, days_worked, emp_code, date_of_joining):
+    month_year = date_obj.strftime("%B %Y")
+    return {
+        'employee_name': f"{employee.first_name} {employee.last_name}".strip(),
+        'designation': employee.designation or "N/A",
+        'emp_code': emp_code,
+        'monthyear': month_year,
+        'monthyearhyp': month_year.replace(" ", "-"),
+        'period': f"01/{date_obj.month:02d}/{date_obj.year} To "
+                  f"{calendar.monthrange(date_obj.year, date_obj.month)[1]:02d}/{date_obj.month:02d}/{date_obj.year}",
+        'days': days_worked,
+        'date_of_joining': date_of_joining.strftime("%d %B %Y") if date_of_joining else "",
+        'Basic': indian_format(salary['basic']),
+        'HRA': indian_format(salary['hra']),
+        'Conveyance': indian_format(salary['conveyance']),
+        'Performance': indian_format(salary['performance']),
+        'Special_Allowance': indian_format(salary['special']),
+        'Total_Addition': indian_format(salary['gross_salary']),
+        'Net_Salary': indian_format(salary['net_salary']),
+        'Net_Salary_Words': amount_in_words(salary['net_salary']) + " Rupees Only",
+    }
+
+
+def payslip_filename(employee, month_year):
+    return f"Payslip_{employee.first_name}_{employee.last_name}_{month_year.replace(' ', '_')}.docx"
@@ -1,40 +1,24 @@
 # payslips/views.py  ← CLEAN & CORRECTED VERSION
 
 from django.shortcuts import render, get_object_or_404, redirect
+from django.http import FileResponse, StreamingHttpResponse
 from django.conf import settings
 from django.contrib import messages
-from decimal import Decimal
-from datetime import datetime
+from django.contrib.auth.decorators import login_required
+from django.utils import timezone
+from datetime import date, datetime
 from employees.models import Employee
 from offerletters.models import OfferLetter
 from hikeletters.models import HikeLetter
+from jobs.models import Job
+from jobs.queue import submit
+from jobs.views import respond_to_job
 from .models import Payslip
-from docxtpl import DocxTemplate
-from num2words import num2words
-import os
-import calendar
-
-
-def indian_format(amount):
-    try:
-        amount = float(amount)
-    except:
-        return amount
-    s, d = f"{amount:.2f}".split(".")
-    if len(s) > 3:
-        int_part = s[-3:]
-        s = s[:-3]
-        parts = []
-        while len(s) > 2:
-            parts.append(s[-2:])
-            s = s[:-2]
-        if s:
-            parts.append(s)
-        parts.reverse()
-        int_part = ",".join(parts) + "," + int_part
-    else:
-        int_part = s
-    return f"{int_part}.{d}"
+from .analytics import default_range, excel_payroll_analytics, payroll_analytics, records
+from .bundle import month_payslips, stream_payslip_bundle
+from .payroll import PayrollRunResult
+from hrms.formatting import indian_format
+from hrms.storage import document_exists
 
 
 def generate_payslip(request, employee_id):
@@ -53,7 +37,6 @@ def generate_payslip(request, employee_id):
 
         try:
             date_obj = datetime.strptime(payslip_date, "%Y-%m-%d")
-            month_year = date_obj.strftime("%B %Y")
         except ValueError:
             messages.error(request, "Invalid date.")
             return redirect(request.path)
@@ -66,19 +49,11 @@ def generate_payslip(request, employee_id):
                 messages.error(request, "Date cannot be before offer date.")
                 return redirect(request.path)
 
-            annual_package = getattr(employee, 'package_per_annum', Decimal('0'))
-            offer_ref = offer_letter
-            hike_ref = None
-
         elif based_on == "hike":
             if not hike_letter:
                 messages.error(request, "No hike letter found.")
                 return redirect(request.path)
 
-            annual_package = hike_letter.new_package or Decimal('0')
-            offer_ref = None
-            hike_ref = hike_letter
-
             if hike_letter.hike_start_date and date_obj.date() < hike_letter.hike_start_date:
                 messages.error(request, "Date cannot be before hike start date.")
                 return redirect(request.path)
@@ -86,82 +61,20 @@ def generate_payslip(request, employee_id):
             messages.error(request, "Invalid selection.")
             return redirect(request.path)
 
-        # Salary calculation
-        monthly = (annual_package / 12).quantize(Decimal('0.01'))
-        basic = (monthly * Decimal('0.45')).quantize(Decimal('0.01'))
-        hra = (monthly * Decimal('0.225')).quantize(Decimal('0.01'))
-        conveyance = Decimal('1200')
-        remaining = monthly - basic - hra - conveyance
-        performance = (remaining * Decimal('0.60')).quantize(Decimal('0.01'))
-        special = (remaining * Decimal('0.40')).quantize(Decimal('0.01'))
-        gross_salary = monthly
-        net_salary = gross_salary - Decimal('200')
-
-        # STORE FULL SALARY (NO PRORATION)
-        payslip, created = Payslip.objects.update_or_create(
+        # Salary calculation + rendering run in payslips/tasks.py
+        job = submit(
+            "payslip",
+            {
+                "employee_id": employee.id,
+                "based_on": based_on,
+                "payslip_date": date_obj.date().isoformat(),
+                "days_worked": days_worked,
+            },
             employee=employee,
-            month_year=month_year,
-            defaults={
-                'based_on': based_on,
-                'offer_letter': offer_ref,
-                'hike_letter': hike_ref,
-                'days_worked': days_worked,
-                'gross_salary': gross_salary,     # FULL salary
-                'deductions': Decimal('200'),
-                'net_salary': net_salary,         # FULL net salary
-            }
+            user=request.user,
+            next_url=request.path + f"?month={date_obj.strftime('%Y-%m')}",
         )
-
-        # Generate document
-        context = {
-            'employee_name': f"{employee.first_name} {employee.last_name}".strip(),
-            'designation': employee.designation or "N/A",
-            'emp_code': (
-                offer_letter.employee_code if based_on == "offer"
-                else hike_letter.employee_code
-            ) if offer_letter or hike_letter else "N/A",
-            'monthyear': month_year,
-            'monthyearhyp': month_year.replace(" ", "-"),
-            'period': f"01/{date_obj.month:02d}/{date_obj.year} To "
-                      f"{calendar.monthrange(date_obj.year, date_obj.month)[1]:02d}/{date_obj.month:02d}/{date_obj.year}",
-            'days': days_worked,
-            'date_of_joining': offer_letter.offer_date.strftime("%d %B %Y") if offer_letter and offer_letter.offer_date else "",
-            'Basic': indian_format(basic),
-            'HRA': indian_format(hra),
-            'Conveyance': indian_format(conveyance),
-            'Performance': indian_format(performance),
-            'Special_Allowance': indian_format(special),
-            'Total_Addition': indian_format(gross_salary),
-            'Net_Salary': indian_format(net_salary),
-            'Net_Salary_Words': num2words(int(net_salary), lang='en_IN').title() + " Rupees Only",
-        }
-
-        template_path = os.path.join(settings.BASE_DIR, 'templates', 'payslip_template.docx')
-        doc = DocxTemplate(template_path)
-        doc.render(context)
-
-        filename = f"Payslip_{employee.first_name}_{employee.last_name}_{month_year.replace(' ', '_')}.docx"
-        filepath = os.path.join(settings.MEDIA_ROOT, 'payslips', filename)
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-
-        if os.path.exists(filepath):
-            try:
-                os.remove(filepath)
-            except PermissionError:
-                messages.error(request, "Close the open file and try again.")
-                return redirect(request.path)
-
-        doc.save(filepath)
-
-        payslip.payslip_file.name = f"payslips/{filename}"
-        payslip.save(update_fields=['payslip_file'])
-
-        if payslip.payslip_file:
-            payslip.payslip_file.close()
-            payslip.payslip_file = payslip.payslip_file
-
-        messages.success(request, f"Payslip for {month_year} generated successfully!")
-        return redirect(request.path + f"?month={date_obj.strftime('%Y-%m')}")
+        return respond_to_job(request, job, error_url=request.path)
 
     # GET request
     payslip_obj = None
@@ -174,7 +87,7 @@ def generate_payslip(request, employee_id):
         payslip_obj = Payslip.objects.filter(employee=employee).order_by('-created_at').first()
 
     if payslip_obj and payslip_obj.payslip_file:
-        file_exists = os.path.exists(payslip_obj.payslip_file.path)
+        file_exists = document_exists(payslip_obj.payslip_file.name, payslip_obj.payslip_file.storage)
 
     payslips_list = Payslip.objects.filter(employee=employee).order_by('-created_at')
 
@@ -189,3 +102,108 @@ def generate_payslip(request, employee_id):
         "payslips_list": payslips_list,
         "Net_Salary":indian_format(payslip_obj.net_salary) if payslip_obj else None,
     })
+
+
+# ---------------------------------------------------------
+# MONTH-END PAYROLL RUN (ALL ACTIVE EMPLOYEES)
+# ---------------------------------------------------------
+@login_required
+def run_payroll_view(request):
+    if request.method == "POST":
+        payroll_month = request.POST.get("payroll_month")
+        days_worked = request.POST.get("days_worked")
+
+        try:
+            month_start = datetime.strptime(payroll_month or "", "%Y-%m").date()
+        except ValueError:
+            messages.error(request, "Please select a valid payroll month.")
+            return redirect(request.path)
+
+        try:
+            days_worked = int(days_worked) if days_worked else None
+        except ValueError:
+            messages.error(request, "Days worked must be a number.")
+            return redirect(request.path)
+
+        # The whole run (process pool included) happens in a worker, not in this request
+        job = submit(
+            "payroll",
+            {"payroll_month": f"{month_start:%Y-%m}", "days_worked": days_worked},
+            user=request.user,
+            next_url=f"{request.path}?month={month_start:%Y-%m}",
+        )
+        return respond_to_job(request, job, error_url=request.path)
+
+    # ?month=YYYY-MM shows the outcome of that month's latest finished run
+    result = None
+    run = (
+        Job.objects.filter(kind="payroll", status=Job.DONE, payload__payroll_month=request.GET.get("month"))
+        .order_by("-id").first() if request.GET.get("month") else None
+    )
+    if run and run.result:
+        result = PayrollRunResult.from_dict(run.result)
+
+    return render(request, "payslips/payroll_run.html", {"result": result})
+
+
+# ---------------------------------------------------------
+# ZIP OF A MONTH'S PAYSLIPS (STREAMED)
+# ---------------------------------------------------------
+@login_required
+def payslip_bundle(request, year, month):
+    try:
+        month_year = date(year, month, 1).strftime("%B %Y")
+    except ValueError:
+        messages.error(request, "Invalid payroll month.")
+        return redirect("run_payroll")
+
+    payslips = month_payslips(month_year)
+    if not payslips.exists():
+        messages.error(request, f"No payslips found for {month_year}.")
+        return redirect("run_payroll")
+
+    response = StreamingHttpResponse(stream_payslip_bundle(payslips.iterator()), content_type="application/zip")
+    response["Content-Disposition"] = f'attachment; filename="Payslips_{month_year.replace(" ", "_")}.zip"'
+    return response
+
+
+# ---------------------------------------------------------
+# PAYROLL ANALYTICS (TOTALS ACROSS MONTHS)
+# ---------------------------------------------------------
+ANALYTICS_EMPLOYEE_ROWS = 50  # highest-paid employees shown on the page; the export has everyone
+
+
+@login_required
+def payroll_analytics_view(request):
+    first_month, last_month = default_range(timezone.localdate())
+    try:
+        if request.GET.get("from"):
+            first_month = datetime.strptime(request.GET["from"], "%Y-%m").date()
+        if request.GET.get("to"):
+            last_month = datetime.strptime(request.GET["to"], "%Y-%m").date()
+    except ValueError:
+        messages.error(request, "Please select valid months.")
+        return redirect(request.path)
+
+    if first_month > last_month:
+        messages.error(request, "The first month must not be after the last month.")
+        return redirect(request.path)
+
+    analytics = payroll_analytics(first_month, last_month)
+
+    if request.GET.get("download"):
+        return FileResponse(
+            excel_payroll_analytics(analytics),
+            as_attachment=True,
+            filename=f"Payroll_Analytics_{first_month:%Y-%m}_to_{last_month:%Y-%m}.xlsx",
+        )
+
+    return render(request, "payslips/payroll_analytics.html", {
+        "analytics": analytics,
+        "months": records(analytics.by_month),
+        "designations": records(analytics.by_designation),
+        "employees": records(analytics.by_employee, ANALYTICS_EMPLOYEE_ROWS),
+        "employee_count": len(analytics.by_employee),
+        "from_value": f"{first_month:%Y-%m}",
+        "to_value": f"{last_month:%Y-%m}",
+    })
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('releaving', '0003_alter_releavingletter_employee'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='releavingletter',
+            name='render_fingerprint',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
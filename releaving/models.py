@@ -15,6 +15,8 @@ class ReleavingLetter(models.Model):
         blank=True,
         null=True
     )
+    pdf_file = models.FileField(upload_to="releaving_letters/", blank=True, null=True)  # PDF copy next to the DOCX, if a converter is installed
+    render_fingerprint = models.CharField(max_length=64, blank=True, default="")  # template + context hash of the file
 
     def __str__(self):
         return f"Releaving - {self.employee.first_name} - {self.employee.employee_code or ''}"
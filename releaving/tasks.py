@@ -0,0 +1,90 @@
+# releaving/tasks.py — relieving letter rendering, run by a background worker (see jobs/queue.py)
+
+from django.conf import settings
+from hrms.docx_templates import get_template, render_fingerprint, render_is_current
+from hrms.perf import span
+from hrms.storage import delete_document, save_docx
+from employees.models import Employee
+from jobs.queue import task
+from jobs.tasks import queue_pdf_conversion
+from offerletters.models import OfferLetter
+from .models import ReleavingLetter
+import os
+from datetime import date
+
+
+def format_date(date_obj):
+    day = date_obj.day
+    suffix = "th" if 11 <= day % 100 <= 13 else {1:"st",2:"nd",3:"rd"}.get(day % 10,"th")
+    return f"{day}{suffix} {date_obj.strftime('%B %Y')}"
+
+
+@task("relieving_letter")
+def relieving_letter(job, employee_id, releaving_date, placed_in_company=""):
+    employee = Employee.objects.get(id=employee_id)
+    offer_letter = OfferLetter.objects.filter(employee=employee).last()
+    releaving_date = date.fromisoformat(releaving_date)
+    employee_name = f"{employee.first_name} {employee.last_name or ''}".strip()
+
+    # -------------------------------------------
+    # Update or create relieving letter entry
+    # -------------------------------------------
+    relieving_obj, created = ReleavingLetter.objects.update_or_create(
+        employee=employee,
+        defaults={
+            "releaving_date": releaving_date,
+            "placed_in_company": placed_in_company or None,
+        }
+    )
+
+    job.report(20, "Rendering relieving letter")
+
+    # -------------------------------------------
+    # Generate Word Document
+    # -------------------------------------------
+    template_path = os.path.join(settings.BASE_DIR, "templates", "releaving_letter.docx")
+    if not os.path.exists(template_path):
+        raise FileNotFoundError("Template file missing: releaving_letter.docx")
+
+    context = {
+        "employee_first_name": employee.first_name,
+        "employee_name": employee_name,
+        "designation": employee.designation or "N/A",
+        "emp_code": offer_letter.employee_code or "N/A",
+        "offer_date": format_date(offer_letter.offer_date),
+        "releaving_date": format_date(releaving_date),
+        "releaving_day": releaving_date.strftime("%A"),
+        "placed_in_company": placed_in_company or "",
+        "has_placed_company": bool(placed_in_company),
+    }
+
+    safe_name = employee_name.replace(" ", "_")
+    filename = f"Relieving_{offer_letter.employee_code}_{safe_name}.docx"
+
+    # Same template + same context as the stored file → keep it, skip the render
+    fingerprint = render_fingerprint(template_path, context)
+    if render_is_current(relieving_obj.render_fingerprint, fingerprint, relieving_obj.letter_file.name):
+        if not relieving_obj.pdf_file:
+            queue_pdf_conversion("releaving.ReleavingLetter", {"pk": relieving_obj.pk}, "letter_file", employee=employee)
+        job.report(100, "Relieving letter is already up to date.")
+        return relieving_obj.letter_file.name
+
+    doc = get_template(template_path)
+    with span("docx_render"):
+        doc.render(context)
+
+    job.report(70, "Saving relieving letter")
+
+    # -------------------------------------------
+    # Save file into releaving_letters/ (default storage, replaced atomically)
+    # -------------------------------------------
+    with span("file_save"):
+        relieving_obj.letter_file.name = save_docx(f"releaving_letters/{filename}", doc)
+    relieving_obj.render_fingerprint = fingerprint
+    delete_document(relieving_obj.pdf_file.name)
+    relieving_obj.pdf_file = None   # stale until the new PDF is converted
+    relieving_obj.save()
+    queue_pdf_conversion("releaving.ReleavingLetter", {"pk": relieving_obj.pk}, "letter_file", employee=employee)
+
+    job.report(100, "Relieving letter generated successfully.")
+    return relieving_obj.letter_file.name